@@ -7,12 +7,15 @@ import re
 from tabulate import tabulate
 import tqdm
 import sys
+from epoch_viz.spectra import spectrum
 
 
 def main(
     directory,
     save_dir=None,
     show_plot=False,
+    fft_window=None,
+    fft_pad=None,
 ):
     try:
         file_dir = os.path.dirname(os.path.realpath(__file__))
@@ -139,9 +142,6 @@ def main(
     print(table_calculated)
 
 
-    omega = np.linspace(-omega_max_natural, omega_max_natural, POINTS)
-
-
     def x_position_to_node(x):
         return int((x - X_MIN)/(X_MAX - X_MIN)*NX)
 
@@ -179,8 +179,8 @@ def main(
         D3[i] = density[p3]
 
     def plot_fft_one(ax, data, plot_lines):
-        data_fft = np.fft.fft(data)
-        data_fft = np.fft.fftshift(data_fft)
+        # omega_max_natural is the Nyquist frequency, half of the sampling frequency
+        data_fft, omega = spectrum(data, 2 * omega_max_natural, window=fft_window, pad=fft_pad)
         data_fft = np.abs(data_fft)
         data_fft = data_fft / (data_fft.max() + 1e-10)
 
@@ -6,6 +6,7 @@ import tqdm
 import os
 import re
 import sys
+from epoch_viz.spectra import spectrum
 
 plt.rcParams["font.size"] = 14
 plt.rcParams["figure.figsize"] = (10, 8)
@@ -21,6 +22,8 @@ def main(
     save_plots=True,
     plot_field_progress = True,
     with_factor = True,
+    fft_window = None,
+    fft_pad = None,
 ):
     try:
         file_dir = os.path.dirname(os.path.realpath(__file__))
@@ -134,12 +137,12 @@ def main(
 
     # Calculating Grids
     if with_factor:
-        omega = np.linspace(-omega_max_natural, omega_max_natural, len(ALL_FILES))/np.cos(ANGLE)
+        omega_factor = 1 / np.cos(ANGLE)
         SAVE_DIR+="_3"
         if not os.path.exists(SAVE_DIR):
             os.mkdir(SAVE_DIR)
     else:
-        omega = np.linspace(-omega_max_natural, omega_max_natural, len(ALL_FILES))
+        omega_factor = 1
     X = np.linspace(X_MIN, -X_MIN, NX)
     T = np.linspace(0, T_MAX, len(ALL_FILES))
 
@@ -280,8 +283,9 @@ def main(
         title="",
         plot_lines=True,
     ):
-        fft = np.fft.fft(E)
-        fft = np.fft.fftshift(fft)
+        # omega_max_natural is the Nyquist frequency, half of the sampling frequency
+        fft, omega = spectrum(E, 2 * omega_max_natural, window=fft_window, pad=fft_pad)
+        omega = omega * omega_factor
         fft = np.abs(fft)
         fft = fft / (fft.max() + 1e-10)
         ax.plot(omega, fft**2, label=f"$E_{component}$")
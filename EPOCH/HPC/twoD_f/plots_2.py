@@ -6,6 +6,7 @@ import tqdm
 import os
 import re
 import sys
+from epoch_viz.spectra import spectrum
 
 plt.rcParams["font.size"] = 14
 plt.rcParams["figure.figsize"] = (10, 8)
@@ -23,6 +24,8 @@ def main(
     with_factor = True,
     save_data = True,
     save_data_dir = "output_data",
+    fft_window = None,
+    fft_pad = None,
 ):
     try:
         file_dir = os.path.dirname(os.path.realpath(__file__))
@@ -159,14 +162,12 @@ def main(
     HALF = POINTS//2
 
     if with_factor:
-        omega = np.linspace(-omega_max_natural, omega_max_natural, len(ALL_FILES))/np.cos(ANGLE)
-        omega_b = np.linspace(-omega_max_natural, omega_max_natural, HALF)/np.cos(ANGLE)
+        omega_factor = 1 / np.cos(ANGLE)
         SAVE_DIR+="_m"
         if not os.path.exists(SAVE_DIR):
             os.mkdir(SAVE_DIR)
     else:
-        omega = np.linspace(-omega_max_natural, omega_max_natural, POINTS)
-        omega_b = np.linspace(-omega_max_natural, omega_max_natural, HALF)
+        omega_factor = 1
     T = np.linspace(0, T_MAX, len(ALL_FILES))
     
     def get_image_name(name):
@@ -218,18 +219,6 @@ def main(
         ax.set_ylabel("$y \, [\mu m]$")
         ax.set_title(f"t = {t:.1f} fs")
 
-    def equat_shape(A, B):
-        "Creates the shape of A and B equal by indexing"
-        if A.shape == B.shape:
-            return A, B
-
-        if len(A) > len(B):
-            length = len(B)
-            return A[:length], B
-        else:
-            length = len(A)
-            return A, B[:length]
-
     x_b = -5
     y_b = -get_y_for_x(x_b)
     x_a = -2
@@ -344,28 +333,17 @@ def main(
         
         if type_ == "b":
             print("Type b")
-            omega_ = omega_b
             E = E[:HALF]
-            if len(omega_)!=len(E):
-                omega_, E = equat_shape(omega_, E)
         elif type_ == "a":
             print("Type a")
-            omega_ = omega_b
-            if len(omega_)!=len(E):
-                E = E[HALF+1:]
-            else:
-                E = E[HALF:]
-            if len(omega_)!=len(E):
-                omega_, E = equat_shape(omega_, E)
+            E = E[HALF:]
         else:
             print("Type All")
-            omega_ = omega
-        print(omega_.shape, E.shape)
-        fft = np.fft.fft(E)
-        fft = np.fft.fftshift(fft)
+        # omega_max_natural is the Nyquist frequency, half of the sampling frequency
+        fft, omega_ = spectrum(E, 2 * omega_max_natural, window=fft_window, pad=fft_pad)
+        omega_ = omega_ * omega_factor
         fft = np.abs(fft)
         fft = fft / (fft.max() + 1e-10)
-        
 
         ax.plot(omega_, fft**2, label=f"$E_{component}$")
         ax.set_yscale("log")
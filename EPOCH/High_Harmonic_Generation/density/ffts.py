@@ -7,9 +7,10 @@ import re
 import glob
 import tqdm
 import sys
+from epoch_viz.spectra import spectrum
 
 
-def main(DATA_DIR, FILE_NAME=None):
+def main(DATA_DIR, FILE_NAME=None, FFT_WINDOW=None, FFT_PAD=None):
 
     plt.rcParams["font.size"] = 14
     plt.rcParams["figure.figsize"] = (10, 8)
@@ -135,20 +136,18 @@ def main(DATA_DIR, FILE_NAME=None):
     Et0 = Et0 / np.max(Et0)
     Et1 = Et1 / np.max(Et1)
     Et2 = Et2 / np.max(Et2)
-    y0 = np.fft.fft(Et0)
-    y1 = np.fft.fft(Et1)
-    y2 = np.fft.fft(Et2)
-    y0_shift = np.fft.fftshift(y0)
-    y1_shift = np.fft.fftshift(y1)
-    y2_shift = np.fft.fftshift(y2)
-    y0_f = np.abs(y0_shift)
-    y1_f = np.abs(y1_shift)
-    y2_f = np.abs(y2_shift)
+    # Sampling frequency in units of omega0
+    omega_s = omega_max / omega0
+    y0, omega = spectrum(Et0, omega_s, window=FFT_WINDOW, pad=FFT_PAD)
+    y1, _ = spectrum(Et1, omega_s, window=FFT_WINDOW, pad=FFT_PAD)
+    y2, _ = spectrum(Et2, omega_s, window=FFT_WINDOW, pad=FFT_PAD)
+    y0_f = np.abs(y0)
+    y1_f = np.abs(y1)
+    y2_f = np.abs(y2)
 
     print("Saving plot 1")
     plt.figure()
-    omega = np.linspace(-omega_max / 2, omega_max / 2, len(ALL_FILES))
-    plt.plot(omega / omega0, 2 * np.abs(y0_f) * 2)
+    plt.plot(omega, 2 * np.abs(y0_f) * 2)
     plt.yscale("log")
     points = np.arange(1, 21, 2)
     for p in points:
@@ -162,7 +161,7 @@ def main(DATA_DIR, FILE_NAME=None):
 
     print("Saving plot 2")
     plt.figure()
-    plt.plot(omega / omega0, 2 * np.abs(y1_f) * 2)
+    plt.plot(omega, 2 * np.abs(y1_f) * 2)
     plt.yscale("log")
     points = np.arange(1, 21, 2)
     for p in points:
@@ -176,7 +175,7 @@ def main(DATA_DIR, FILE_NAME=None):
 
     print("Saving plot 3")
     plt.figure()
-    plt.plot(omega / omega0, 2 * np.abs(y2_f) * 2)
+    plt.plot(omega, 2 * np.abs(y2_f) * 2)
     plt.yscale("log")
     points = np.arange(1, 21, 2)
     for p in points:
@@ -7,6 +7,7 @@ import glob
 from tqdm import tqdm
 from style import *
 from tabulate import tabulate
+from epoch_viz.spectra import spectrum
 
 plt.rcParams["font.size"] = 14
 plt.rcParams["figure.figsize"] = (10, 8)
@@ -18,7 +19,7 @@ m = 9.10938356e-31
 e = 1.60217662e-19
 
 
-def plot(data_dir, save_dir=".", show_fig=True, file_name=None):
+def plot(data_dir, save_dir=".", show_fig=True, file_name=None, fft_window=None, fft_pad=None):
     DATA_DIR = data_dir
     SAVE_DIR = save_dir
     ALL_FILES = glob.glob(f"{DATA_DIR}/*sdf")
@@ -137,8 +138,6 @@ def plot(data_dir, save_dir=".", show_fig=True, file_name=None):
 
     def plot_p(file_name, show_fig):
         omega_max_m = 2 * np.pi / dt_m
-        omegas = np.linspace(-omega_max_m / 2, omega_max_m / 2, POINTS)
-        omegas_l = omegas / beta
 
         Ety = np.zeros(POINTS)
         Etx = np.zeros(POINTS)
@@ -147,9 +146,10 @@ def plot(data_dir, save_dir=".", show_fig=True, file_name=None):
             Ety[i] = data.Electric_Field_Ey.data[8000]
             Etx[i] = data.Electric_Field_Ex.data[8000]
 
-        fft_x = np.fft.fftshift(np.fft.fft(Etx * tan_factor))
+        # omega_max_m is the sampling frequency, so omegas is in rad/s
+        fft_x, omegas = spectrum(Etx * tan_factor, omega_max_m, window=fft_window, pad=fft_pad)
         fft_x = np.abs(fft_x) / max(np.abs(fft_x))
-        fft_y = np.fft.fftshift(np.fft.fft(Ety / ErL))
+        fft_y, _ = spectrum(Ety / ErL, omega_max_m, window=fft_window, pad=fft_pad)
         fft_y = np.abs(fft_y) / max(np.abs(fft_y))
 
         plt.figure()
@@ -181,8 +181,6 @@ def plot(data_dir, save_dir=".", show_fig=True, file_name=None):
 
     def plot_s(file_name, show_fig):
         omega_max_m = 2 * np.pi / dt_m
-        omegas = np.linspace(-omega_max_m / 2, omega_max_m / 2, POINTS)
-        omegas_l = omegas / beta
 
         Etz = np.zeros(POINTS)
         Etx = np.zeros(POINTS)
@@ -191,10 +189,11 @@ def plot(data_dir, save_dir=".", show_fig=True, file_name=None):
             Etz[i] = data.Electric_Field_Ez.data[8000]
             Etx[i] = data.Electric_Field_Ex.data[8000]
 
-        fft_z = np.fft.fftshift(np.fft.fft(Etz / (ErL * beta)))
+        # omega_max_m is the sampling frequency, so omegas is in rad/s
+        fft_z, omegas = spectrum(Etz / (ErL * beta), omega_max_m, window=fft_window, pad=fft_pad)
         # fft_z = np.abs(fft_z) / max(np.abs(fft_z * tan_factor))
         fft_z = np.abs(fft_z)
-        fft_x = np.fft.fftshift(np.fft.fft(Etx / ErL))
+        fft_x, _ = spectrum(Etx / ErL, omega_max_m, window=fft_window, pad=fft_pad)
         # fft_x = np.abs(fft_x) / max(np.abs(fft_x))
         fft_x = np.abs(fft_x)
 
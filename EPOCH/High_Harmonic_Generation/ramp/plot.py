@@ -6,6 +6,7 @@ import re
 import glob, os
 import tqdm
 from style import cprint
+from epoch_viz.spectra import spectrum
 
 plt.rcParams["font.family"] = "serif"
 plt.rcParams["font.serif"] = "Ubuntu"
@@ -34,6 +35,8 @@ def main(
     plot_fields2d=False,
     plot_fields_with_time=False,
     return_data=False,
+    fft_window=None,
+    fft_pad=None,
 ):
     DATA_DIR = data_dir
     with open(os.path.join(DATA_DIR, "input.deck"), "r") as myfile:
@@ -141,15 +144,14 @@ def main(
 
     def plot_fft(
         Ey,
-        omegas,
+        omega_s,
         lines=False,
         xlim=(0, 20),
         ylim=None,
         fig_name=None,
         return_data=False,
     ):
-        Ey_fft = np.fft.fft(Ey)
-        Ey_fft = np.fft.fftshift(Ey_fft)
+        Ey_fft, omegas = spectrum(Ey, omega_s, window=fft_window, pad=fft_pad)
         Ey_fft = np.abs(Ey_fft)
         Ey_fft = Ey_fft / Ey_fft.max()
         plt.figure()
@@ -175,8 +177,8 @@ def main(
         if return_data:
             return Ey_fft, omegas
 
-    omegas = np.linspace(-omega_max / 2, omega_max / 2, len(ALL_FILES))
-    omegas = omegas / omega0
+    # Sampling frequency in units of omega0
+    omega_s = omega_max / omega0
     if plot_ffts:
         # ids = [0, 5000, 7000, 7600, 7700, 7800, 7900, 8000]
         ids = [7000, 7600, 7700, 7800, 8000]
@@ -184,7 +186,7 @@ def main(
             fig_name = f"ffty_{id_}"
             data = plot_fft(
                 Eys[:, id_],
-                omegas,
+                omega_s,
                 lines=True,
                 fig_name=fig_name,
                 ylim=(1e-4, 1),
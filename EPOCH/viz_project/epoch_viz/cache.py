@@ -0,0 +1,63 @@
+from collections import OrderedDict
+
+
+class LRUCache:
+    """
+    A least recently used cache of numpy arrays, bounded by the total number of bytes.
+
+    When a new array does not fit, the least recently used arrays are evicted
+    until it does. An array larger than the whole cache is never stored.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.__items = OrderedDict()
+
+    def __str__(self):
+        return f"LRUCache with {len(self)} items ({self.nbytes} of {self.max_bytes} bytes)"
+
+    def __repr__(self):
+        return f"LRUCache({self.max_bytes})"
+
+    def __len__(self):
+        return len(self.__items)
+
+    def __contains__(self, key):
+        return key in self.__items
+
+    def get(self, key, default=None):
+        """
+        Gets an item and marks it as the most recently used one.
+        """
+        try:
+            value = self.__items[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self.__items.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        """
+        Stores an item, evicting the least recently used items if needed.
+        """
+        if key in self.__items:
+            self.nbytes -= self.__items.pop(key).nbytes
+        if value.nbytes > self.max_bytes:
+            return
+        while self.nbytes + value.nbytes > self.max_bytes:
+            _, evicted = self.__items.popitem(last=False)
+            self.nbytes -= evicted.nbytes
+        self.__items[key] = value
+        self.nbytes += value.nbytes
+
+    def clear(self):
+        """
+        Removes all the items.
+        """
+        self.__items.clear()
+        self.nbytes = 0
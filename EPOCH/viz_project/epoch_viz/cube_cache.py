@@ -0,0 +1,200 @@
+from bisect import bisect_left, insort
+from collections import OrderedDict
+import numpy as np
+
+
+def nearest_index(axis, value):
+    """
+    Finds the index of the element of a sorted axis closest to a value, using a binary search.
+
+    Parameters
+    ----------
+    axis : array_like
+        Sorted axis, eg. the time of every dump in tau.
+    value : float
+        The value to look for.
+
+    Returns
+    -------
+    int
+        Index of the closest element.
+    """
+    axis = np.asarray(axis)
+    index = int(np.searchsorted(axis, value))
+    if index == 0:
+        return 0
+    if index == len(axis):
+        return len(axis) - 1
+    if value - axis[index - 1] <= axis[index] - value:
+        return index - 1
+    return index
+
+
+class CubeCache:
+    """
+    A cache of loaded (time, space) blocks of the fields, indexed by their node ranges.
+
+    A request for a window which lies inside a cached block is answered by
+    slicing the block. If the window only overlaps a cached block, the block is
+    grown to cover both of them and just the missing margins are loaded. The
+    blocks of every field are kept sorted by their first time node, so that the
+    candidate blocks of a request are found with a binary search.
+
+    The cached blocks are marked read-only, and so are the views of them returned
+    by `get`. Copy a block before modifying it.
+
+    Parameters
+    ----------
+    load : callable
+        Function taking a data type, a slice of time nodes and a slice of space
+        nodes and returning the block of shape (time, space).
+    max_bytes : int, optional
+        Maximum number of bytes held by the cache, by default 1 GiB. The least
+        recently used blocks are evicted first.
+    """
+
+    def __init__(self, load, max_bytes=1024**3):
+        self.load = load
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.__blocks = OrderedDict()
+        self.__starts = {}
+
+    def __str__(self):
+        return f"CubeCache with {len(self)} blocks ({self.nbytes} of {self.max_bytes} bytes)"
+
+    def __repr__(self):
+        return f"CubeCache({self.max_bytes})"
+
+    def __len__(self):
+        return len(self.__blocks)
+
+    def __candidates(self, data_type, time_range):
+        """
+        Gets the keys of the blocks of a data type which may overlap a time range.
+        """
+        starts = self.__starts.get(data_type, [])
+        # Blocks starting after the end of the range can not overlap it
+        stop = bisect_left(starts, (time_range[1],))
+        return [(data_type,) + start for start in starts[:stop]]
+
+    def __remove(self, key):
+        data = self.__blocks.pop(key)
+        self.__starts[key[0]].remove(key[1:])
+        self.nbytes -= data.nbytes
+
+    def put(self, data_type, time_range, space_range, data):
+        """
+        Stores a block, evicting the least recently used blocks if needed.
+
+        Parameters
+        ----------
+        data_type : str
+            The field, eg. "Ne".
+        time_range : tuple
+            (start, stop) time nodes of the block.
+        space_range : tuple
+            (start, stop) space nodes of the block.
+        data : np.ndarray
+            The block, of shape (time, space). It is marked read-only, so pass
+            a copy of an array which is modified later.
+        """
+        key = (
+            data_type,
+            int(time_range[0]),
+            int(time_range[1]),
+            int(space_range[0]),
+            int(space_range[1]),
+        )
+        if data.shape != (key[2] - key[1], key[4] - key[3]):
+            raise ValueError(
+                f"Shape of the block {data.shape} does not match the ranges {time_range} and {space_range}."
+            )
+        if key in self.__blocks:
+            self.__remove(key)
+        if data.nbytes > self.max_bytes:
+            return
+        while self.nbytes + data.nbytes > self.max_bytes:
+            self.__remove(next(iter(self.__blocks)))
+        data.flags.writeable = False
+        self.__blocks[key] = data
+        insort(self.__starts.setdefault(data_type, []), key[1:])
+        self.nbytes += data.nbytes
+
+    def get(self, data_type, time_range, space_range):
+        """
+        Gets a block, loading only the parts which are not cached.
+
+        Parameters
+        ----------
+        data_type : str
+            The field, eg. "Ne".
+        time_range : tuple
+            (start, stop) time nodes of the block.
+        space_range : tuple
+            (start, stop) space nodes of the block.
+
+        Returns
+        -------
+        np.ndarray
+            The block of shape (time, space).
+        """
+        t0, t1 = int(time_range[0]), int(time_range[1])
+        x0, x1 = int(space_range[0]), int(space_range[1])
+
+        best = None
+        best_overlap = 0
+        for key in self.__candidates(data_type, (t0, t1)):
+            _, bt0, bt1, bx0, bx1 = key
+            if bt0 <= t0 and t1 <= bt1 and bx0 <= x0 and x1 <= bx1:
+                self.__blocks.move_to_end(key)
+                self.hits += 1
+                return self.__blocks[key][t0 - bt0 : t1 - bt0, x0 - bx0 : x1 - bx0]
+            overlap = max(min(t1, bt1) - max(t0, bt0), 0) * max(
+                min(x1, bx1) - max(x0, bx0), 0
+            )
+            if overlap > best_overlap:
+                best, best_overlap = key, overlap
+
+        self.misses += 1
+        if best is None:
+            data = self.load(data_type, slice(t0, t1), slice(x0, x1))
+            self.put(data_type, (t0, t1), (x0, x1), data)
+            return data
+
+        # Grow the overlapping block to the bounding box of both windows
+        _, bt0, bt1, bx0, bx1 = best
+        block = self.__blocks[best]
+        ht0, ht1 = min(t0, bt0), max(t1, bt1)
+        hx0, hx1 = min(x0, bx0), max(x1, bx1)
+        data = np.empty((ht1 - ht0, hx1 - hx0), dtype=block.dtype)
+        data[bt0 - ht0 : bt1 - ht0, bx0 - hx0 : bx1 - hx0] = block
+        margins = [
+            (ht0, bt0, hx0, hx1),
+            (bt1, ht1, hx0, hx1),
+            (bt0, bt1, hx0, bx0),
+            (bt0, bt1, bx1, hx1),
+        ]
+        for mt0, mt1, mx0, mx1 in margins:
+            if mt1 > mt0 and mx1 > mx0:
+                data[mt0 - ht0 : mt1 - ht0, mx0 - hx0 : mx1 - hx0] = self.load(
+                    data_type, slice(mt0, mt1), slice(mx0, mx1)
+                )
+
+        # The grown block replaces the blocks it covers
+        for key in self.__candidates(data_type, (ht0, ht1)):
+            _, ct0, ct1, cx0, cx1 = key
+            if ht0 <= ct0 and ct1 <= ht1 and hx0 <= cx0 and cx1 <= hx1:
+                self.__remove(key)
+        self.put(data_type, (ht0, ht1), (hx0, hx1), data)
+        return data[t0 - ht0 : t1 - ht0, x0 - hx0 : x1 - hx0]
+
+    def clear(self):
+        """
+        Removes all the blocks.
+        """
+        self.__blocks.clear()
+        self.__starts.clear()
+        self.nbytes = 0
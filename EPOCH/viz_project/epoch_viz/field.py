@@ -0,0 +1,215 @@
+from itertools import product
+import numpy as np
+
+
+class FieldHandle:
+    """
+    A lazy, sliceable handle to a field of a run.
+
+    Nothing is read when the handle is created. Indexing it as
+    `handle[time, space]` (or `handle[time, x, y]` for 2D runs) loads only the
+    snapshots and the spatial window needed. Indices can be given as nodes
+    (int) or in natural units (float, tau for time and lambda for space), eg.
+    `handle[25.0:35.0, 19.5:20.5]`.
+
+    The data is loaded in chunks of (time, *space) nodes, which are kept in a
+    shared LRU cache, so that exploring neighbouring windows is cheap.
+
+    Parameters
+    ----------
+    data_type : str
+        The field, eg. "Ne".
+    shape : tuple
+        Number of (time, space) nodes, or (time, x, y) nodes for 2D runs.
+    load_block : callable
+        Function taking an array of time nodes and a slice of nodes for every
+        space axis and returning the block of shape (time, *space).
+    time_to_node : callable
+        Converts time in tau to time node.
+    space_to_node : callable or tuple of callables
+        Converts space in lambda to space node, with one function for every
+        space axis if there are more than one.
+    cache : LRUCache
+        The cache where the chunks are stored.
+    chunks : tuple, optional
+        Shape of the chunks in (time, *space) nodes, by default None which
+        means (64, 1024) for 1D and (64, 128, 128) for 2D runs.
+    """
+
+    def __init__(
+        self,
+        data_type,
+        shape,
+        load_block,
+        time_to_node,
+        space_to_node,
+        cache,
+        chunks=None,
+    ):
+        self.data_type = data_type
+        self.shape = tuple(shape)
+        self.load_block = load_block
+        self.time_to_node = time_to_node
+        if callable(space_to_node):
+            space_to_node = (space_to_node,) * (len(self.shape) - 1)
+        self.space_to_node = tuple(space_to_node)
+        self.cache = cache
+        if chunks is None:
+            chunks = (64, 1024) if len(self.shape) == 2 else (64,) + (128,) * (len(self.shape) - 1)
+        if len(chunks) != len(self.shape):
+            raise ValueError(
+                f"The chunks {chunks} should have one size for every axis of the shape {self.shape}."
+            )
+        self.chunks = tuple(chunks)
+
+    def __str__(self):
+        return f"FieldHandle for {self.data_type} with shape {self.shape}"
+
+    def __repr__(self):
+        return f"FieldHandle({self.data_type}, shape={self.shape})"
+
+    def __len__(self):
+        return self.shape[0]
+
+    @property
+    def ndim(self):
+        return len(self.shape)
+
+    def __to_node(self, value, axis):
+        """
+        Converts an index to node, floats are treated as natural units.
+        """
+        if isinstance(value, (float, np.floating)):
+            if axis == 0:
+                return self.time_to_node(value)
+            return self.space_to_node[axis - 1](value)
+        return int(value)
+
+    def __resolve(self, index, axis):
+        """
+        Converts the index of an axis to a range of nodes.
+
+        Returns
+        -------
+        range, bool
+            The nodes and whether the axis should be dropped from the result.
+        """
+        n = self.shape[axis]
+        if isinstance(index, slice):
+            start = None if index.start is None else self.__to_node(index.start, axis)
+            stop = None if index.stop is None else self.__to_node(index.stop, axis)
+            step = index.step
+            if step is not None and not isinstance(step, (int, np.integer)):
+                raise TypeError("Step of the slice should be an integer number of nodes.")
+            return range(*slice(start, stop, step).indices(n)), False
+
+        node = self.__to_node(index, axis)
+        if node < 0:
+            node += n
+        if not 0 <= node < n:
+            raise IndexError(f"Index {index} is out of bounds for axis {axis} with size {n}")
+        return range(node, node + 1), True
+
+    def __key(self, time_chunk, space_chunk):
+        return (self.data_type, self.chunks, time_chunk) + space_chunk
+
+    def __chunk_slice(self, axis, chunk):
+        """
+        Gets the nodes of a chunk along an axis.
+        """
+        start = chunk * self.chunks[axis]
+        return slice(start, min(start + self.chunks[axis], self.shape[axis]))
+
+    def __load_chunks(self, time_chunk, space_chunks):
+        """
+        Loads the missing space chunks of a time chunk in a single pass over the snapshots.
+
+        The block loaded is the bounding box of the missing chunks.
+        """
+        times = self.__chunk_slice(0, time_chunk)
+        first = [min(chunk[i] for chunk in space_chunks) for i in range(self.ndim - 1)]
+        last = [max(chunk[i] for chunk in space_chunks) for i in range(self.ndim - 1)]
+        window = tuple(
+            slice(self.__chunk_slice(i + 1, first[i]).start, self.__chunk_slice(i + 1, last[i]).stop)
+            for i in range(self.ndim - 1)
+        )
+        block = self.load_block(np.arange(times.start, times.stop), *window)
+        loaded = {}
+        for space_chunk in space_chunks:
+            index = (slice(None),) + tuple(
+                slice(
+                    self.__chunk_slice(i + 1, chunk).start - window[i].start,
+                    self.__chunk_slice(i + 1, chunk).stop - window[i].start,
+                )
+                for i, chunk in enumerate(space_chunk)
+            )
+            # Copy, so that the cache does not keep the whole block alive
+            chunk = np.array(block[index])
+            self.cache.put(self.__key(time_chunk, space_chunk), chunk)
+            loaded[space_chunk] = chunk
+        return loaded
+
+    def __gather(self, time_nodes, box):
+        """
+        Assembles the block of the bounding box `box` (a slice for every axis) from the chunks.
+
+        Only the time chunks containing one of `time_nodes` are filled, the
+        other rows of the block are left uninitialized.
+        """
+        time_chunks = sorted(set(node // self.chunks[0] for node in time_nodes))
+        space_chunks = list(
+            product(
+                *(
+                    range(box[axis].start // self.chunks[axis], (box[axis].stop - 1) // self.chunks[axis] + 1)
+                    for axis in range(1, self.ndim)
+                )
+            )
+        )
+
+        result = None
+        for time_chunk in time_chunks:
+            chunks = {}
+            missing = []
+            for space_chunk in space_chunks:
+                chunk = self.cache.get(self.__key(time_chunk, space_chunk))
+                if chunk is None:
+                    missing.append(space_chunk)
+                else:
+                    chunks[space_chunk] = chunk
+            if missing:
+                chunks.update(self.__load_chunks(time_chunk, missing))
+
+            for space_chunk, chunk in chunks.items():
+                if result is None:
+                    result = np.empty(
+                        tuple(window.stop - window.start for window in box), dtype=chunk.dtype
+                    )
+                target = []
+                source = []
+                for axis, index in enumerate((time_chunk,) + space_chunk):
+                    nodes = self.__chunk_slice(axis, index)
+                    lo, hi = max(box[axis].start, nodes.start), min(box[axis].stop, nodes.stop)
+                    target.append(slice(lo - box[axis].start, hi - box[axis].start))
+                    source.append(slice(lo - nodes.start, hi - nodes.start))
+                result[tuple(target)] = chunk[tuple(source)]
+        return result
+
+    def __getitem__(self, key):
+        if not isinstance(key, tuple):
+            key = (key,)
+        if len(key) > self.ndim:
+            raise IndexError(f"Too many indices, the field has {self.ndim} dimensions")
+        key = key + (slice(None),) * (self.ndim - len(key))
+
+        nodes, drop = zip(*(self.__resolve(index, axis) for axis, index in enumerate(key)))
+
+        if any(len(axis_nodes) == 0 for axis_nodes in nodes):
+            data = np.empty(tuple(len(axis_nodes) for axis_nodes in nodes))
+        else:
+            box = tuple(slice(min(axis_nodes), max(axis_nodes) + 1) for axis_nodes in nodes)
+            data = self.__gather(nodes[0], box)
+            for axis, axis_nodes in enumerate(nodes):
+                if axis_nodes.step != 1:
+                    data = np.take(data, np.asarray(axis_nodes) - box[axis].start, axis=axis)
+
+        return data[tuple(0 if dropped else slice(None) for dropped in drop)]
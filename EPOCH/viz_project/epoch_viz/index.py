@@ -0,0 +1,147 @@
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from .sdf_reader import read_file_headers
+from .store import file_signatures
+
+INDEX_NAME = "sdf_index.json"
+INDEX_VERSION = 1
+
+
+def scan_file(file):
+    """
+    Scans the headers of a sdf file, without reading any data.
+
+    Returns
+    -------
+    dict
+        The simulation `time` (s), the `step` and the `blocks` of the file.
+    """
+    header, blocks = read_file_headers(file)
+    return {
+        "time": header["time"],
+        "step": header["step"],
+        "blocks": {
+            name: {
+                "blocktype": block["blocktype"],
+                "dtype": block["dtype"],
+                "dims": None if block["dims"] is None else list(block["dims"]),
+                "data_location": block["data_location"],
+                "data_length": block["data_length"],
+            }
+            for name, block in blocks.items()
+        },
+    }
+
+
+class SdfIndex:
+    """
+    An index of the headers of all the sdf files of a run directory.
+
+    For every dump the index keeps the simulation time, the step and the name,
+    shape, dtype and byte offset of every block. It is stored as a sidecar file
+    next to the sdf files, so that the headers are scanned only once. When the
+    index is loaded, only the files which are new or changed (by modification
+    time or size) are scanned again.
+
+    Parameters
+    ----------
+    directory : str
+        The run directory.
+    files : list
+        Sorted list of the sdf files of the run.
+    workers : int, optional
+        Number of threads used to scan the headers, by default 16
+    """
+
+    def __init__(self, directory, files, workers=16):
+        self.directory = directory
+        self.files = files
+        self.workers = workers
+        self.entries = self.__load()
+        self.__times = None
+
+    def __str__(self):
+        return f"SdfIndex object for {self.directory}"
+
+    def __repr__(self):
+        return f"SdfIndex({self.directory})"
+
+    def __len__(self):
+        return len(self.entries)
+
+    @property
+    def path(self):
+        return os.path.join(self.directory, INDEX_NAME)
+
+    def __read(self):
+        try:
+            with open(self.path, "r") as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if index.get("version") != INDEX_VERSION:
+            return {}
+        return {tuple(entry["signature"]): entry for entry in index["entries"]}
+
+    def __write(self, entries):
+        temp_path = self.path + ".tmp"
+        try:
+            with open(temp_path, "w") as f:
+                json.dump({"version": INDEX_VERSION, "entries": entries}, f)
+            os.replace(temp_path, self.path)
+        except OSError:
+            # Read only run directory, the index is kept in memory only
+            pass
+
+    def __load(self):
+        old_entries = self.__read()
+        signatures = [tuple(signature) for signature in file_signatures(self.files)]
+        missing = [
+            i for i, signature in enumerate(signatures) if signature not in old_entries
+        ]
+        scanned = {}
+        if missing:
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                results = executor.map(scan_file, [self.files[i] for i in missing])
+                for i, entry in zip(missing, results):
+                    entry["signature"] = list(signatures[i])
+                    scanned[i] = entry
+
+        entries = [
+            scanned[i] if i in scanned else old_entries[signature]
+            for i, signature in enumerate(signatures)
+        ]
+        if missing or len(old_entries) != len(entries):
+            self.__write(entries)
+        return entries
+
+    def times(self):
+        """
+        Gets the simulation time (s) of every dump.
+
+        The times are read from the headers only once and kept in memory.
+        """
+        if self.__times is None:
+            self.__times = np.array([entry["time"] for entry in self.entries])
+            self.__times.flags.writeable = False
+        return self.__times
+
+    def steps(self):
+        """
+        Gets the step of every dump.
+        """
+        return np.array([entry["step"] for entry in self.entries])
+
+    def blocks(self, time_node):
+        """
+        Gets the block headers of a dump.
+
+        Returns
+        -------
+        dict
+            Dictionary with the block names as keys and the `blocktype`,
+            `dtype`, `dims`, `data_location` and `data_length` as values.
+        """
+        return self.entries[time_node]["blocks"]
@@ -0,0 +1,151 @@
+from functools import lru_cache
+import numpy as np
+from .spectra import get_window, rfft2
+
+
+@lru_cache(maxsize=64)
+def wavenumber_axes(nx, ny, dx, dy):
+    """
+    Gets the wavenumbers of a real 2D FFT of a (nx, ny) grid.
+
+    The axes are cached, so the returned arrays are read-only.
+
+    Parameters
+    ----------
+    nx : int
+        Number of cells along x.
+    ny : int
+        Number of cells along y, the axis of the real FFT.
+    dx : float
+        Cell size along x in units of the laser wavelength.
+    dy : float
+        Cell size along y in units of the laser wavelength.
+
+    Returns
+    -------
+    np.ndarray, np.ndarray
+        The sorted kx, from negative to positive, and ky from 0 to the Nyquist
+        wavenumber, in units of the laser wavenumber k0.
+    """
+    kx = np.fft.fftshift(np.fft.fftfreq(nx, dx))
+    ky = np.fft.rfftfreq(ny, dy)
+    kx.flags.writeable = False
+    ky.flags.writeable = False
+    return kx, ky
+
+
+def kspace_power(snapshots, dx, dy, window=None, workers=None):
+    """
+    Computes the kx-ky power spectra of a batch of snapshots in one real 2D FFT.
+
+    Parameters
+    ----------
+    snapshots : array_like
+        Real snapshots of shape (..., nx, ny).
+    dx : float
+        Cell size along x in units of the laser wavelength.
+    dy : float
+        Cell size along y in units of the laser wavelength.
+    window : str, tuple or array_like, optional
+        The window function (see `get_window`) applied along both axes, by
+        default None which means no window.
+    workers : int, optional
+        Number of threads used by scipy.fft, by default None
+
+    Returns
+    -------
+    np.ndarray, np.ndarray, np.ndarray
+        The power |FFT|^2 of shape (..., nx, ny // 2 + 1), with kx sorted, and
+        the kx and ky axes (see `wavenumber_axes`).
+    """
+    snapshots = np.asarray(snapshots)
+    if snapshots.ndim < 2:
+        raise ValueError(
+            f"The snapshots should have the shape (..., nx, ny). You entered an array of shape {snapshots.shape}."
+        )
+    nx, ny = snapshots.shape[-2:]
+    if window is not None:
+        window_2d = np.outer(get_window(window, nx), get_window(window, ny))
+        snapshots = snapshots * window_2d
+    values = rfft2(snapshots, workers=workers)
+    power = values.real**2 + values.imag**2
+    power = np.fft.fftshift(power, axes=-2)
+    return power, *wavenumber_axes(nx, ny, float(dx), float(dy))
+
+
+@lru_cache(maxsize=16)
+def _angle_bins(nx, ny, dx, dy, bins, k_range):
+    """
+    Gets the angle bin and the weight of every cell of a kx-ky power spectrum.
+
+    Cells outside `k_range` (and k = 0) get the weight 0. The columns with
+    0 < ky < Nyquist stand for the conjugate half plane as well, so they are
+    counted twice.
+    """
+    kx, ky = wavenumber_axes(nx, ny, dx, dy)
+    kx, ky = np.meshgrid(kx, ky, indexing="ij")
+    angle = np.mod(np.arctan2(ky, kx), np.pi)
+    index = np.minimum((angle / np.pi * bins).astype(int), bins - 1)
+    k = np.hypot(kx, ky)
+    weight = np.where((k > 0) & (k >= k_range[0]) & (k < k_range[1]), 1.0, 0.0)
+    weight[:, 1 : (ny + 1) // 2] *= 2
+    index.flags.writeable = False
+    weight.flags.writeable = False
+    return index.ravel(), weight.ravel()
+
+
+def angular_histogram(power, dx, dy, bins=180, k_range=None, ny=None):
+    """
+    Bins kx-ky power spectra by the angle of the wavevector, eg. to separate the
+    specular harmonic beam from the rest of the emission.
+
+    The angle is measured from the +x axis. A field is real, so k and -k are
+    the same component and the angles are folded into [0, pi): a wave
+    travelling at theta is binned at theta modulo pi. All the spectra of the
+    batch are binned at once.
+
+    Parameters
+    ----------
+    power : array_like
+        The power spectra of shape (..., nx, ny // 2 + 1), as from `kspace_power`.
+    dx : float
+        Cell size along x in units of the laser wavelength.
+    dy : float
+        Cell size along y in units of the laser wavelength.
+    bins : int, optional
+        Number of angle bins over [0, pi), by default 180
+    k_range : tuple, optional
+        Only the wavevectors with k_range[0] <= |k| < k_range[1] (in units of
+        k0) are binned, by default None which means all of them. Eg. (4.5, 5.5)
+        selects the 5th harmonic.
+    ny : int, optional
+        Number of cells along y, by default None which means `2 * (n_ky - 1)`.
+        Only needed if the snapshots had an odd number of cells along y.
+
+    Returns
+    -------
+    np.ndarray, np.ndarray
+        The histograms of shape (..., bins) and the edges of the bins in radians.
+    """
+    power = np.asarray(power)
+    nx, n_ky = power.shape[-2:]
+    if ny is None:
+        ny = 2 * (n_ky - 1)
+    if ny // 2 + 1 != n_ky:
+        raise ValueError(f"{ny} cells along y give {ny // 2 + 1} values of ky, not {n_ky}.")
+    if k_range is None:
+        k_range = (0.0, np.inf)
+    index, weight = _angle_bins(
+        nx, int(ny), float(dx), float(dy), int(bins), tuple(float(k) for k in k_range)
+    )
+    batch_shape = power.shape[:-2]
+    power = power.reshape(-1, nx * n_ky)
+    # One bincount for the whole batch, with the bins of every spectrum offset
+    offsets = bins * np.arange(len(power))[:, np.newaxis]
+    histogram = np.bincount(
+        (index + offsets).ravel(),
+        weights=(power * weight).ravel(),
+        minlength=len(power) * bins,
+    )
+    edges = np.linspace(0, np.pi, bins + 1)
+    return histogram.reshape(batch_shape + (bins,)), edges
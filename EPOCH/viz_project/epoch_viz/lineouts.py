@@ -0,0 +1,185 @@
+import numpy as np
+
+
+def polyline(vertices, n_points=None, spacing=None):
+    """
+    Gets evenly spaced points along a polyline.
+
+    Parameters
+    ----------
+    vertices : array_like
+        The (x, y) vertices of the polyline, of shape (n_vertices, 2).
+    n_points : int, optional
+        Number of points, including both ends, by default None
+    spacing : float, optional
+        Distance between the points, used if `n_points` is None.
+
+    Returns
+    -------
+    np.ndarray
+        The points of shape (n_points, 2).
+    """
+    vertices = np.asarray(vertices, dtype=float)
+    if vertices.ndim != 2 or vertices.shape[1] != 2 or len(vertices) < 2:
+        raise ValueError(
+            f"A polyline needs at least two (x, y) vertices. You entered {vertices.tolist()}."
+        )
+    lengths = np.hypot(*np.diff(vertices, axis=0).T)
+    distance = np.concatenate([[0], np.cumsum(lengths)])
+    if n_points is None:
+        if spacing is None or spacing <= 0:
+            raise ValueError("Either n_points or a positive spacing should be given.")
+        n_points = int(np.floor(distance[-1] / spacing)) + 1
+    positions = np.linspace(0, distance[-1], n_points)
+    return np.stack(
+        [np.interp(positions, distance, vertices[:, i]) for i in range(2)], axis=1
+    )
+
+
+def ray(origin, angle, length, n_points):
+    """
+    Gets evenly spaced points along a straight line leaving `origin` at `angle`.
+
+    The angle is measured from the x axis, eg. the specular direction of a
+    laser reflected at the angle of incidence theta on a target normal to x
+    is `pi - theta`.
+
+    Parameters
+    ----------
+    origin : tuple
+        The (x, y) start of the line.
+    angle : float
+        The direction of the line in radians.
+    length : float
+        The length of the line.
+    n_points : int
+        Number of points, including both ends.
+
+    Returns
+    -------
+    np.ndarray
+        The points of shape (n_points, 2).
+    """
+    origin = np.asarray(origin, dtype=float)
+    end = origin + length * np.array([np.cos(angle), np.sin(angle)])
+    return polyline([origin, end], n_points=n_points)
+
+
+def _axis_weights(axis, values):
+    """
+    Finds the nodes on both sides of every value and the weight of the upper one.
+    """
+    axis = np.asarray(axis, dtype=float)
+    if len(axis) < 2:
+        raise ValueError("At least two nodes are needed along every axis.")
+    half_cell = (axis[-1] - axis[0]) / (len(axis) - 1) / 2
+    if np.any(values < axis[0] - half_cell) or np.any(values > axis[-1] + half_cell):
+        raise ValueError(
+            f"The points should be inside the grid, from {axis[0] - half_cell} to {axis[-1] + half_cell}."
+        )
+    # Points in the outer half cells take the value of the edge nodes
+    values = np.clip(values, axis[0], axis[-1])
+    upper = np.clip(np.searchsorted(axis, values, side="right"), 1, len(axis) - 1)
+    lower = upper - 1
+    weight = (values - axis[lower]) / (axis[upper] - axis[lower])
+    return lower, upper, weight
+
+
+class BilinearSampler:
+    """
+    Samples 2D fields at arbitrary points with bilinear interpolation.
+
+    The four neighbouring nodes of every point and their weights are found
+    once, when the sampler is created. Sampling a snapshot is then a single
+    gather of the distinct nodes followed by a weighted sum, so the same
+    sampler is applied to every snapshot of a run at the cost of reading a
+    few nodes.
+
+    Examples
+    --------
+    >>> x, y = ez.grid()
+    >>> points = ray((0, 0), np.pi - ez.deck_info["ANGLE"], 8, 400)
+    >>> sampler = BilinearSampler(x, y, points)
+    >>> values = sampler.sample(snapshot["Ey"])
+
+    Parameters
+    ----------
+    x : array_like
+        Sorted positions of the nodes along x.
+    y : array_like
+        Sorted positions of the nodes along y.
+    points : array_like
+        The (x, y) points, of shape (..., 2), in the units of the axes.
+    """
+
+    def __init__(self, x, y, points):
+        points = np.asarray(points, dtype=float)
+        if points.shape[-1] != 2:
+            raise ValueError(
+                f"The last axis of the points should hold (x, y). You entered points of shape {points.shape}."
+            )
+        self.shape = points.shape[:-1]
+        points = points.reshape(-1, 2)
+        x_lower, x_upper, x_weight = _axis_weights(x, points[:, 0])
+        y_lower, y_upper, y_weight = _axis_weights(y, points[:, 1])
+
+        # Corners (x_lower, y_lower), (x_upper, y_lower), (x_lower, y_upper), (x_upper, y_upper)
+        x_nodes = np.stack([x_lower, x_upper, x_lower, x_upper])
+        y_nodes = np.stack([y_lower, y_lower, y_upper, y_upper])
+        self.weights = np.stack(
+            [
+                (1 - x_weight) * (1 - y_weight),
+                x_weight * (1 - y_weight),
+                (1 - x_weight) * y_weight,
+                x_weight * y_weight,
+            ]
+        )
+        flat = x_nodes * len(y) + y_nodes
+        unique, inverse = np.unique(flat, return_inverse=True)
+        self.nodes = (unique // len(y), unique % len(y))
+        self.__inverse = inverse.reshape(flat.shape)
+
+    def __str__(self):
+        return f"BilinearSampler of {int(np.prod(self.shape))} points from {len(self)} nodes"
+
+    def __repr__(self):
+        return f"BilinearSampler(shape={self.shape})"
+
+    def __len__(self):
+        return len(self.nodes[0])
+
+    def combine(self, values):
+        """
+        Interpolates the points from the values at `self.nodes`.
+
+        Parameters
+        ----------
+        values : array_like
+            The values at the nodes, of shape (..., len(self)).
+
+        Returns
+        -------
+        np.ndarray
+            The values at the points, of shape (...,) + `self.shape`.
+        """
+        values = np.asarray(values)
+        corners = values[..., self.__inverse]
+        result = (corners * self.weights).sum(axis=-2)
+        return result.reshape(values.shape[:-1] + self.shape)
+
+    def sample(self, field):
+        """
+        Samples a field, or a batch of fields, at the points.
+
+        Parameters
+        ----------
+        field : array_like
+            The field of shape (..., nx, ny), eg. a snapshot or (time, nx, ny).
+
+        Returns
+        -------
+        np.ndarray
+            The values at the points, of shape (...,) + `self.shape`.
+        """
+        field = np.asarray(field)
+        return self.combine(field[..., self.nodes[0], self.nodes[1]])
@@ -0,0 +1,80 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+
+def result_nbytes(result):
+    """
+    Gets the number of bytes of the arrays in a result (an array or a dictionary of arrays).
+    """
+    if isinstance(result, dict):
+        return sum(np.asarray(value).nbytes for value in result.values())
+    return np.asarray(result).nbytes
+
+
+class Prefetcher:
+    """
+    Iterates over `read(item)` for every item, reading the next items on background threads.
+
+    While the caller processes the result of item i, the items i+1, ..., i+depth
+    are already being read, so that the latency of the file system is hidden
+    behind the computation. The results are yielded in the order of the items.
+
+    Parameters
+    ----------
+    read : callable
+        Function reading a single item.
+    items : iterable
+        The items to read, eg. time nodes.
+    depth : int, optional
+        Maximum number of items read ahead, by default 4
+    max_bytes : int, optional
+        Maximum number of bytes held by the items read ahead, by default None
+        which means no limit. The size of an item is measured on the first one
+        read and the depth is reduced so that the read ahead items fit.
+    workers : int, optional
+        Number of threads, by default None which means `depth` threads.
+    """
+
+    def __init__(self, read, items, depth=4, max_bytes=None, workers=None):
+        self.read = read
+        self.items = list(items)
+        self.depth = max(int(depth), 1)
+        self.max_bytes = max_bytes
+        self.workers = workers
+
+    def __len__(self):
+        return len(self.items)
+
+    def __iter__(self):
+        if len(self.items) == 0:
+            return
+        depth = self.depth
+        workers = self.workers or depth
+        executor = ThreadPoolExecutor(max_workers=workers)
+        pending = deque()
+        measured = self.max_bytes is None
+        try:
+            # Read the first item alone to measure its size
+            pending.append((self.items[0], executor.submit(self.read, self.items[0])))
+            next_item = 1
+            while pending:
+                item, future = pending.popleft()
+                result = future.result()
+                if not measured:
+                    item_bytes = max(result_nbytes(result), 1)
+                    depth = max(1, min(depth, self.max_bytes // item_bytes))
+                    measured = True
+                while next_item < len(self.items) and len(pending) < depth:
+                    pending.append(
+                        (
+                            self.items[next_item],
+                            executor.submit(self.read, self.items[next_item]),
+                        )
+                    )
+                    next_item += 1
+                yield item, result
+        finally:
+            for _, future in pending:
+                future.cancel()
+            executor.shutdown(wait=True)
@@ -0,0 +1,180 @@
+import numpy as np
+from .spectra import frequency_axis, rfft
+
+
+def harmonic_filter(omega, orders, fundamental=1.0, edge=0.5):
+    """
+    Builds a smooth band-pass filter selecting a range of harmonic orders.
+
+    The filter is 1 between `orders[0] * fundamental` and `orders[1] * fundamental`
+    and falls to 0 with a cosine squared edge of width `edge * fundamental` on
+    both sides.
+
+    Parameters
+    ----------
+    omega : array_like
+        The frequencies, in the same units as `fundamental`.
+    orders : tuple
+        The first and last harmonic orders (n1, n2) to keep.
+    fundamental : float, optional
+        The fundamental frequency, by default 1.0
+    edge : float, optional
+        Width of the edges in units of the fundamental frequency, by default 0.5
+
+    Returns
+    -------
+    np.ndarray
+        The filter at every frequency.
+    """
+    omega = np.asarray(omega, dtype=float)
+    low = orders[0] * fundamental
+    high = orders[1] * fundamental
+    if low > high:
+        raise ValueError(
+            f"The first order should not be larger than the last one. You entered {orders}."
+        )
+    width = edge * fundamental
+    # Distance outside the band, 0 inside it
+    distance = np.maximum(low - omega, 0) + np.maximum(omega - high, 0)
+    if width <= 0:
+        return (distance == 0).astype(float)
+    taper = np.cos(0.5 * np.pi * distance / width) ** 2
+    return np.where(distance < width, taper, 0.0)
+
+
+def _crossing(intensity, half, index, step):
+    """
+    Finds the (interpolated) position where the intensity falls below `half`,
+    walking from `index` in the direction `step`.
+    """
+    n = intensity.shape[-1]
+    positions = np.arange(n)
+    below = intensity < half[..., np.newaxis]
+    if step < 0:
+        before = below & (positions < index[..., np.newaxis])
+        outer = np.where(before, positions, -1).max(axis=-1)
+        valid = outer >= 0
+        inner = np.minimum(outer + 1, n - 1)
+    else:
+        after = below & (positions > index[..., np.newaxis])
+        outer = np.where(after, positions, n).min(axis=-1)
+        valid = outer < n
+        inner = np.maximum(outer - 1, 0)
+    outer = np.clip(outer, 0, n - 1)
+    i_outer = np.take_along_axis(intensity, outer[..., np.newaxis], -1)[..., 0]
+    i_inner = np.take_along_axis(intensity, inner[..., np.newaxis], -1)[..., 0]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        fraction = (i_inner - half) / (i_inner - i_outer)
+    position = inner + step * fraction
+    return np.where(valid, position, np.nan)
+
+
+def attosecond_pulses(
+    data,
+    omega_max,
+    orders=(3, 9),
+    fundamental=1.0,
+    edge=0.5,
+    threshold=0.5,
+    t0=0.0,
+    workers=None,
+):
+    """
+    Synthesizes the attosecond pulse train formed by a range of harmonics.
+
+    The spectrum of every time series is multiplied by a smooth band-pass
+    filter selecting the harmonic orders n1..n2 and transformed back as an
+    analytic signal, whose squared magnitude is the intensity envelope. All
+    the time series are handled in one vectorized pass.
+
+    Parameters
+    ----------
+    data : array_like
+        The field time series along the last axis, eg. (n_nodes, n_time).
+    omega_max : float
+        Sampling frequency of the time series in units of the laser frequency.
+        The time step is then `1 / omega_max` in units of tau.
+    orders : tuple, optional
+        The first and last harmonic orders (n1, n2) to keep, by default (3, 9)
+    fundamental : float, optional
+        The fundamental frequency in units of omega0, by default 1.0
+    edge : float, optional
+        Width of the edges of the filter in units of the fundamental, by default 0.5
+    threshold : float, optional
+        Pulses are the maxima of the intensity above this fraction of the
+        highest one, by default 0.5
+    t0 : float, optional
+        Time of the first sample in tau, by default 0.0
+    workers : int, optional
+        Number of threads used by scipy.fft, by default None
+
+    Returns
+    -------
+    np.ndarray, np.ndarray, dict
+        The intensity envelopes of the same shape as `data`, the time in tau and
+        the statistics of the pulse trains, each of shape `data.shape[:-1]`:
+        - "n_pulses": number of pulses.
+        - "peak_spacing": mean time between the pulses in tau.
+        - "fwhm": full width at half maximum of the strongest pulse in tau.
+        - "contrast": mean intensity of the pulses over the mean intensity of
+          the minima between them.
+    """
+    data = np.asarray(data, dtype=float)
+    n = data.shape[-1]
+    dt = 1 / omega_max
+    omega = frequency_axis(n, float(omega_max))
+
+    spectrum = rfft(data, axis=-1, workers=workers)
+    spectrum = spectrum * harmonic_filter(omega, orders, fundamental, edge)
+    # Analytic signal: only positive frequencies, doubled
+    analytic_spectrum = np.zeros(data.shape[:-1] + (n,), dtype=complex)
+    analytic_spectrum[..., : spectrum.shape[-1]] = 2 * spectrum
+    analytic_spectrum[..., 0] = spectrum[..., 0]
+    intensity = np.abs(np.fft.ifft(analytic_spectrum, axis=-1)) ** 2
+    times = t0 + np.arange(n) * dt
+
+    # Pulses are the local maxima above the threshold
+    maximum = intensity.max(axis=-1)
+    inner = intensity[..., 1:-1]
+    is_peak = np.zeros(intensity.shape, dtype=bool)
+    is_peak[..., 1:-1] = (
+        (inner > intensity[..., :-2])
+        & (inner >= intensity[..., 2:])
+        & (inner > threshold * maximum[..., np.newaxis])
+    )
+    n_pulses = is_peak.sum(axis=-1)
+    positions = np.arange(n)
+    first = np.where(is_peak, positions, n).min(axis=-1)
+    last = np.where(is_peak, positions, -1).max(axis=-1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        peak_spacing = np.where(
+            n_pulses > 1, (last - first) * dt / (n_pulses - 1), np.nan
+        )
+
+    # Width of the strongest pulse
+    strongest = intensity.argmax(axis=-1)
+    half = maximum / 2
+    left = _crossing(intensity, half, strongest, -1)
+    right = _crossing(intensity, half, strongest, 1)
+    fwhm = (right - left) * dt
+
+    # Minima between the first and the last pulse
+    is_minimum = np.zeros(intensity.shape, dtype=bool)
+    is_minimum[..., 1:-1] = (inner < intensity[..., :-2]) & (
+        inner <= intensity[..., 2:]
+    )
+    is_minimum &= positions > first[..., np.newaxis]
+    is_minimum &= positions < last[..., np.newaxis]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        peak_mean = (intensity * is_peak).sum(axis=-1) / n_pulses
+        n_minima = is_minimum.sum(axis=-1)
+        minimum_mean = (intensity * is_minimum).sum(axis=-1) / n_minima
+        contrast = np.where(n_pulses > 1, peak_mean / minimum_mean, np.nan)
+
+    stats = {
+        "n_pulses": n_pulses,
+        "peak_spacing": peak_spacing,
+        "fwhm": fwhm,
+        "contrast": contrast,
+    }
+    return intensity, times, stats
@@ -0,0 +1,184 @@
+import numpy as np
+
+
+def trapezoid_weights(times):
+    """
+    Gets the weights of the trapezoidal rule for samples at the given times.
+
+    Parameters
+    ----------
+    times : array_like
+        Sorted sampling times.
+
+    Returns
+    -------
+    np.ndarray
+        The weight of every sample, so that `sum(weights * f)` integrates f over the times.
+    """
+    times = np.asarray(times, dtype=float)
+    weights = np.zeros(len(times))
+    if len(times) < 2:
+        return weights
+    steps = np.diff(times)
+    weights[:-1] += steps / 2
+    weights[1:] += steps / 2
+    return weights
+
+
+class SnapshotReduction:
+    """
+    Reduces the snapshots of a field over time, one snapshot at a time.
+
+    The maximum of |value|, the mean and the sum of squared deviations
+    (Welford's update) and the time integral of value^2 are kept for every
+    cell, so the memory used is a few snapshots whatever the number of dumps.
+    Reductions of disjoint sets of snapshots, eg. of the shards of a run read
+    by different processes, are combined with `merge`.
+
+    Examples
+    --------
+    >>> reduction = SnapshotReduction()
+    >>> for time_node, snapshot in ez.iter_snapshots(["Ey"]):
+    ...     reduction.update(snapshot["Ey"], dt)
+    >>> maps = reduction.results()
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.maximum = None
+        self.mean = None
+        self.integral = None
+        self.__m2 = None
+
+    def __str__(self):
+        shape = None if self.mean is None else self.mean.shape
+        return f"SnapshotReduction of {self.count} snapshots of shape {shape}"
+
+    def __repr__(self):
+        return "SnapshotReduction()"
+
+    def update(self, snapshot, weight=1.0):
+        """
+        Adds a snapshot.
+
+        Parameters
+        ----------
+        snapshot : array_like
+            The values of the field at every cell.
+        weight : float, optional
+            The time weight of the snapshot in the integral, eg. the time
+            between the dumps, by default 1.0
+        """
+        snapshot = np.asarray(snapshot, dtype=float)
+        if self.mean is None:
+            self.count = 1
+            self.maximum = np.abs(snapshot)
+            self.mean = snapshot.copy()
+            self.integral = weight * snapshot**2
+            self.__m2 = np.zeros(snapshot.shape)
+            return
+        if snapshot.shape != self.mean.shape:
+            raise ValueError(
+                f"The snapshot has the shape {snapshot.shape}, but the previous ones were {self.mean.shape}."
+            )
+        self.count += 1
+        np.maximum(self.maximum, np.abs(snapshot), out=self.maximum)
+        delta = snapshot - self.mean
+        self.mean += delta / self.count
+        self.__m2 += delta * (snapshot - self.mean)
+        self.integral += weight * snapshot**2
+
+    def merge(self, other):
+        """
+        Adds the snapshots of another reduction, with Chan's pairwise update.
+
+        Parameters
+        ----------
+        other : SnapshotReduction
+            The reduction of a disjoint set of snapshots.
+
+        Returns
+        -------
+        SnapshotReduction
+            This reduction, updated in place.
+        """
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            self.count = other.count
+            self.maximum = other.maximum.copy()
+            self.mean = other.mean.copy()
+            self.integral = other.integral.copy()
+            self.__m2 = other.__m2.copy()
+            return self
+        if other.mean.shape != self.mean.shape:
+            raise ValueError(
+                f"Can not merge reductions of shapes {self.mean.shape} and {other.mean.shape}."
+            )
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        np.maximum(self.maximum, other.maximum, out=self.maximum)
+        self.mean += delta * (other.count / total)
+        self.__m2 += other.__m2 + delta**2 * (self.count * other.count / total)
+        self.integral += other.integral
+        self.count = total
+        return self
+
+    def variance(self):
+        """
+        Gets the (population) variance of every cell.
+        """
+        if self.count == 0:
+            raise ValueError("No snapshots have been added.")
+        return self.__m2 / self.count
+
+    def results(self):
+        """
+        Gets the maps of the reduction.
+
+        Returns
+        -------
+        dict
+            "max" (of |value|), "mean", "variance" and "integral" (of value^2 over time).
+        """
+        return {
+            "max": self.maximum,
+            "mean": self.mean,
+            "variance": self.variance(),
+            "integral": self.integral,
+        }
+
+
+def tree_merge(reductions):
+    """
+    Merges a list of reductions pairwise, in a balanced binary tree.
+
+    Pairwise merging keeps the rounding errors of the means and variances of
+    long runs small and the order of the merges does not depend on how the
+    shards were scheduled.
+
+    Parameters
+    ----------
+    reductions : list
+        The reductions (or dictionaries of reductions with the same keys) of
+        consecutive shards.
+
+    Returns
+    -------
+    SnapshotReduction or dict
+        The reduction of all the shards.
+    """
+    reductions = list(reductions)
+    if len(reductions) == 0:
+        raise ValueError("At least one reduction is needed.")
+    while len(reductions) > 1:
+        merged = []
+        for left, right in zip(reductions[::2], reductions[1::2]):
+            if isinstance(left, dict):
+                merged.append({key: left[key].merge(right[key]) for key in left})
+            else:
+                merged.append(left.merge(right))
+        if len(reductions) % 2 == 1:
+            merged.append(reductions[-1])
+        reductions = merged
+    return reductions[0]
@@ -0,0 +1,226 @@
+import numpy as np
+from tools.maths.algebra import CurveFitting
+from .spectra import harmonic_cutoffs
+
+
+def laser_gamma(a0):
+    """
+    Gets the relativistic factor of the electrons in a linearly polarized laser,
+    `sqrt(1 + a0^2 / 2)`.
+    """
+    return np.sqrt(1 + np.asarray(a0, dtype=float) ** 2 / 2)
+
+
+def _least_squares(columns, y):
+    """
+    Fits `y = columns @ beta` with the normal equations, for the joint fit of
+    several parameters which `CurveFitting` (one variable) can not do. The
+    statistics are defined as in `CurveFitting`: r2 and the standard error syx.
+    """
+    a = columns.T @ columns
+    beta = np.linalg.solve(a, columns.T @ y)
+    residual = y - columns @ beta
+    sr = np.sum(residual**2)
+    st = np.sum((y - y.mean()) ** 2)
+    n, k = columns.shape
+    syx = np.sqrt(sr / (n - k)) if n > k else np.nan
+    r2 = (st - sr) / st if st > 0 else np.nan
+    return beta, {"r2": r2, "syx": syx}
+
+
+def fit_scaling_law(x, y):
+    """
+    Fits the power law `y = prefactor * x^exponent` to positive data.
+
+    The fit is a straight line in log-log scale, a first order `CurveFitting`
+    of log(y) against log(x), so r2 and syx refer to the logarithms. Points
+    which are NaN or not positive, eg. runs where no cutoff was found, are ignored.
+
+    Parameters
+    ----------
+    x : array_like
+        The independent variable, eg. a0 of every run.
+    y : array_like
+        The dependent variable, eg. the cutoff order of every run.
+
+    Returns
+    -------
+    dict
+        The "exponent", "prefactor", "r2", "syx" and the number "n" of points used.
+    """
+    x = np.asarray(x, dtype=float).ravel()
+    y = np.asarray(y, dtype=float).ravel()
+    if x.shape != y.shape:
+        raise ValueError(f"x and y should have the same length. You entered {len(x)} and {len(y)}.")
+    valid = np.isfinite(x) & np.isfinite(y) & (x > 0) & (y > 0)
+    if len(np.unique(x[valid])) < 2:
+        raise ValueError("At least two distinct positive points are needed to fit a scaling law.")
+    # Two points give no degrees of freedom for syx, which is then NaN
+    with np.errstate(divide="ignore", invalid="ignore"):
+        beta, stats = CurveFitting().fit(np.log(x[valid]), np.log(y[valid]), order=1)
+    return {
+        "exponent": beta[1],
+        "prefactor": np.exp(beta[0]),
+        "r2": stats["r2"],
+        "syx": stats["syx"],
+        "n": int(valid.sum()),
+    }
+
+
+def scaling_table(cutoffs, parameters):
+    """
+    Fits the scaling of the cutoffs with every parameter of a sweep.
+
+    Parameters
+    ----------
+    cutoffs : array_like
+        The cutoff of every run, eg. from `harmonic_cutoffs`.
+    parameters : dict
+        Dictionary with the parameter names (eg. "a0", "gamma", "density") as
+        keys and their value for every run as values.
+
+    Returns
+    -------
+    dict
+        Dictionary with the names of the parameters which vary over the runs
+        as keys and their fit (see `fit_scaling_law`) as values. If more than
+        one parameter varies, the "joint" power law
+        `cutoff = prefactor * prod(parameter^exponent)` is fitted as well and
+        its "exponents" are a dictionary keyed by the parameters.
+    """
+    cutoffs = np.asarray(cutoffs, dtype=float).ravel()
+    table = {}
+    varying = []
+    for name, values in parameters.items():
+        values = np.asarray(values, dtype=float).ravel()
+        if len(values) != len(cutoffs):
+            raise ValueError(
+                f"Parameter {name} has {len(values)} values but there are {len(cutoffs)} cutoffs."
+            )
+        if len(np.unique(values)) < 2:
+            continue
+        table[name] = fit_scaling_law(values, cutoffs)
+        varying.append(name)
+
+    # Parameters which are functions of each other (eg. a0 and gamma) can not be fitted jointly
+    independent = [name for name in varying if name != "gamma" or "a0" not in varying]
+    if len(independent) > 1:
+        logs = np.stack(
+            [np.log(np.asarray(parameters[name], dtype=float).ravel()) for name in independent],
+            axis=1,
+        )
+        with np.errstate(divide="ignore", invalid="ignore"):
+            log_y = np.log(cutoffs)
+        valid = np.isfinite(log_y) & np.all(np.isfinite(logs), axis=1)
+        columns = np.concatenate([np.ones((valid.sum(), 1)), logs[valid]], axis=1)
+        if valid.sum() > len(independent):
+            beta, stats = _least_squares(columns, log_y[valid])
+            table["joint"] = {
+                "exponents": dict(zip(independent, beta[1:])),
+                "prefactor": np.exp(beta[0]),
+                "r2": stats["r2"],
+                "syx": stats["syx"],
+                "n": int(valid.sum()),
+            }
+    return table
+
+
+def sweep_parameters(run):
+    """
+    Gets the parameters of a run used for the scaling laws: "a0", "gamma" and
+    the "density" in units of the critical density.
+    """
+    a0 = run.deck_info["A0"]
+    return {
+        "a0": a0,
+        "gamma": float(laser_gamma(a0)),
+        "density": run.calculated_parameters["ne"] / run.calculated_parameters["nc"],
+    }
+
+
+def sweep_scaling(
+    runs,
+    field="Ey",
+    orders=None,
+    bandwidth=0.5,
+    fundamental=1.0,
+    noise_floor=None,
+    snr=10.0,
+    window=None,
+    pad=None,
+    workers=-1,
+):
+    """
+    Turns a parameter sweep into a table of fitted scaling laws of the harmonic cutoff.
+
+    The spectra of the loaded nodes of every run are averaged, interpolated
+    onto a common omega axis and the cutoffs of all the runs are found at once
+    with `harmonic_cutoffs`.
+
+    Examples
+    --------
+    >>> runs = [EpochViz(f"run_{i}") for i in range(1, 15)]
+    >>> for run in runs:
+    ...     run.load_data(["Ey_reflected"], space_range=[500])
+    >>> table, cutoffs, parameters = sweep_scaling(runs, "Ey_reflected")
+    >>> table["density"]["exponent"]
+
+    Parameters
+    ----------
+    runs : list
+        The `EpochViz` objects of the runs, with `field` loaded.
+    field : str, optional
+        The field, by default "Ey"
+    orders : array_like, optional
+        The harmonic orders, by default None which means the odd orders up to
+        the lowest Nyquist frequency of the runs.
+    bandwidth : float, optional
+        Half width of the bands in units of the fundamental frequency, by default 0.5
+    fundamental : float, optional
+        The fundamental frequency in units of omega0, by default 1.0
+    noise_floor : float or array_like, optional
+        The noise floor of every run, by default None which means that it is
+        estimated from the spectra (see `harmonic_cutoffs`).
+    snr : float, optional
+        Ratio of the band power to the noise floor needed for a harmonic, by default 10.0
+    window : str, tuple or array_like, optional
+        Window applied to the time series, by default None
+    pad : str or int, optional
+        Zero padding of the FFT, by default None
+    workers : int, optional
+        Number of threads used by scipy.fft, by default -1
+
+    Returns
+    -------
+    dict, np.ndarray, dict
+        The scaling table (see `scaling_table`), the cutoff order of every run
+        and the parameters of every run.
+    """
+    if len(runs) == 0:
+        raise ValueError("At least one run is needed.")
+    spectra = []
+    for run in runs:
+        power, omega = run.spectra(field, workers=workers, window=window, pad=pad)
+        spectra.append((power.mean(axis=0), omega))
+
+    # Common axis with the finest resolution, up to the lowest Nyquist frequency
+    d_omega = min(omega[1] - omega[0] for _, omega in spectra)
+    omega_end = min(omega[-1] for _, omega in spectra)
+    omega = np.arange(0, omega_end + d_omega / 2, d_omega)
+    power = np.stack([np.interp(omega, axis, values) for values, axis in spectra])
+
+    cutoffs, _ = harmonic_cutoffs(
+        power,
+        omega,
+        orders=orders,
+        bandwidth=bandwidth,
+        fundamental=fundamental,
+        noise_floor=noise_floor,
+        snr=snr,
+    )
+    parameters = {}
+    for run in runs:
+        for name, value in sweep_parameters(run).items():
+            parameters.setdefault(name, []).append(value)
+    parameters = {name: np.array(values) for name, values in parameters.items()}
+    return scaling_table(cutoffs, parameters), cutoffs, parameters
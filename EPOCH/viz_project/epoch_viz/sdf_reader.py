@@ -0,0 +1,325 @@
+"""
+Minimal reader for the headers of SDF files written by EPOCH.
+
+Every block header holds the location of its data, and the data of a plain
+variable is stored contiguously in Fortran order. This lets `read_block` return
+a memory map of the variable, so that slicing a window out of it reads only the
+part of the file covering that window.
+"""
+import struct
+import numpy as np
+
+SDF_MAGIC = b"SDF1"
+ENDIANNESS = 16911887
+ID_LENGTH = 32
+
+BLOCKTYPE_PLAIN_MESH = 1
+BLOCKTYPE_PLAIN_VARIABLE = 3
+
+datatype_dictionary = {
+    1: "i4",
+    2: "i8",
+    3: "f4",
+    4: "f8",
+    5: "f16",
+    6: "S1",
+    7: "?",
+}
+
+
+class SdfFormatError(ValueError):
+    """Exception raised for files which are not valid SDF files.
+
+    Attributes:
+        message -- explanation of the error
+    """
+
+    def __init__(self, message):
+        super().__init__(message)
+        self.message = message
+
+
+class _Buffer:
+    """
+    Sequential reader of the fields of a header.
+    """
+
+    def __init__(self, data, byte_order):
+        self.data = data
+        self.byte_order = byte_order
+        self.position = 0
+
+    def read(self, format):
+        size = struct.calcsize(self.byte_order + format)
+        values = struct.unpack_from(self.byte_order + format, self.data, self.position)
+        self.position += size
+        return values if len(values) > 1 else values[0]
+
+    def read_string(self, length):
+        value = self.data[self.position : self.position + length]
+        self.position += length
+        return value.split(b"\x00")[0].decode("ascii", errors="replace").strip()
+
+
+def _byte_order(data):
+    if struct.unpack_from("<i", data, 4)[0] == ENDIANNESS:
+        return "<"
+    if struct.unpack_from(">i", data, 4)[0] == ENDIANNESS:
+        return ">"
+    raise SdfFormatError("Could not find the endianness of the SDF file.")
+
+
+def read_header(file):
+    """
+    Reads the header of a SDF file.
+
+    Parameters
+    ----------
+    file : str
+        Path of the sdf file.
+
+    Returns
+    -------
+    dict
+        The header of the file. Among others, it contains the simulation
+        `time` (s), the `step`, the number of blocks `nblocks` and the
+        `byte_order` of the file.
+    """
+    with open(file, "rb") as f:
+        return _read_header(f)
+
+
+def _read_header(f):
+    f.seek(0)
+    data = f.read(128)
+    if data[:4] != SDF_MAGIC or len(data) < 110:
+        raise SdfFormatError(f"{f.name} is not a SDF file.")
+    byte_order = _byte_order(data)
+    buffer = _Buffer(data, byte_order)
+    buffer.position = 8
+    header = {"byte_order": byte_order}
+    header["file_version"] = buffer.read("i")
+    header["file_revision"] = buffer.read("i")
+    header["code_name"] = buffer.read_string(ID_LENGTH)
+    header["first_block_location"] = buffer.read("q")
+    header["summary_location"] = buffer.read("q")
+    header["summary_size"] = buffer.read("i")
+    header["nblocks"] = buffer.read("i")
+    header["block_header_length"] = buffer.read("i")
+    header["step"] = buffer.read("i")
+    header["time"] = buffer.read("d")
+    header["jobid1"] = buffer.read("i")
+    header["jobid2"] = buffer.read("i")
+    header["string_length"] = buffer.read("i")
+    header["code_io_version"] = buffer.read("i")
+    header["restart_flag"] = bool(buffer.read("b"))
+    header["other_domains"] = bool(buffer.read("b"))
+    return header
+
+
+def _read_dims(buffer, ndims, itemsize, data_length):
+    """
+    Reads the number of points of a block.
+
+    The specification stores them as 4 byte integers. They are checked
+    against the length of the data and read as 8 byte integers otherwise.
+    """
+    position = buffer.position
+    dims = buffer.read("i" * ndims) if ndims > 1 else (buffer.read("i"),)
+    if itemsize is None or int(np.prod(dims)) * itemsize == data_length:
+        return tuple(int(dim) for dim in dims)
+    buffer.position = position
+    dims = buffer.read("q" * ndims) if ndims > 1 else (buffer.read("q"),)
+    return tuple(int(dim) for dim in dims)
+
+
+def read_block_headers(file):
+    """
+    Reads the headers of all the blocks of a SDF file, without reading any data.
+
+    Parameters
+    ----------
+    file : str
+        Path of the sdf file.
+
+    Returns
+    -------
+    dict
+        Dictionary with the block names (eg. "Electric Field/Ey") as keys. Every
+        value is a dictionary with the `id`, `blocktype`, `dtype`, `ndims`,
+        `dims`, `data_location` and `data_length` of the block. `dims` and
+        `dtype` are None for blocks other than meshes and plain variables.
+    """
+    with open(file, "rb") as f:
+        header = _read_header(f)
+        try:
+            return _read_block_headers(f, header)
+        except struct.error:
+            raise SdfFormatError(f"Block headers of {file} could not be read.")
+
+
+def read_file_headers(file):
+    """
+    Reads the header and the block headers of a SDF file, opening it only once.
+
+    Returns
+    -------
+    dict, dict
+        The header of the file and the block headers, as returned by
+        `read_header` and `read_block_headers`.
+    """
+    with open(file, "rb") as f:
+        header = _read_header(f)
+        try:
+            return header, _read_block_headers(f, header)
+        except struct.error:
+            raise SdfFormatError(f"Block headers of {file} could not be read.")
+
+
+def _read_block_headers(f, header):
+    byte_order = header["byte_order"]
+    string_length = header["string_length"]
+    blocks = {}
+    location = header["first_block_location"]
+    for _ in range(header["nblocks"]):
+        f.seek(location)
+        data = f.read(header["block_header_length"])
+        buffer = _Buffer(data, byte_order)
+        next_location = buffer.read("q")
+        block = {"block_start": location}
+        block["data_location"] = buffer.read("q")
+        block["id"] = buffer.read_string(ID_LENGTH)
+        block["data_length"] = buffer.read("q")
+        block["blocktype"] = buffer.read("i")
+        datatype = buffer.read("i")
+        block["ndims"] = buffer.read("i")
+        name = buffer.read_string(string_length)
+        block["name"] = name
+
+        dtype = datatype_dictionary.get(datatype)
+        block["dtype"] = None if dtype is None else np.dtype(byte_order + dtype).str
+        block["dims"] = None
+        if block["blocktype"] in (BLOCKTYPE_PLAIN_MESH, BLOCKTYPE_PLAIN_VARIABLE):
+            f.seek(location + header["block_header_length"])
+            ndims = block["ndims"]
+            info = _Buffer(f.read(128 * (ndims + 1)), byte_order)
+            if block["blocktype"] == BLOCKTYPE_PLAIN_VARIABLE:
+                # mult, units, mesh id, npts, stagger
+                info.read("d")
+                info.read_string(ID_LENGTH)
+                block["mesh_id"] = info.read_string(ID_LENGTH)
+                itemsize = None if dtype is None else np.dtype(dtype).itemsize
+                block["dims"] = _read_dims(info, ndims, itemsize, block["data_length"])
+            else:
+                # multipliers, labels, units, geometry, extents, npts
+                info.read("d" * ndims)
+                for _ in range(2 * ndims):
+                    info.read_string(ID_LENGTH)
+                info.read("i")
+                block["extents"] = info.read("d" * 2 * ndims)
+                block["dims"] = _read_dims(info, ndims, None, None)
+        blocks[name] = block
+        location = next_location
+    return blocks
+
+
+def read_block(file, block, window=None):
+    """
+    Reads the data of a plain variable as a memory map.
+
+    Parameters
+    ----------
+    file : str
+        Path of the sdf file.
+    block : dict
+        Header of the block, as returned by `read_block_headers`.
+    window : slice or tuple of slices, optional
+        Window of the variable to return, by default None which means the whole variable.
+
+    Returns
+    -------
+    np.ndarray
+        Read-only view of the requested window, with the axes ordered as
+        (x,) for 1D and (x, y) for 2D variables. Only the pages of the file
+        covering the window are read when the view is used.
+    """
+    if block["blocktype"] != BLOCKTYPE_PLAIN_VARIABLE or block["dims"] is None:
+        raise SdfFormatError(f"Block {block.get('name', '')} is not a plain variable.")
+    data = np.memmap(
+        file,
+        dtype=np.dtype(block["dtype"]),
+        mode="r",
+        offset=block["data_location"],
+        shape=block["dims"],
+        order="F",
+    )
+    if window is None:
+        return data
+    return data[window]
+
+
+def read_mesh(file, block):
+    """
+    Reads the axes of a plain mesh, eg. "Grid/Grid".
+
+    Parameters
+    ----------
+    file : str
+        Path of the sdf file.
+    block : dict
+        Header of the mesh block, as returned by `read_block_headers`.
+
+    Returns
+    -------
+    tuple of np.ndarray
+        The positions of the nodes along every axis, eg. (x,) for 1D or
+        (x, y) for 2D meshes.
+    """
+    if block["blocktype"] != BLOCKTYPE_PLAIN_MESH or block["dims"] is None:
+        raise SdfFormatError(f"Block {block.get('name', '')} is not a plain mesh.")
+    dtype = np.dtype(block["dtype"])
+    axes = []
+    offset = block["data_location"]
+    # The axes are stored one after the other
+    for n in block["dims"]:
+        axes.append(
+            np.array(np.memmap(file, dtype=dtype, mode="r", offset=offset, shape=(n,)))
+        )
+        offset += n * dtype.itemsize
+    return tuple(axes)
+
+
+def read_points(file, blocks, points):
+    """
+    Reads the values of plain variables at a few points, mapping the file only once.
+
+    Parameters
+    ----------
+    file : str
+        Path of the sdf file.
+    blocks : dict
+        Dictionary of block headers (as returned by `read_block_headers`) of
+        the variables to read, keyed by any name.
+    points : array_like or tuple of array_like
+        Indices of the points, eg. `[10, 20]` for 1D or `(x_nodes, y_nodes)`
+        for 2D variables.
+
+    Returns
+    -------
+    dict
+        Dictionary with the same keys as `blocks` and the values at the points.
+    """
+    mapping = np.memmap(file, dtype=np.uint8, mode="r")
+    values = {}
+    for key, block in blocks.items():
+        if block["blocktype"] != BLOCKTYPE_PLAIN_VARIABLE or block["dims"] is None:
+            raise SdfFormatError(f"Block {block.get('name', '')} is not a plain variable.")
+        data = np.ndarray(
+            shape=tuple(block["dims"]),
+            dtype=np.dtype(block["dtype"]),
+            buffer=mapping,
+            offset=block["data_location"],
+            order="F",
+        )
+        values[key] = np.array(data[points])
+    return values
@@ -0,0 +1,916 @@
+from functools import lru_cache
+import numpy as np
+
+try:
+    import scipy.fft as _fft
+except ImportError:
+    _fft = None
+
+window_names = ["boxcar", "hann", "blackman-harris", "tukey", "gaussian"]
+
+
+def rfft(data, axis=0, workers=None, n=None):
+    """
+    Computes the real FFT of the data, using scipy.fft (and its workers) if available.
+
+    Parameters
+    ----------
+    data : array_like
+        Real data.
+    axis : int, optional
+        Axis along which the FFT is computed, by default 0
+    workers : int, optional
+        Number of threads used by scipy.fft, by default None which means one.
+        Negative values count from the number of CPUs, eg. -1 means all of them.
+        Ignored if scipy is not installed.
+    n : int, optional
+        Length of the FFT, by default None which means the length of the data.
+        Longer FFTs zero pad the data.
+
+    Returns
+    -------
+    np.ndarray
+        The complex FFT.
+    """
+    if _fft is not None:
+        return _fft.rfft(data, n=n, axis=axis, workers=workers)
+    return np.fft.rfft(data, n=n, axis=axis)
+
+
+def rfft2(data, workers=None):
+    """
+    Computes the real 2D FFT over the last two axes, using scipy.fft (and its workers) if available.
+
+    The leading axes are a batch, eg. of snapshots, which scipy.fft splits
+    over its `workers` threads.
+
+    Parameters
+    ----------
+    data : array_like
+        Real data of shape (..., nx, ny).
+    workers : int, optional
+        Number of threads used by scipy.fft, by default None which means one.
+        Ignored if scipy is not installed.
+
+    Returns
+    -------
+    np.ndarray
+        The complex FFT of shape (..., nx, ny // 2 + 1).
+    """
+    if _fft is not None:
+        return _fft.rfft2(data, axes=(-2, -1), workers=workers)
+    return np.fft.rfft2(data, axes=(-2, -1))
+
+
+def get_window(window, size):
+    """
+    Gets the values of a window function, used to apodize the time series.
+
+    Parameters
+    ----------
+    window : str, tuple or array_like
+        The window function, one of "boxcar", "hann", "blackman-harris",
+        "tukey" (with alpha = 0.5) and "gaussian", or ("tukey", alpha), or the
+        values of the window. None means "boxcar", ie. no window.
+    size : int
+        Number of samples.
+
+    Returns
+    -------
+    np.ndarray
+        The window.
+    """
+    if window is None:
+        window = "boxcar"
+    alpha = 0.5
+    if isinstance(window, tuple):
+        window, alpha = window
+    if isinstance(window, str):
+        x = np.arange(size)
+        if window == "boxcar":
+            return np.ones(size)
+        if window == "hann":
+            return np.hanning(size)
+        if window == "blackman-harris":
+            phase = 2 * np.pi * x / max(size - 1, 1)
+            return (
+                0.35875
+                - 0.48829 * np.cos(phase)
+                + 0.14128 * np.cos(2 * phase)
+                - 0.01168 * np.cos(3 * phase)
+            )
+        if window == "tukey":
+            # Flat top with cosine tapers over a fraction alpha of the samples
+            if alpha <= 0:
+                return np.ones(size)
+            position = x / max(size - 1, 1)
+            edge = np.minimum(position, 1 - position)
+            taper = 0.5 * (1 - np.cos(2 * np.pi * edge / alpha))
+            return np.where(edge < alpha / 2, taper, 1.0)
+        if window == "gaussian":
+            # Gabor transform, the window falls to exp(-2) at its edges
+            x = x - (size - 1) / 2
+            return np.exp(-0.5 * (x / (size / 4)) ** 2)
+        raise ValueError(
+            f"Unknown window {window}. Available windows are: {', '.join(window_names)}."
+        )
+    window = np.asarray(window, dtype=float)
+    if window.shape != (size,):
+        raise ValueError(f"Window should have {size} values, not {window.shape}.")
+    return window
+
+
+def _is_5_smooth(n):
+    for factor in (2, 3, 5):
+        while n % factor == 0:
+            n //= factor
+    return n == 1
+
+
+def fft_length(n, pad=None):
+    """
+    Gets the length of the FFT of `n` samples, zero padded for speed.
+
+    Parameters
+    ----------
+    n : int
+        Number of samples.
+    pad : str or int, optional
+        The padding, by default None which means no padding.
+        - "pow2": the next power of two.
+        - "fast": the next 5-smooth number (a product of 2, 3 and 5), which
+          costs much less padding than "pow2" and is as fast.
+        - int: this length (if it is not smaller than `n`).
+
+    Returns
+    -------
+    int
+        The length of the FFT.
+    """
+    if pad is None:
+        return n
+    if pad == "pow2":
+        return 1 << max(int(n) - 1, 0).bit_length()
+    if pad == "fast":
+        if _fft is not None:
+            return _fft.next_fast_len(n, real=True)
+        while not _is_5_smooth(n):
+            n += 1
+        return n
+    if isinstance(pad, (int, np.integer)):
+        if pad < n:
+            raise ValueError(f"Length of the FFT ({pad}) should not be smaller than {n}.")
+        return int(pad)
+    raise ValueError(f"Unknown padding {pad}. Use None, 'pow2', 'fast' or an integer.")
+
+
+@lru_cache(maxsize=64)
+def frequency_axis(n_fft, omega_max):
+    """
+    Gets the frequencies of a real FFT of length `n_fft`.
+
+    The axes are cached, so the returned array is read-only.
+
+    Parameters
+    ----------
+    n_fft : int
+        Length of the FFT.
+    omega_max : float
+        Sampling frequency in units of the laser frequency.
+
+    Returns
+    -------
+    np.ndarray
+        The frequencies from 0 to the Nyquist frequency, in units of the laser frequency.
+    """
+    omega = np.fft.rfftfreq(n_fft) * omega_max
+    omega.flags.writeable = False
+    return omega
+
+
+def spectrum(data, omega_max, window=None, pad=None, axis=0, workers=None):
+    """
+    Computes the one sided spectrum of real time series.
+
+    This is the spectral core used by all the spectra of the package: the
+    data is apodized with `window`, zero padded to a fast length and
+    transformed with a real FFT, so no time is spent on the negative
+    frequencies.
+
+    Parameters
+    ----------
+    data : array_like
+        Real time series.
+    omega_max : float
+        Sampling frequency of the time series in units of the laser frequency,
+        ie. `2 * pi / (dump_dt * omega0)`.
+    window : str, tuple or array_like, optional
+        The window function (see `get_window`), by default None which means no window.
+    pad : str or int, optional
+        The zero padding (see `fft_length`), by default None which means no padding.
+    axis : int, optional
+        The time axis, by default 0
+    workers : int, optional
+        Number of threads used by scipy.fft, by default None
+
+    Returns
+    -------
+    np.ndarray, np.ndarray
+        The complex spectrum along `axis` and the frequencies in units of the
+        laser frequency.
+    """
+    data = np.asarray(data)
+    n = data.shape[axis]
+    if window is not None:
+        shape = [1] * data.ndim
+        shape[axis] = n
+        data = data * get_window(window, n).reshape(shape)
+    n_fft = fft_length(n, pad)
+    values = rfft(data, axis=axis, workers=workers, n=n_fft)
+    return values, frequency_axis(n_fft, float(omega_max))
+
+
+def resample_uniform(data, times, n=None, axis=0):
+    """
+    Resamples time series sampled at irregular times onto a uniform grid.
+
+    The interpolation is linear. The positions of the grid points are found
+    once with a binary search and applied to all the time series together.
+
+    Parameters
+    ----------
+    data : array_like
+        The time series, sampled at `times` along `axis`.
+    times : array_like
+        The increasing sample times.
+    n : int, optional
+        Number of points of the uniform grid, by default None which means the
+        number of samples.
+    axis : int, optional
+        The time axis, by default 0
+
+    Returns
+    -------
+    np.ndarray, np.ndarray
+        The resampled data and the uniform grid, from the first to the last time.
+    """
+    data = np.asarray(data)
+    times = np.asarray(times, dtype=float)
+    if data.shape[axis] != len(times):
+        raise ValueError(
+            f"Time axis of the data ({data.shape[axis]}) should match the number of times ({len(times)})."
+        )
+    if np.any(np.diff(times) <= 0):
+        raise ValueError("Times should be strictly increasing.")
+    if n is None:
+        n = len(times)
+    grid = np.linspace(times[0], times[-1], n)
+    index = np.clip(np.searchsorted(times, grid, side="right") - 1, 0, len(times) - 2)
+    weight = (grid - times[index]) / (times[index + 1] - times[index])
+    shape = [1] * data.ndim
+    shape[axis] = n
+    weight = weight.reshape(shape)
+    lower = np.take(data, index, axis=axis)
+    upper = np.take(data, index + 1, axis=axis)
+    return lower + weight * (upper - lower), grid
+
+
+def nudft(data, times, omega, axis=0, block_size=256):
+    """
+    Computes the Fourier transform of time series sampled at irregular times.
+
+    The transform is evaluated directly at the requested frequencies, with
+    trapezoidal weights for the samples, and scaled to match the FFT of
+    uniformly sampled data. The frequencies are handled in blocks to bound
+    the memory used.
+
+    Parameters
+    ----------
+    data : array_like
+        The time series, sampled at `times` along `axis`.
+    times : array_like
+        The sample times in tau.
+    omega : array_like
+        The frequencies in units of the laser frequency.
+    axis : int, optional
+        The time axis, by default 0
+    block_size : int, optional
+        Number of frequencies computed together, by default 256
+
+    Returns
+    -------
+    np.ndarray
+        The complex spectrum, with `axis` replaced by the frequencies.
+    """
+    data = np.moveaxis(np.asarray(data), axis, 0)
+    times = np.asarray(times, dtype=float)
+    omega = np.asarray(omega, dtype=float)
+    # Trapezoidal weights, normalized by the mean time step
+    steps = np.diff(times)
+    weights = np.zeros(len(times))
+    weights[:-1] += steps / 2
+    weights[1:] += steps / 2
+    weights /= steps.mean()
+    # The ends have half weights in the trapezoidal rule, but full ones in a DFT
+    weights[0] *= 2
+    weights[-1] *= 2
+    flat = (data * weights.reshape((-1,) + (1,) * (data.ndim - 1))).reshape(
+        len(times), -1
+    )
+
+    result = np.empty((len(omega), flat.shape[1]), dtype=complex)
+    relative = times - times[0]
+    for start in range(0, len(omega), block_size):
+        block = omega[start : start + block_size]
+        kernel = np.exp(-2j * np.pi * block[:, np.newaxis] * relative[np.newaxis, :])
+        result[start : start + block_size] = kernel @ flat
+    result = result.reshape((len(omega),) + data.shape[1:])
+    return np.moveaxis(result, 0, axis)
+
+
+def spectrum_at_times(
+    data,
+    times,
+    window=None,
+    pad=None,
+    axis=0,
+    method="resample",
+    workers=None,
+):
+    """
+    Computes the one sided spectrum of time series using their true sample times.
+
+    Dumps written every `dt_snapshot` are not exactly regular, and assuming
+    they are smears the peaks of the high harmonics. The times (eg. the dump
+    times read from the sdf headers) are used either to resample the data
+    onto a uniform grid before the FFT, or directly in a non-uniform DFT.
+
+    Parameters
+    ----------
+    data : array_like
+        The time series, sampled at `times` along `axis`.
+    times : array_like
+        The sample times in tau.
+    window : str, tuple or array_like, optional
+        The window function (see `get_window`), by default None
+    pad : str or int, optional
+        The zero padding (see `fft_length`), by default None
+    axis : int, optional
+        The time axis, by default 0
+    method : str, optional
+        "resample" (linear resampling and FFT) or "nudft" (non-uniform DFT,
+        exact but O(n_time * n_freq)), by default "resample"
+    workers : int, optional
+        Number of threads used by scipy.fft, by default None
+
+    Returns
+    -------
+    np.ndarray, np.ndarray
+        The complex spectrum along `axis` and the frequencies in units of the
+        laser frequency.
+    """
+    times = np.asarray(times, dtype=float)
+    n = len(times)
+    # Sampling frequency of the mean time step, in units of the laser frequency
+    omega_max = (n - 1) / (times[-1] - times[0])
+    if method == "resample":
+        data, _ = resample_uniform(data, times, axis=axis)
+        return spectrum(data, omega_max, window, pad, axis=axis, workers=workers)
+    if method == "nudft":
+        data = np.asarray(data)
+        if window is not None:
+            shape = [1] * data.ndim
+            shape[axis] = n
+            data = data * get_window(window, n).reshape(shape)
+        omega = frequency_axis(fft_length(n, pad), float(omega_max))
+        return nudft(data, times, omega, axis=axis), omega
+    raise ValueError(f"Unknown method {method}. Use 'resample' or 'nudft'.")
+
+
+def power_spectra(data, omega_max, workers=None, window=None, pad=None):
+    """
+    Computes the power spectrum of the time series of every node in one batched FFT.
+
+    Parameters
+    ----------
+    data : array_like
+        The data of shape (time, nodes).
+    omega_max : float
+        Sampling frequency of the time series in units of the laser frequency,
+        ie. `2 * pi / (dump_dt * omega0)`.
+    workers : int, optional
+        Number of threads used by scipy.fft, by default None
+    window : str, tuple or array_like, optional
+        The window function (see `get_window`), by default None
+    pad : str or int, optional
+        The zero padding (see `fft_length`), by default None
+
+    Returns
+    -------
+    np.ndarray, np.ndarray
+        The power |FFT|^2 of shape (nodes, frequencies) and the frequencies in
+        units of the laser frequency.
+    """
+    data = np.asarray(data)
+    if data.ndim == 1:
+        data = data[:, np.newaxis]
+    values, omega = spectrum(data, omega_max, window, pad, axis=0, workers=workers)
+    power = values.real**2 + values.imag**2
+    return np.ascontiguousarray(power.T), omega
+
+
+def stft(
+    data,
+    omega_max,
+    window_size=64,
+    hop=8,
+    n_fft=None,
+    window="hann",
+    t0=0.0,
+    workers=None,
+):
+    """
+    Computes the short time Fourier (or Gabor) transform of one or many time series.
+
+    The windows are strided views of the data, so all of them are transformed
+    in one batched FFT without copying the time series window by window.
+
+    Examples
+    --------
+    >>> spectrogram, times, omega = stft(probes["Ey"][0], omega_max)
+    >>> plt.imshow(
+    ...     spectrogram,
+    ...     extent=[times[0], times[-1], omega[0], omega[-1]],
+    ...     origin="lower",
+    ...     aspect="auto",
+    ... )
+
+    Parameters
+    ----------
+    data : array_like
+        The time series along the last axis, eg. (n_probes, n_time).
+    omega_max : float
+        Sampling frequency of the time series in units of the laser frequency.
+        The time step is then `1 / omega_max` in units of tau.
+    window_size : int, optional
+        Number of samples of every window, by default 64
+    hop : int, optional
+        Number of samples between the starts of consecutive windows, by default 8
+    n_fft : int, optional
+        Length of the FFT, by default None which means `window_size`. Larger
+        values zero pad the windows, which interpolates the spectra.
+    window : str, tuple or array_like, optional
+        The window function (see `get_window`), eg. "gaussian" for a Gabor
+        transform, by default "hann"
+    t0 : float, optional
+        Time of the first sample in tau, by default 0.0
+    workers : int, optional
+        Number of threads used by scipy.fft, by default None
+
+    Returns
+    -------
+    np.ndarray, np.ndarray, np.ndarray
+        The spectrogram |STFT|^2 of shape (..., n_freq, n_windows), the time of
+        the centre of every window in tau and the frequencies in units of omega0.
+    """
+    data = np.asarray(data)
+    n_time = data.shape[-1]
+    if window_size > n_time:
+        raise ValueError(
+            f"Window size ({window_size}) should not be larger than the time series ({n_time})."
+        )
+    if n_fft is None:
+        n_fft = window_size
+    if n_fft < window_size:
+        raise ValueError(
+            f"n_fft ({n_fft}) should not be smaller than the window size ({window_size})."
+        )
+
+    windows = np.lib.stride_tricks.sliding_window_view(data, window_size, axis=-1)
+    windows = windows[..., ::hop, :]
+    windows = windows * get_window(window, window_size)
+    spectrum = rfft(windows, axis=-1, workers=workers, n=n_fft)
+    spectrogram = spectrum.real**2 + spectrum.imag**2
+    starts = np.arange(spectrum.shape[-2]) * hop
+    times = t0 + (starts + (window_size - 1) / 2) / omega_max
+    omega = frequency_axis(n_fft, float(omega_max))
+    return np.swapaxes(spectrogram, -1, -2), times, omega
+
+
+def harmonic_yields(power, omega, orders=None, bandwidth=0.5, fundamental=1.0):
+    """
+    Integrates the spectral power in a band around every harmonic order.
+
+    The band of order n covers `n * fundamental ± bandwidth * fundamental`.
+    The integration is a single matrix product, so any number of nodes (or
+    runs sharing the same omega axis) are handled at once.
+
+    Parameters
+    ----------
+    power : array_like
+        The power spectra of shape (..., n_freq), eg. (nodes, n_freq) as
+        returned by `power_spectra`.
+    omega : array_like
+        The frequencies of the spectra, evenly spaced.
+    orders : array_like, optional
+        The harmonic orders, by default None which means the odd orders up to
+        the maximum frequency of the spectra.
+    bandwidth : float, optional
+        Half width of the bands in units of the fundamental frequency, by default 0.5
+    fundamental : float, optional
+        The fundamental frequency in the units of `omega`, by default 1.0. For
+        oblique incidence spectra in units of omega0, this is the frequency of
+        the M frame in units of omega0.
+
+    Returns
+    -------
+    np.ndarray, np.ndarray
+        The yields of shape (n_orders, ...), eg. (harmonic order, node), and the orders.
+    """
+    power = np.asarray(power)
+    omega = np.asarray(omega)
+    if power.shape[-1] != len(omega):
+        raise ValueError(
+            f"Last axis of the power ({power.shape[-1]}) should match the length of omega ({len(omega)})."
+        )
+    if orders is None:
+        orders = np.arange(1, int(omega[-1] / fundamental) + 1, 2)
+    orders = np.asarray(orders)
+    d_omega = omega[1] - omega[0] if len(omega) > 1 else 1.0
+
+    centers = orders[:, np.newaxis] * fundamental
+    bands = np.abs(omega[np.newaxis, :] - centers) <= bandwidth * fundamental
+    yields = np.tensordot(bands.astype(power.dtype), power, axes=([1], [-1]))
+    return yields * d_omega, orders
+
+
+def harmonic_cutoffs(
+    power,
+    omega,
+    orders=None,
+    bandwidth=0.5,
+    fundamental=1.0,
+    noise_floor=None,
+    snr=10.0,
+    noise_band=0.2,
+):
+    """
+    Finds the highest harmonic order whose power stands above the noise floor.
+
+    The mean power in the band of every order (see `harmonic_yields`) is
+    compared with `snr` times the noise floor, so single noisy frequencies do
+    not move the cutoff. Any number of spectra sharing the omega axis, eg.
+    (runs, nodes), are handled at once.
+
+    Parameters
+    ----------
+    power : array_like
+        The power spectra of shape (..., n_freq).
+    omega : array_like
+        The frequencies of the spectra, evenly spaced.
+    orders : array_like, optional
+        The harmonic orders, by default None which means the odd orders up to
+        the maximum frequency of the spectra.
+    bandwidth : float, optional
+        Half width of the bands in units of the fundamental frequency, by default 0.5
+    fundamental : float, optional
+        The fundamental frequency in the units of `omega`, by default 1.0
+    noise_floor : float or array_like, optional
+        The mean power of the noise, broadcast against `power.shape[:-1]`, by
+        default None which means that it is estimated from the median power of
+        the highest `noise_band` fraction of the frequencies.
+    snr : float, optional
+        Ratio of the band power to the noise floor needed for a harmonic, by default 10.0
+    noise_band : float, optional
+        Fraction of the highest frequencies used to estimate the noise floor, by default 0.2
+
+    Returns
+    -------
+    np.ndarray, np.ndarray
+        The cutoff orders of shape `power.shape[:-1]` (NaN if no harmonic is
+        above the floor) and the noise floors.
+    """
+    power = np.asarray(power)
+    omega = np.asarray(omega)
+    yields, orders = harmonic_yields(power, omega, orders, bandwidth, fundamental)
+    if len(orders) == 0:
+        raise ValueError("At least one harmonic order is needed to find the cutoff.")
+    d_omega = omega[1] - omega[0] if len(omega) > 1 else 1.0
+    centers = orders[:, np.newaxis] * fundamental
+    widths = (np.abs(omega[np.newaxis, :] - centers) <= bandwidth * fundamental).sum(axis=1)
+    shape = (len(orders),) + (1,) * (power.ndim - 1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        band_power = yields / (np.maximum(widths, 1) * d_omega).reshape(shape)
+
+    if noise_floor is None:
+        start = int(len(omega) * (1 - noise_band))
+        start = min(start, len(omega) - 1)
+        # The median of exponentially distributed noise power is ln(2) times its mean
+        noise_floor = np.median(power[..., start:], axis=-1) / np.log(2)
+    noise_floor = np.broadcast_to(np.asarray(noise_floor, dtype=float), power.shape[:-1])
+
+    above = band_power > snr * noise_floor
+    # The highest order above the floor, found from the last True of every spectrum
+    last = len(orders) - 1 - np.argmax(above[::-1], axis=0)
+    cutoffs = np.where(above.any(axis=0), orders[last], np.nan)
+    return cutoffs, noise_floor
+
+
+def harmonic_phases(
+    data,
+    omega_max,
+    orders=None,
+    bandwidth=0.5,
+    fundamental=1.0,
+    window=None,
+    pad=None,
+    t0=0.0,
+    workers=None,
+):
+    """
+    Computes the spectral phase, group delay and chirp of every harmonic order.
+
+    Amplitude and phase come from a single real FFT of all the time series.
+    The phase differences between neighbouring frequencies are taken from
+    `S[k + 1] * conj(S[k])`, which needs no unwrapping, and their cumulative
+    sum is the unwrapped spectral phase. The group delay of every pair of
+    frequencies is `-dphi / (2 pi d_omega)` (modulo the length of the FFT) and, in the band of every order,
+    is averaged with the weights `|S[k + 1] S[k]|`, so the noise between the
+    harmonics does not contribute. The chirp is the slope of the group delay
+    in the band, from a weighted linear fit.
+
+    Examples
+    --------
+    >>> result, orders = harmonic_phases(probes["Ey"], omega_max, orders=[3, 5, 7, 9])
+    >>> attochirp = np.gradient(result["group_delay"], orders, axis=0)
+
+    Parameters
+    ----------
+    data : array_like
+        The time series along the last axis, eg. (n_runs, n_nodes, n_time).
+        Runs of different lengths should be zero padded to a common length,
+        eg. with an int `pad`.
+    omega_max : float
+        Sampling frequency of the time series in units of the laser frequency.
+        The time step is then `1 / omega_max` in units of tau.
+    orders : array_like, optional
+        The harmonic orders, by default None which means the odd orders up to
+        the Nyquist frequency.
+    bandwidth : float, optional
+        Half width of the bands in units of the fundamental frequency, by default 0.5
+    fundamental : float, optional
+        The fundamental frequency in units of omega0, by default 1.0
+    window : str, tuple or array_like, optional
+        The window function (see `get_window`), by default None
+    pad : str or int, optional
+        The zero padding (see `fft_length`), by default None
+    t0 : float, optional
+        Time of the first sample in tau, by default 0.0
+    workers : int, optional
+        Number of threads used by scipy.fft, by default None
+
+    Returns
+    -------
+    dict, np.ndarray
+        The results, each of shape (n_orders,) + `data.shape[:-1]`, and the orders:
+        - "power": spectral power integrated over the band, as `harmonic_yields`.
+        - "phase": unwrapped spectral phase at the centre of the band in
+          radians, relative to the first sample.
+        - "group_delay": emission time of the harmonic in tau.
+        - "chirp": derivative of the group delay with respect to the frequency
+          in tau per omega0, ie. the group delay dispersion inside the band.
+    """
+    data = np.asarray(data)
+    values, omega = spectrum(data, omega_max, window, pad, axis=-1, workers=workers)
+    if len(omega) < 2:
+        raise ValueError("At least 3 samples are needed to compute the group delay.")
+    if orders is None:
+        orders = np.arange(1, int(omega[-1] / fundamental) + 1, 2)
+    orders = np.asarray(orders)
+    d_omega = omega[1] - omega[0]
+
+    cross = values[..., 1:] * np.conj(values[..., :-1])
+    d_phase = np.angle(cross)
+    weights = np.abs(cross)
+    phase = np.empty(values.shape)
+    phase[..., 0] = np.angle(values[..., 0])
+    phase[..., 1:] = phase[..., :1] + np.cumsum(d_phase, axis=-1)
+    # Delays are measured from the centre of the FFT window and shifted back,
+    # so that they lie in [0, n_fft / omega_max) instead of wrapping at half of it
+    delays = (np.pi - np.angle(-cross)) / (2 * np.pi * d_omega)
+
+    # Weighted sums over the band of every order, as in `harmonic_yields`
+    centers = orders[:, np.newaxis] * fundamental
+    midpoints = (omega[1:] + omega[:-1]) / 2
+    bands = (np.abs(midpoints - centers) <= bandwidth * fundamental).astype(float)
+    offsets = midpoints - centers
+
+    def band_sum(array, moment=0):
+        return np.tensordot(bands * offsets**moment, array, axes=([1], [-1]))
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        total = band_sum(weights)
+        mean_offset = band_sum(weights, 1) / total
+        group_delay = band_sum(weights * delays) / total
+        variance = band_sum(weights, 2) / total - mean_offset**2
+        covariance = band_sum(weights * delays, 1) / total - mean_offset * group_delay
+        chirp = np.where(variance > 0, covariance / variance, np.nan)
+        # Group delay at the centre of the band
+        group_delay = np.where(
+            np.isfinite(chirp), group_delay - chirp * mean_offset, group_delay
+        )
+
+    center_bins = np.clip(np.rint(centers[:, 0] / d_omega).astype(int), 0, len(omega) - 1)
+    power = values.real**2 + values.imag**2
+    result = {
+        "power": harmonic_yields(power, omega, orders, bandwidth, fundamental)[0],
+        "phase": np.moveaxis(phase[..., center_bins], -1, 0),
+        "group_delay": t0 + group_delay,
+        "chirp": chirp,
+    }
+    return result, orders
+
+
+class HarmonicTracker:
+    """
+    Tracks the spectral power at a few harmonic orders, one sample at a time.
+
+    Every order keeps a Goertzel accumulator per point, so adding a sample costs
+    O(n_orders) per point and the whole time series is never stored. The
+    coefficients can be read at any time, eg. while a run is still in progress,
+    and equal the DFT of the samples seen so far at the harmonic frequencies.
+
+    Examples
+    --------
+    >>> tracker = HarmonicTracker([1, 3, 5], omega_max=ez.calculated_parameters["omega_max"])
+    >>> for time_node, snapshot in ez.iter_snapshots(["Ey"]):
+    ...     tracker.update(snapshot["Ey"][[4000, 8000]])
+    >>> tracker.power()
+
+    Parameters
+    ----------
+    orders : array_like
+        The harmonic orders to track.
+    omega_max : float
+        Sampling frequency of the time series in units of the laser frequency.
+    fundamental : float, optional
+        The fundamental frequency in units of the laser frequency, by default 1.0
+    """
+
+    def __init__(self, orders, omega_max, fundamental=1.0):
+        self.orders = np.asarray(orders)
+        self.omega_max = omega_max
+        self.fundamental = fundamental
+        # Frequencies in radians per sample
+        self.omega = 2 * np.pi * self.orders * fundamental / omega_max
+        self.count = 0
+        self.__coefficient = 2 * np.cos(self.omega)
+        self.__s1 = None
+        self.__s2 = None
+
+    def __str__(self):
+        return f"HarmonicTracker for orders {self.orders.tolist()} after {self.count} samples"
+
+    def __repr__(self):
+        return f"HarmonicTracker({self.orders.tolist()}, {self.omega_max})"
+
+    def update(self, sample):
+        """
+        Adds the next sample of the time series.
+
+        Parameters
+        ----------
+        sample : float or array_like
+            The value at every tracked point.
+        """
+        sample = np.atleast_1d(np.asarray(sample, dtype=float))
+        if self.__s1 is None:
+            self.__s1 = np.zeros((len(self.orders), len(sample)))
+            self.__s2 = np.zeros((len(self.orders), len(sample)))
+        s0 = sample + self.__coefficient[:, np.newaxis] * self.__s1 - self.__s2
+        self.__s2 = self.__s1
+        self.__s1 = s0
+        self.count += 1
+
+    def coefficients(self):
+        """
+        Gets the DFT of the samples seen so far at the harmonic frequencies.
+
+        Returns
+        -------
+        np.ndarray
+            Complex coefficients of shape (n_orders, n_points).
+        """
+        if self.__s1 is None:
+            raise ValueError("No samples have been added to the tracker.")
+        omega = self.omega[:, np.newaxis]
+        y = self.__s1 - np.exp(-1j * omega) * self.__s2
+        return y * np.exp(-1j * omega * (self.count - 1))
+
+    def power(self):
+        """
+        Gets the power |DFT|^2 at the harmonic frequencies, of shape (n_orders, n_points).
+        """
+        s1, s2 = self.__s1, self.__s2
+        if s1 is None:
+            raise ValueError("No samples have been added to the tracker.")
+        coefficient = self.__coefficient[:, np.newaxis]
+        return s1**2 + s2**2 - coefficient * s1 * s2
+
+
+class SpectrumStatistics:
+    """
+    Accumulates the mean and the spread of power spectra over batches of time series.
+
+    Every batch is transformed in one FFT and merged into running means and
+    sums of squared deviations (Chan's pairwise update), so the spectra of
+    any number of cells are averaged while only one batch is held in memory.
+
+    Examples
+    --------
+    >>> statistics = SpectrumStatistics(ez.calculated_parameters["omega_max"])
+    >>> for y in range(0, 4000, 500):
+    ...     statistics.update(line[:, y : y + 500])
+    >>> mean, std = statistics.mean(), statistics.std()
+
+    Parameters
+    ----------
+    omega_max : float
+        Sampling frequency of the time series in units of the laser frequency.
+    window : str, tuple or array_like, optional
+        The window function (see `get_window`), by default None
+    pad : str or int, optional
+        The zero padding (see `fft_length`), by default None
+    workers : int, optional
+        Number of threads used by scipy.fft, by default None
+    """
+
+    def __init__(self, omega_max, window=None, pad=None, workers=None):
+        self.omega_max = omega_max
+        self.window = window
+        self.pad = pad
+        self.workers = workers
+        self.count = 0
+        self.omega = None
+        self.__mean = None
+        self.__m2 = None
+
+    def __str__(self):
+        return f"SpectrumStatistics of {self.count} time series"
+
+    def __repr__(self):
+        return f"SpectrumStatistics({self.omega_max})"
+
+    def update(self, data):
+        """
+        Adds a batch of time series.
+
+        Parameters
+        ----------
+        data : array_like
+            The time series of shape (time, ..., cells). The statistics are
+            taken over the last axis, the axes in between are kept.
+        """
+        data = np.asarray(data)
+        if data.ndim < 2:
+            raise ValueError(
+                f"The batch should have the shape (time, ..., cells). You entered a batch of shape {data.shape}."
+            )
+        n = data.shape[-1]
+        if n == 0:
+            return
+        values, omega = spectrum(
+            data, self.omega_max, self.window, self.pad, axis=0, workers=self.workers
+        )
+        power = values.real**2 + values.imag**2
+        mean = power.mean(axis=-1)
+        m2 = ((power - mean[..., np.newaxis]) ** 2).sum(axis=-1)
+        if self.__mean is None:
+            self.omega = omega
+            self.__mean, self.__m2, self.count = mean, m2, n
+            return
+        if mean.shape != self.__mean.shape:
+            raise ValueError(
+                f"The batch gives spectra of shape {mean.shape}, but the previous ones were {self.__mean.shape}."
+            )
+        total = self.count + n
+        delta = mean - self.__mean
+        self.__mean += delta * (n / total)
+        self.__m2 += m2 + delta**2 * (self.count * n / total)
+        self.count = total
+
+    def mean(self):
+        """
+        Gets the mean power spectrum, of shape (..., n_freq).
+        """
+        if self.__mean is None:
+            raise ValueError("No time series have been added.")
+        return np.moveaxis(self.__mean, 0, -1)
+
+    def std(self):
+        """
+        Gets the standard deviation of the power spectra, of shape (..., n_freq).
+        """
+        if self.__mean is None:
+            raise ValueError("No time series have been added.")
+        return np.moveaxis(np.sqrt(self.__m2 / self.count), 0, -1)
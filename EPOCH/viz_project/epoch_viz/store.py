@@ -0,0 +1,231 @@
+import json
+import os
+import numpy as np
+
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+
+
+def file_signatures(files):
+    """
+    Gets the signature (name, modification time and size) of every file.
+
+    Parameters
+    ----------
+    files : list
+        List of file paths.
+
+    Returns
+    -------
+    list
+        List of [name, mtime, size] for every file.
+    """
+    signatures = []
+    for file in files:
+        stat = os.stat(file)
+        signatures.append([os.path.basename(file), stat.st_mtime, stat.st_size])
+    return signatures
+
+
+class NodeMajorStore:
+    """
+    A persistent, node-major store of the fields of a run directory.
+
+    EPOCH writes one sdf file per snapshot, so the data on disk is time-major.
+    The store keeps one `.npy` file per field with shape (space, time), which
+    means that the time series of every node is contiguous on disk. The files
+    are opened as memory maps, so slicing a node or a window costs no reads of
+    the sdf files at all. The snapshots of 2D runs are flattened to (x * y,)
+    nodes and the fields are reshaped back to (time, x, y) when opened.
+
+    A manifest records the name, modification time and size of every sdf file
+    the store was built from. If any of these change, the store is invalid and
+    has to be rebuilt.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def __str__(self):
+        return f"NodeMajorStore object for {self.directory}"
+
+    def __repr__(self):
+        return f"NodeMajorStore({self.directory})"
+
+    def __manifest_path(self):
+        return os.path.join(self.directory, MANIFEST_NAME)
+
+    def __field_path(self, data_type):
+        return os.path.join(self.directory, f"{data_type}.npy")
+
+    def read_manifest(self):
+        """
+        Reads the manifest of the store.
+
+        Returns
+        -------
+        dict or None
+            The manifest, or None if the store does not exist.
+        """
+        try:
+            with open(self.__manifest_path(), "r") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if manifest.get("version") != MANIFEST_VERSION:
+            return None
+        return manifest
+
+    def manifest_signature(self):
+        """
+        Gets the modification time, inode and size of the manifest, which change
+        whenever the store is built.
+
+        Returns
+        -------
+        tuple or None
+            The signature, or None if the store does not exist.
+        """
+        try:
+            stat = os.stat(self.__manifest_path())
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_ino, stat.st_size)
+
+    def is_valid(self, files):
+        """
+        Checks whether the store was built from exactly these sdf files.
+        """
+        manifest = self.read_manifest()
+        if manifest is None:
+            return False
+        return manifest["files"] == file_signatures(files)
+
+    def available_fields(self, files):
+        """
+        Gets the fields which are stored and valid for the given sdf files.
+        """
+        if not self.is_valid(files):
+            return []
+        manifest = self.read_manifest()
+        return [
+            data_type
+            for data_type in manifest["fields"]
+            if os.path.isfile(self.__field_path(data_type))
+        ]
+
+    def build(
+        self,
+        files,
+        data_types,
+        read_snapshot,
+        buffer_size=256,
+        progress=None,
+        buffer_bytes=1024**3,
+    ):
+        """
+        Builds (or extends) the store for the given fields.
+
+        Parameters
+        ----------
+        files : list
+            Sorted list of sdf files of the run.
+        data_types : list
+            Fields to be stored.
+        read_snapshot : callable
+            Function taking a file and the list of data types and returning a
+            dictionary of 1D or 2D arrays, reading the file only once.
+        buffer_size : int, optional
+            Number of snapshots gathered in memory before being written to the
+            store, by default 256. The writes are then contiguous along time.
+        progress : callable, optional
+            Wrapper for the iterator over the snapshots, eg. `tqdm.tqdm`.
+        buffer_bytes : int, optional
+            Maximum memory used by the buffers, by default 1 GiB. The number
+            of snapshots gathered is reduced for large (eg. 2D) snapshots.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        signatures = file_signatures(files)
+        manifest = self.read_manifest()
+        if manifest is None or manifest["files"] != signatures:
+            manifest = {"version": MANIFEST_VERSION, "files": signatures, "fields": {}}
+        # Fields being (re)built are invalid until the build is finished
+        for data_type in data_types:
+            manifest["fields"].pop(data_type, None)
+        self.__write_manifest(manifest)
+
+        first = read_snapshot(files[0], data_types)
+        n_time = len(files)
+        stores = {}
+        for data_type in data_types:
+            n_space = first[data_type].size
+            stores[data_type] = np.lib.format.open_memmap(
+                self.__field_path(data_type),
+                mode="w+",
+                dtype=first[data_type].dtype,
+                shape=(n_space, n_time),
+            )
+
+        snapshot_bytes = sum(first[data_type].nbytes for data_type in data_types)
+        buffer_size = max(1, min(buffer_size, buffer_bytes // max(snapshot_bytes, 1)))
+        starts = range(0, n_time, buffer_size)
+        if progress is not None:
+            starts = progress(starts, desc="Rechunking Data...")
+        for start in starts:
+            end = min(start + buffer_size, n_time)
+            buffers = {
+                data_type: np.empty(
+                    (end - start, stores[data_type].shape[0]),
+                    dtype=stores[data_type].dtype,
+                )
+                for data_type in data_types
+            }
+            for i in range(start, end):
+                snapshot = first if i == 0 else read_snapshot(files[i], data_types)
+                for data_type in data_types:
+                    buffers[data_type][i - start] = np.ravel(snapshot[data_type])
+            for data_type in data_types:
+                stores[data_type][:, start:end] = buffers[data_type].T
+
+        for data_type in data_types:
+            stores[data_type].flush()
+            manifest["fields"][data_type] = {
+                "shape": list(stores[data_type].shape),
+                "dtype": stores[data_type].dtype.str,
+                "grid_shape": list(first[data_type].shape),
+            }
+        del stores
+        # The manifest is written last, so an interrupted build is never valid
+        self.__write_manifest(manifest)
+
+    def __write_manifest(self, manifest):
+        temp_path = self.__manifest_path() + ".tmp"
+        with open(temp_path, "w") as f:
+            json.dump(manifest, f)
+        os.replace(temp_path, self.__manifest_path())
+
+    def field(self, data_type):
+        """
+        Gets a field of the store.
+
+        Parameters
+        ----------
+        data_type : str
+            The field to get.
+
+        Returns
+        -------
+        np.ndarray
+            Read-only memory mapped array of shape (time, space), or (time, x, y)
+            for 2D runs. It is a transposed view of the node-major data, so
+            slicing it copies nothing.
+        """
+        data = np.load(self.__field_path(data_type), mmap_mode="r").T
+        manifest = self.read_manifest()
+        grid_shape = None
+        if manifest is not None and data_type in manifest["fields"]:
+            grid_shape = manifest["fields"][data_type].get("grid_shape")
+        if grid_shape is not None and len(grid_shape) > 1:
+            # Splitting the space axis is a view of the memory map
+            data = data.reshape((data.shape[0],) + tuple(grid_shape))
+        return data
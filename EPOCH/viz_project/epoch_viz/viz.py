@@ -6,6 +6,36 @@ import sdf
 import re
 import glob
 import tqdm
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+from .store import NodeMajorStore
+from .cache import LRUCache
+from .cube_cache import CubeCache, nearest_index
+from .field import FieldHandle
+from .sdf_reader import (
+    SdfFormatError,
+    read_block,
+    read_block_headers,
+    read_mesh,
+    read_points,
+)
+from .index import SdfIndex
+from .kspace import angular_histogram, kspace_power
+from .lineouts import BilinearSampler
+from .prefetch import Prefetcher
+from .pulses import attosecond_pulses
+from .reductions import SnapshotReduction, trapezoid_weights, tree_merge
+from .spectra import (
+    HarmonicTracker,
+    SpectrumStatistics,
+    fft_length,
+    harmonic_phases,
+    harmonic_yields,
+    power_spectra,
+    spectrum,
+    spectrum_at_times,
+    stft,
+)
 
 plt.rcParams["font.size"] = 14
 
@@ -82,6 +112,17 @@ class InvalidSpaceError(EpochException):
         self.message = message
 
 
+class DimensionError(EpochException):
+    """Exception raised for methods which do not support the dimensions of the run.
+
+    Attributes:
+        message -- explanation of the error
+    """
+
+    def __init__(self, message):
+        self.message = message
+
+
 # universal constants
 m = 9.10938356e-31  # mass of electron in kg
 e = 1.60217662e-19  # charge of electron in C
@@ -91,6 +132,9 @@ epsilon = 8.85418781e-12  # permittivity of free space in F/m
 kb = 1.38064852e-23  # Boltzmann constant in J/K
 na = 6.02214076e23  # Avogadro constant in mol^-1
 
+# loads with at least this many values per data type use float32 by default
+large_load_elements = 10**7
+
 transformation_dictionary = {
     "Ex": "Electric Field/Ex",
     "Ey": "Electric Field/Ey",
@@ -106,6 +150,15 @@ transformation_dictionary = {
     "N": "Derived/Number_Density",
 }
 
+# fields derived from a pair of the fields above as (field + sign * c * partner) / 2,
+# which separates the waves travelling along +x (incident) and -x (reflected)
+derived_dictionary = {
+    "Ey_incident": ("Ey", "Bz", 1),
+    "Ey_reflected": ("Ey", "Bz", -1),
+    "Ez_incident": ("Ez", "By", -1),
+    "Ez_reflected": ("Ez", "By", 1),
+}
+
 deck_info_map = {
     "LAMBD": "Wavelength (m)",
     "LAS_TIME": "Laser Width (tau)",
@@ -116,6 +169,10 @@ deck_info_map = {
     "NX": "Number of Grid Points",
     "X_MIN": "Minimum X (wavelength)",
     "X_MAX": "Maximum X (wavelength)",
+    "NY": "Number of Grid Points in Y",
+    "Y_MIN": "Minimum Y (wavelength)",
+    "Y_MAX": "Maximum Y (wavelength)",
+    "ANGLE": "Angle of Incidence (rad)",
     "THICKNESS": "Thickness of Plasma (wavelength)",
     "PPC": "Particles per Cell",
     "START": "Start Position of Plasma (wavelength)",
@@ -134,19 +191,329 @@ calculated_parameters_map = {
     "vth": "Thermal Velocity (m/s)",
     "box_size": "Box Size (m)",
     "dx": "Grid Spacing (m)",
+    "box_size_y": "Box Size in Y (m)",
+    "dy": "Grid Spacing in Y (m)",
     "dt": "Time Step (s)",
     "runtime": "Run Time (s)",
     "omega_max": "Maximum Resolvable Omega (omega0)",
 }
 
 
+def _read_blocks(file, block_names):
+    """
+    Reads a sdf file only once and returns the data of all the requested blocks.
+
+    Parameters
+    ----------
+    file : str
+        Path of the sdf file.
+    block_names : list
+        Names of the blocks inside the sdf file, eg. "Electric Field/Ey".
+
+    Returns
+    -------
+    dict
+        Dictionary with the block names as keys and the block data as values.
+    """
+    raw_data = sdf.read(file, dict=True)
+    return {block_name: raw_data[block_name].data for block_name in block_names}
+
+
+def _raw_data_types(data_types):
+    """
+    Gets the data types which have to be read from the files to get `data_types`,
+    replacing every derived field by the two fields it is computed from.
+    """
+    raw_data_types = []
+    for data_type in data_types:
+        if data_type in derived_dictionary:
+            field, partner, _ = derived_dictionary[data_type]
+            components = [field, partner]
+        else:
+            components = [data_type]
+        for component in components:
+            if component not in raw_data_types:
+                raw_data_types.append(component)
+    return raw_data_types
+
+
+def _derive_fields(raw, data_types):
+    """
+    Computes the requested data types from the raw fields of a snapshot.
+
+    The derived fields are combined in a single buffer of the size of the
+    snapshot, so no copy of the fields they are computed from is made.
+
+    Parameters
+    ----------
+    raw : dict
+        Dictionary with the raw data types as keys and the data as values.
+    data_types : list
+        List of data types to be returned, which may include derived fields.
+
+    Returns
+    -------
+    dict
+        Dictionary with the data types as keys and the data as values.
+    """
+    snapshot = {}
+    for data_type in data_types:
+        if data_type not in derived_dictionary:
+            snapshot[data_type] = raw[data_type]
+            continue
+        field, partner, sign = derived_dictionary[data_type]
+        data = np.multiply(raw[partner], sign * c)
+        data += raw[field]
+        data *= 0.5
+        snapshot[data_type] = data
+    return snapshot
+
+
+def _read_window(file, data_types, window, headers=None):
+    """
+    Reads a window of the requested data types using the block offsets of the sdf file.
+
+    Only the headers of the file are parsed (or none at all if the block
+    `headers` are given), the data is returned as memory mapped views covering
+    just the window.
+    """
+    if headers is None:
+        headers = read_block_headers(file)
+    return {
+        data_type: read_block(file, headers[transformation_dictionary[data_type]], window)
+        for data_type in data_types
+    }
+
+
+def _read_snapshot(file, data_types, window=None, headers=None):
+    """
+    Reads all the requested data types from a sdf file, reading it only once.
+
+    Parameters
+    ----------
+    file : str
+        Path of the sdf file.
+    data_types : list
+        List of data types to be read.
+    window : slice or tuple of slices, optional
+        Contiguous window of nodes to be read, by default None which means the
+        whole grid. If provided, only the window is read from the file.
+    headers : dict, optional
+        Block headers of the file (eg. from the `SdfIndex`), used to locate the
+        window without parsing the headers again.
+
+    Returns
+    -------
+    dict
+        Dictionary with the data types as keys and the data as values.
+    """
+    raw_data_types = _raw_data_types(data_types)
+    if raw_data_types != list(data_types):
+        # Derived fields are computed from the fields read in the same pass
+        raw = _read_snapshot(file, raw_data_types, window, headers)
+        return _derive_fields(raw, data_types)
+    if window is not None:
+        try:
+            return _read_window(file, data_types, window, headers)
+        except (SdfFormatError, KeyError):
+            # Fall back to reading the whole file with the sdf module
+            pass
+    blocks = _read_blocks(
+        file, [transformation_dictionary[data_type] for data_type in data_types]
+    )
+    snapshot = {}
+    for data_type in data_types:
+        data = blocks[transformation_dictionary[data_type]]
+        snapshot[data_type] = data if window is None else data[window]
+    return snapshot
+
+
+def _read_probes(file, data_types, points, headers=None):
+    """
+    Reads the values of the requested data types at a few points of a sdf file.
+
+    If the block `headers` are given, only the pages of the file holding the
+    points are read. Otherwise the whole file is read with the sdf module.
+    """
+    raw_data_types = _raw_data_types(data_types)
+    if raw_data_types != list(data_types):
+        raw = _read_probes(file, raw_data_types, points, headers)
+        return _derive_fields(raw, data_types)
+    if headers is not None:
+        try:
+            return read_points(
+                file,
+                {
+                    data_type: headers[transformation_dictionary[data_type]]
+                    for data_type in data_types
+                },
+                points,
+            )
+        except (SdfFormatError, KeyError):
+            pass
+    snapshot = _read_snapshot(file, data_types)
+    return {data_type: np.array(snapshot[data_type][points]) for data_type in data_types}
+
+
+def _normalize_data(data_type, data, nc):
+    """
+    Normalizes the data of a single snapshot.
+
+    Densities are normalized by the critical density `nc` while fields are
+    normalized by their maximum value. Writable arrays are normalized in place.
+    """
+    if data_type in ["Ne", "N"]:
+        scale = nc + 1e-10
+    else:
+        scale = data.max() + 1e-10
+    if (
+        isinstance(data, np.ndarray)
+        and not isinstance(data, np.memmap)
+        and data.flags.writeable
+        and np.issubdtype(data.dtype, np.floating)
+    ):
+        data /= scale
+        return data
+    return data / scale
+
+
+def _load_chunk(
+    files,
+    rows,
+    data_types,
+    space_nodes,
+    outputs,
+    window=None,
+    headers=None,
+):
+    """
+    Loads a chunk of sdf files and writes them directly into shared output arrays.
+
+    This is the function run by every worker of the parallel loader.
+
+    Parameters
+    ----------
+    files : list
+        The sdf files to be read.
+    rows : list
+        Row of the output arrays corresponding to each of the files.
+    data_types : list
+        List of data types to be loaded.
+    space_nodes : array_like or tuple
+        Space nodes to be loaded, eg. a tuple of x and y nodes for 2D runs.
+    outputs : dict
+        Dictionary with the data types as keys and (name, shape, dtype) of the
+        shared memory blocks as values.
+    window : slice or tuple of slices, optional
+        If provided, only this window (which must be equal to `space_nodes`)
+        is read from the files. Otherwise only the values at `space_nodes` are read.
+    headers : list, optional
+        Block headers of each of the files.
+
+    Returns
+    -------
+    int, dict
+        Number of files loaded and the maximum of every data type over the
+        loaded rows, used to normalize the whole cube.
+    """
+    shms = {}
+    arrays = {}
+    for data_type, (name, shape, dtype) in outputs.items():
+        shms[data_type] = shared_memory.SharedMemory(name=name)
+        arrays[data_type] = np.ndarray(
+            shape, dtype=dtype, buffer=shms[data_type].buf
+        )
+    try:
+        if headers is None:
+            headers = [None] * len(files)
+        maxima = {data_type: -np.inf for data_type in data_types}
+        for row, file, file_headers in zip(rows, files, headers):
+            if window is None:
+                snapshot = _read_probes(file, data_types, space_nodes, file_headers)
+            else:
+                snapshot = _read_snapshot(file, data_types, window, file_headers)
+            for data_type in data_types:
+                array_row = arrays[data_type][row]
+                array_row[...] = snapshot[data_type]
+                if array_row.size > 0:
+                    maxima[data_type] = max(maxima[data_type], array_row.max())
+    finally:
+        # The arrays must be released before the shared memory can be closed
+        arrays.clear()
+        for shm in shms.values():
+            shm.close()
+    return len(rows), maxima
+
+
+def _reduce_chunk(files, weights, data_types, window=None, headers=None):
+    """
+    Reduces a shard of consecutive sdf files over time.
+
+    This is the function run by every worker of the parallel reductions.
+
+    Parameters
+    ----------
+    files : list
+        The sdf files of the shard.
+    weights : list
+        The time weight of each of the files.
+    data_types : list
+        List of data types to be reduced.
+    window : slice or tuple of slices, optional
+        Contiguous window of nodes to be read, by default None which means the whole grid.
+    headers : list, optional
+        Block headers of each of the files.
+
+    Returns
+    -------
+    dict
+        Dictionary with the data types as keys and their `SnapshotReduction` as values.
+    """
+    if headers is None:
+        headers = [None] * len(files)
+    reductions = {data_type: SnapshotReduction() for data_type in data_types}
+    for file, weight, file_headers in zip(files, weights, headers):
+        snapshot = _read_snapshot(file, data_types, window, file_headers)
+        for data_type in data_types:
+            reductions[data_type].update(snapshot[data_type], weight)
+    return reductions
+
+
 class EpochViz:
-    def __init__(self, directory, save_directory=os.curdir):
+    def __init__(
+        self,
+        directory,
+        save_directory=os.curdir,
+        cache_directory=None,
+        chunk_cache_bytes=512 * 1024**2,
+        use_index=True,
+        cube_cache_bytes=1024**3,
+    ):
         self.directory = directory
         self.save_directory = save_directory
         self.__checks()
         self.files = glob.glob(os.path.join(self.directory, "*.sdf"))
         self.files.sort()
+        if cache_directory is None:
+            cache_directory = os.path.join(self.directory, "node_major_cache")
+        self.cache_directory = cache_directory
+        self.store = NodeMajorStore(cache_directory)
+        self.__stored = None
+        self.chunk_cache = LRUCache(chunk_cache_bytes)
+        self.cube_cache = CubeCache(
+            lambda data_type, time_slice, space_slice: self.__load_block(
+                data_type, np.arange(time_slice.start, time_slice.stop), space_slice
+            ),
+            max_bytes=cube_cache_bytes,
+        )
+        self.index = None
+        if use_index:
+            try:
+                self.index = SdfIndex(self.directory, self.files)
+            except SdfFormatError:
+                print("Could not index the headers of the sdf files.")
+        self.__grid = None
+        self.dimensions = self.__find_dimensions()
         self.__everything_calculated = False
         self.data = {}
         self.info()
@@ -191,22 +558,109 @@ class EpochViz:
         else:
             return None
 
+    def __find_deck_value(self, text, *infos):
+        """
+        Finds the first of the `infos` which has a value in the input deck.
+
+        The 2D decks set the control block from constants (eg. `nx = cells_x`),
+        so the names of the constants are given as fallbacks.
+        """
+        for info in infos:
+            value = self.__find_value(text=text, info=info)
+            if value is not None:
+                return value
+        return None
+
+    def __find_angle(self, text):
+        """
+        Finds the angle of incidence `upper_theta = a*pi/b` (in radians) of the input deck.
+        """
+        angle_regex = re.compile(
+            r"\supper_theta\s*=\s*(\d*)\s*\*?\s*pi\s*(?:/\s*(\d+))?"
+        )
+        match = angle_regex.search(text)
+        if not match:
+            return 0.0
+        numerator, denominator = match.groups()
+        return int(numerator or 1) * pi / int(denominator or 1)
+
+    def __find_dimensions(self):
+        """
+        Finds the number of dimensions of the run from the grid of the sdf files.
+        """
+        if self.index is not None:
+            grid = self.index.blocks(0).get("Grid/Grid")
+            if grid is not None and grid["dims"] is not None:
+                return len(grid["dims"])
+        if os.path.isfile(os.path.join(self.directory, "epoch2d.dat")):
+            return 2
+        with open(os.path.join(self.directory, "input.deck"), "r") as f:
+            text = f.read()
+        if re.search(r"^\s*ny\s*=", text, re.MULTILINE):
+            return 2
+        return 1
+
+    def __grid_edges(self):
+        """
+        Reads the edges of the cells (in m) along every axis from the "Grid/Grid" mesh.
+        """
+        headers = self.__block_headers(0)
+        if headers is not None and "Grid/Grid" in headers:
+            try:
+                return read_mesh(self.files[0], headers["Grid/Grid"])
+            except SdfFormatError:
+                pass
+        return tuple(sdf.read(self.files[0]).Grid_Grid.data)
+
+    def grid(self):
+        """
+        Gets the position of the nodes along every axis, from the "Grid/Grid" mesh of the sdf files.
+
+        The positions are the centres of the cells, in units of lambda. For 2D
+        runs, the positions of the probe points and windows are measured on
+        these axes.
+
+        Returns
+        -------
+        tuple of np.ndarray
+            The positions (x,) for 1D or (x, y) for 2D runs.
+        """
+        if self.__grid is None:
+            lambd = self.deck_info["LAMBD"]
+            self.__grid = tuple(
+                (edges[1:] + edges[:-1]) / 2 / lambd for edges in self.__grid_edges()
+            )
+        return self.__grid
+
     def __find_available_data(self):
         """
         Finds the available data in the sdf files.
+
+        The fields which can be derived from the available data are kept
+        separately, in `self.available_derived`.
         """
-        data = sdf.read(self.files[0], dict=True)
+        if self.index is not None:
+            data = self.index.blocks(0)
+        else:
+            data = sdf.read(self.files[0], dict=True)
 
         found_data = []
         for key, value in transformation_dictionary.items():
             if value in data.keys():
                 found_data.append(key)
+        self.available_derived = [
+            key
+            for key, (field, partner, _) in derived_dictionary.items()
+            if field in found_data and partner in found_data
+        ]
 
         self.available_data = found_data
         return found_data
 
     def __get_run_info(self):
-        with open(os.path.join(self.directory, "epoch1d.dat"), "r") as f:
+        with open(
+            os.path.join(self.directory, f"epoch{self.dimensions}d.dat"), "r"
+        ) as f:
             run_info = f.readlines()
             last_line = run_info[-1]
 
@@ -221,19 +675,24 @@ class EpochViz:
 
         LAMBD = self.__find_value(text=text, info="lambda0") * 1e-6
         LAS_TIME = int(self.__find_value(text=text, info="las_time"))
-        T_MAX = int(self.__find_value(text=text, info="t_end"))
-        DT = self.__find_value(text=text, info="dt_snapshot") * 1e-15
+        T_MAX = int(self.__find_deck_value(text, "t_end", "simulation_end"))
+        DT = self.__find_deck_value(text, "dt_snapshot", "snapshot_freq") * 1e-15
         A0 = self.__find_value(text=text, info="a0")
         FACTOR = int(self.__find_value(text=text, info="factor"))
-        NX = int(self.__find_value(text=text, info="nx"))
-        X_MIN = -int(self.__find_value(text=text, info="x_min"))
-        try:
-            X_MAX = int(self.__find_value(text=text, info="x_max"))
-        except:
-            X_MAX = -X_MIN
-        THICKNESS = int(self.__find_value(text=text, info="thickness"))
-        PPC = int(self.__find_value(text=text, info="nparticles_per_cell"))
-        START = int(self.__find_value(text=text, info="start"))
+        NX = int(self.__find_deck_value(text, "nx", "cells_x"))
+        if self.dimensions == 2:
+            # The box of 2D runs is read from the grid, its origin is not at x_min
+            x, y = self.__grid_edges()
+            X_MIN, X_MAX = float(x[0] / LAMBD), float(x[-1] / LAMBD)
+        else:
+            X_MIN = -int(self.__find_value(text=text, info="x_min"))
+            try:
+                X_MAX = int(self.__find_value(text=text, info="x_max"))
+            except:
+                X_MAX = -X_MIN
+        THICKNESS = int(self.__find_deck_value(text, "thickness", "thickness_x"))
+        PPC = int(self.__find_deck_value(text, "nparticles_per_cell", "ppc"))
+        START = int(self.__find_deck_value(text, "start", "start_x"))
         TEMP = int(self.__find_value(text=text, info="temp"))
 
         deck_info = {
@@ -251,6 +710,11 @@ class EpochViz:
             "START": START,
             "TEMP": TEMP,
         }
+        if self.dimensions == 2:
+            deck_info["NY"] = int(self.__find_deck_value(text, "ny", "cells_y"))
+            deck_info["Y_MIN"] = float(y[0] / LAMBD)
+            deck_info["Y_MAX"] = float(y[-1] / LAMBD)
+            deck_info["ANGLE"] = self.__find_angle(text)
         self.deck_info = deck_info
         return deck_info
 
@@ -290,6 +754,9 @@ class EpochViz:
         # runtime
         runtime = deck_info["T_MAX"] * tau
         dt = runtime / iterations
+        if self.dimensions == 2:
+            box_size_y = (deck_info["Y_MAX"] - deck_info["Y_MIN"]) * lambd
+            dy = box_size_y / deck_info["NY"]
 
         ## FFT Related
         dump_dt = self.deck_info["DT"]
@@ -312,6 +779,9 @@ class EpochViz:
             "vth": vth,
             "omega_max": omega_max,
         }
+        if self.dimensions == 2:
+            parameters["box_size_y"] = box_size_y
+            parameters["dy"] = dy
         self.calculated_parameters = parameters
         return parameters
 
@@ -331,10 +801,57 @@ class EpochViz:
         box_size = self.deck_info["X_MAX"] - self.deck_info["X_MIN"]
         return int(lam * NX / box_size)
 
+    def __block_headers(self, time_node):
+        """
+        Gets the block headers of a time node from the index, if available.
+        """
+        if self.index is None:
+            return None
+        return self.index.blocks(time_node)
+
+    def get_dump_times(self):
+        """
+        Gets the simulation time of every dump (in tau) from the sdf headers.
+
+        Returns
+        -------
+        np.ndarray or None
+            The dump times, or None if the headers are not indexed.
+        """
+        if self.index is None:
+            return None
+        return self.index.times() / self.calculated_parameters["tau"]
+
+    def __node_times(self):
+        """
+        Gets the time (in tau) of every time node from the dump times, with the
+        end of the run as the time of the node `len(self.files)`.
+
+        The end of the run is T_MAX. A last dump within half a dump step of
+        T_MAX is the dump at the end of the run (and is clipped to T_MAX, as
+        the dump times are rounded), and if the last dump is later than that,
+        the end is one dump step after it.
+        """
+        dump_times = self.get_dump_times()
+        if dump_times is None:
+            return None
+        end = self.deck_info["T_MAX"]
+        step = dump_times[-1] - dump_times[-2] if len(dump_times) > 1 else end
+        if dump_times[-1] > end + step / 2:
+            end = dump_times[-1] + step
+        else:
+            dump_times = np.minimum(dump_times, end)
+        return np.append(dump_times, end)
+
     def __time_node_to_time(self, time_node):
         """
         Converts time_node to time.
+
+        If the headers are indexed, the time is interpolated between the dump times.
         """
+        node_times = self.__node_times()
+        if node_times is not None:
+            return np.interp(time_node, np.arange(len(node_times)), node_times)
         t_max = self.deck_info["T_MAX"]
         num_files = len(self.files)
         dt = t_max / num_files
@@ -343,7 +860,16 @@ class EpochViz:
     def __time_to_time_node(self, time):
         """
         Converts time to time_node.
+
+        The node is the last one at or before `time`, and the times after the
+        end of the run give `len(self.files)`, so that the exclusive end of a
+        time range can include the last dump. If the headers are indexed, the
+        node is found with a binary search over the dump times.
         """
+        node_times = self.__node_times()
+        if node_times is not None:
+            node = int(np.searchsorted(node_times, time, side="right")) - 1
+            return min(max(node, 0), len(self.files))
         t_max = self.deck_info["T_MAX"]
         num_files = len(self.files)
         dt = t_max / num_files
@@ -388,31 +914,68 @@ class EpochViz:
     def print_info(self):
         print(self.info())
 
-    def get_data(self, data_type="Ey", time_node=0, normalize=False):
-        """
-        Gets data from the directory.
+    def get_snapshot(
+        self, data_types=["Ey"], time_node=0, normalize=False, window=None
+    ):
         """
+        Gets all the requested data of a time node, reading the sdf file only once.
 
-        if data_type not in self.available_data:
-            raise DataNotFoundError(
-                f"Data {data_type} is not available in the sdf files. Please check the input.deck. Available data are: {self.available_data}"
-            )
+        Parameters
+        ----------
+        data_types : list, optional
+            List of data types to be read, by default ["Ey"]
+        time_node : int, optional
+            Time node (index of the sdf file) to read, by default 0
+        normalize : bool, optional
+            Whether to normalize the data or not, by default False. Fields are
+            normalized by the maximum of this snapshot over the whole grid,
+            unlike `load_data` which uses the maximum of all the loaded data.
+        window : slice or tuple of slices, optional
+            Contiguous window of space nodes to be read, by default None which
+            means the whole grid. If provided, only the window is read from the
+            file using the block offsets and (unless normalized) the data is
+            returned as a memory mapped view. Fields can not be normalized by
+            their maximum with a window, so they are read fully in that case.
+
+        Returns
+        -------
+        dict
+            Dictionary with the data types as keys and the data as values.
+        """
+        for data_type in data_types:
+            if data_type not in self.available_data + self.available_derived:
+                raise DataNotFoundError(
+                    f"Data {data_type} is not available in the sdf files. Please check the input.deck. Available data are: {self.available_data + self.available_derived}"
+                )
 
         if time_node >= len(self.files):
             raise InvalidTimeError(
                 f"No sdf file with time_node {time_node} is available. Maximum time_node is {len(self.files) - 1}."
             )
 
-        file = self.files[time_node]
-        raw_data = sdf.read(file, dict=True)
-        raw_data = raw_data[transformation_dictionary[data_type]]
-        data = raw_data.data
+        if window is not None and normalize:
+            if any(data_type not in ["Ne", "N"] for data_type in data_types):
+                snapshot = self.get_snapshot(data_types, time_node, normalize)
+                return {
+                    data_type: data[window] for data_type, data in snapshot.items()
+                }
+        snapshot = _read_snapshot(
+            self.files[time_node], data_types, window, self.__block_headers(time_node)
+        )
         if normalize:
-            if data_type in ["Ne", "N"]:
-                data = data / (self.calculated_parameters["nc"] + 1e-10)
-            else:
-                data = data / (max(data) + 1e-10)
-        return data
+            for data_type in data_types:
+                snapshot[data_type] = _normalize_data(
+                    data_type, snapshot[data_type], self.calculated_parameters["nc"]
+                )
+        return snapshot
+
+    def get_data(self, data_type="Ey", time_node=0, normalize=False):
+        """
+        Gets data from the directory.
+        """
+        return self.get_snapshot(
+            data_types=[data_type], time_node=time_node, normalize=normalize
+        )[data_type]
 
     def __get_correct_time_range(self, time_range, are_nodes):
         if time_range is None:
@@ -520,9 +1083,89 @@ class EpochViz:
             space_range = (space_range[0], max_space)
         return space_range
 
+    def __get_axis_window(self, axis, space_range, are_nodes):
+        """
+        Converts the range of one axis of a 2D run into a slice of nodes.
+
+        An int is a single node, a float a single position in lambda and a
+        tuple a (start, end) range, in nodes or in lambda depending on `are_nodes`.
+        """
+        n = len(axis)
+        if isinstance(space_range, (int, np.integer)):
+            node = min(max(int(space_range), 0), n - 1)
+            return slice(node, node + 1)
+        if isinstance(space_range, float):
+            node = nearest_index(axis, space_range)
+            return slice(node, node + 1)
+        start, end = space_range
+        if not are_nodes:
+            start, end = nearest_index(axis, start), nearest_index(axis, end)
+        if start > end:
+            raise InvalidSpaceError(
+                f"Invalid space range. The first element of the space range should be less than the second element. You entered {space_range}."
+            )
+        return slice(max(int(start), 0), min(int(end), n))
+
+    def __get_space_nodes_2d(self, space_range, are_nodes):
+        """
+        Converts the space range of a 2D run into nodes.
+
+        The space range is either a window `(x_range, y_range)`, where every
+        range is as in `__get_axis_window`, or a list of (x, y) points given as
+        ints (nodes) or floats (lambda). None means the whole grid.
+
+        Returns
+        -------
+        tuple, tuple or np.ndarray, tuple or np.ndarray
+            The index of the nodes in a snapshot, which is a tuple of slices for
+            windows and a tuple of (x_nodes, y_nodes) arrays for points. Then the
+            nodes, as a tuple of the x and y nodes for windows and an array of
+            shape (n_points, 2) for points, and their positions in lambda.
+        """
+        x, y = self.grid()
+        if space_range is None:
+            space_range = ((0, len(x)), (0, len(y)))
+            are_nodes = True
+        if isinstance(space_range, tuple):
+            if len(space_range) != 2:
+                raise InvalidSpaceError(
+                    f"The space range of a 2D run should be a (x_range, y_range) window or a list of (x, y) points. You entered {space_range}."
+                )
+            index = (
+                self.__get_axis_window(x, space_range[0], are_nodes),
+                self.__get_axis_window(y, space_range[1], are_nodes),
+            )
+            nodes = tuple(np.arange(window.start, window.stop) for window in index)
+            return index, nodes, (x[index[0]], y[index[1]])
+
+        points = np.asarray(space_range)
+        if points.ndim != 2 or points.shape[1] != 2:
+            raise InvalidSpaceError(
+                f"The points of a 2D run should be a list of (x, y) pairs. You entered {space_range}."
+            )
+        if np.issubdtype(points.dtype, np.integer):
+            nodes = points.astype(int)
+        else:
+            nodes = np.stack(
+                [
+                    [nearest_index(axis, value) for value in points[:, i]]
+                    for i, axis in enumerate((x, y))
+                ],
+                axis=1,
+            )
+        if np.any(nodes < 0) or np.any(nodes >= [len(x), len(y)]):
+            raise InvalidSpaceError(
+                f"The points should be inside the grid of {len(x)} x {len(y)} nodes. You entered {space_range}."
+            )
+        index = (nodes[:, 0], nodes[:, 1])
+        return index, nodes, np.stack([x[index[0]], y[index[1]]], axis=1)
+
     def __get_correct_time_nodes_to_return(self, time_nodes):
         start = time_nodes[0]
         end = time_nodes[-1]
+        dump_times = self.get_dump_times()
+        if dump_times is not None:
+            return dump_times[start : end + 1]
         length = end - start + 1
         start_natural = self.__time_node_to_time(start)
         end_natural = self.__time_node_to_time(end)
@@ -539,141 +1182,757 @@ class EpochViz:
     def __load_data(
         self,
         data_types,
-        normalize,
         time_node,
         space_nodes,
+        window=None,
     ):
         """
         Loads specified data for the particular time node and (list of) space range.
+
+        If `window` is provided, it must cover exactly `space_nodes` and only
+        the window is read from the file. Otherwise `space_nodes` are the
+        points to read, eg. a tuple of x and y nodes for 2D runs.
         """
-        temp_df = {}
-        for data_type in data_types:
-            data = self.get_data(
-                data_type=data_type, time_node=time_node, normalize=normalize
+        if window is None:
+            if time_node >= len(self.files):
+                raise InvalidTimeError(
+                    f"No sdf file with time_node {time_node} is available. Maximum time_node is {len(self.files) - 1}."
+                )
+            return _read_probes(
+                self.files[time_node],
+                data_types,
+                space_nodes,
+                self.__block_headers(time_node),
             )
-            data = data[space_nodes]
-            temp_df[data_type] = data
-        return temp_df
+        snapshot = self.get_snapshot(
+            data_types=data_types,
+            time_node=time_node,
+            window=window,
+        )
+        # Memory maps are read here, so that prefetching threads do the I/O
+        return {data_type: np.array(snapshot[data_type]) for data_type in data_types}
 
-    def __create_time_and_space_nodes(
+    def __load_data_parallel(
         self,
-        time_range,
-        space_range,
-        times_are_nodes,
-        space_are_nodes,
+        data_types,
+        time_nodes,
+        space_nodes,
+        workers,
+        dtype,
+        window=None,
+        space_shape=None,
     ):
+        """
+        Loads the data using a pool of `workers` processes.
 
-        time_range = self.__get_correct_time_range(time_range, times_are_nodes)
-        space_range = self.__get_correct_space_range(space_range, space_are_nodes)
-        return_time_range = False
-        return_space_range = False
-
-        if isinstance(time_range, tuple):
-            time_range = range(time_range[0], time_range[1])
-            return_time_range = True
-        if isinstance(space_range, tuple):
-            space_range = range(space_range[0], space_range[1])
-            return_space_range = True
-
-        space_nodes = np.array(space_range)
-        time_nodes = np.array(time_range)
+        The time nodes are split into chunks which are distributed over the pool.
+        Every worker writes directly into preallocated shared memory arrays, so
+        no data is sent back through the pool.
 
-        return (
-            time_nodes,
-            space_nodes,
-            return_time_range,
-            return_space_range,
-        )
+        The shape of the data of every snapshot is `space_shape`, by default
+        the number of `space_nodes`.
 
-    def load_data(
+        Returns the data and the maximum of every data type.
+        """
+        if max(time_nodes) >= len(self.files):
+            raise InvalidTimeError(
+                f"No sdf file with time_node {max(time_nodes)} is available. Maximum time_node is {len(self.files) - 1}."
+            )
+        if space_shape is None:
+            space_shape = (len(space_nodes),)
+        shape = (len(time_nodes),) + tuple(space_shape)
+        dtype = np.dtype(dtype)
+        shms = {}
+        maxima = {data_type: -np.inf for data_type in data_types}
+        outputs = {}
+        try:
+            for data_type in data_types:
+                shm = shared_memory.SharedMemory(
+                    create=True, size=max(int(np.prod(shape)) * dtype.itemsize, 1)
+                )
+                shms[data_type] = shm
+                outputs[data_type] = (shm.name, shape, dtype.str)
+
+            # More chunks than workers, so that slow files do not stall the pool
+            n_chunks = min(len(time_nodes), workers * 4)
+            chunks = np.array_split(np.arange(len(time_nodes)), n_chunks)
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = [
+                    executor.submit(
+                        _load_chunk,
+                        [self.files[time_nodes[row]] for row in rows],
+                        list(rows),
+                        data_types,
+                        space_nodes,
+                        outputs,
+                        window,
+                        [self.__block_headers(time_nodes[row]) for row in rows],
+                    )
+                    for rows in chunks
+                    if len(rows) > 0
+                ]
+                with tqdm.tqdm(total=len(time_nodes), desc="Loading Data...") as pbar:
+                    for future in as_completed(futures):
+                        n_loaded, chunk_maxima = future.result()
+                        for data_type in data_types:
+                            maxima[data_type] = max(
+                                maxima[data_type], chunk_maxima[data_type]
+                            )
+                        pbar.update(n_loaded)
+
+            data_dict = {}
+            for data_type, shm in shms.items():
+                data_dict[data_type] = np.ndarray(
+                    shape, dtype=dtype, buffer=shm.buf
+                ).copy()
+        finally:
+            for shm in shms.values():
+                shm.close()
+                shm.unlink()
+        return data_dict, maxima
+
+    def __load_data_from_store(
         self,
-        data_types=["Ey"],
-        normalize=False,
-        time_range=None,
-        space_range=None,
-        times_are_nodes=True,
-        space_are_nodes=True,
-        return_data=False,
-        overwrite=False,
+        data_types,
+        time_index,
+        space_index,
+        dtype,
+        stored,
     ):
         """
-        Loads data from the directory and saves as attribute which can be accessed later
+        Loads the data from the node-major store.
 
-        Parameters
-        ----------
-        data_types : list, optional
-            List of data types to be loaded, by default ["Ey"]
-        normalize : bool, optional
-            Whether to normalize the data or not, by default False
+        `time_index` is a slice or an array of time nodes and `space_index` a
+        tuple with the index of every space axis. Ranges are sliced from the
+        memory maps, so if `dtype` is None (or the dtype of the store) the
+        returned arrays are views and nothing is copied. Derived fields which
+        are not in the store are computed from the `stored` fields.
+        """
+        data_dict = {}
+        for data_type in data_types:
+            data = self.__stored_field(data_type, stored, time_index, space_index)
+            if dtype is not None and data.dtype != dtype:
+                data = data.astype(dtype)
+            data_dict[data_type] = data
+        return data_dict
 
-            If True, the data is normalized as:
-            - For field values, the data is normalized by the maximum value of the data.
-            - For density values, the data is normalized by the critical density.
+    def __is_stored(self, data_type, stored):
+        """
+        Checks whether a data type is in the store or can be derived from the stored fields.
+        """
+        if data_type in stored:
+            return True
+        return data_type in derived_dictionary and all(
+            component in stored for component in _raw_data_types([data_type])
+        )
 
-        time_range : int, float, tuple or list, optional
-            Time range to be loaded, by default None which means all the time range.
-            - If int is provided, just that time node is loaded.
-            - If float is provided, the time node closest to the time is loaded.
-            - if list is provided, the nodes in the list are loaded.
-            - If tuple is provided, the range is loaded.
+    def __stored_field(self, data_type, stored, time_index, space_index):
+        """
+        Slices a data type from the store, deriving it from the stored fields if needed.
 
-        space_range : int, float, tuple or list, optional
-            Space range to be loaded, by default None which means all the space range.
-            - If int is provided, just that space node is loaded.
-            - If float is provided, the space node closest to the space is loaded.
-            - If tuple is provided, the range is loaded.
-            - If list is provided, the nodes in the list are loaded.
+        The space axes are indexed first, so that only the selected nodes are
+        gathered when the time nodes are not a range.
+        """
+        index = (slice(None),) + tuple(space_index)
+        if data_type in stored:
+            return self.store.field(data_type)[index][time_index]
+        raw = {
+            component: self.store.field(component)[index][time_index]
+            for component in _raw_data_types([data_type])
+        }
+        return _derive_fields(raw, [data_type])[data_type]
 
-        times_are_nodes : bool, optional
-            Whether to use time nodes or time in tau, by default True which means that use the nodes.
-        space_are_nodes : bool, optional
-            Whether to use space nodes or space in lambda, by default True which means that use the nodes.
-        return_data : bool, optional
-            Whether to return the data or not, by default False
+    def rechunk(self, data_types=None, overwrite=False, buffer_size=256):
+        """
+        Converts the run directory into a node-major store of memory mapped `.npy` files.
+
+        The sdf files are read only once. Later calls to `load_data` with the
+        stored data types are served from the store, which makes the time series
+        of any node (or window of nodes) a cheap memory map slice. The store is
+        invalidated automatically if any of the sdf files is changed.
+
+        Parameters
+        ----------
+        data_types : list, optional
+            List of data types to be stored, by default None which means all the
+            available data except the derived fields, which are computed from the
+            stored fields when they are loaded.
         overwrite : bool, optional
-            Whether to overwrite the data if it is already loaded, by default False
-        Returns
-        -------
-        None or dict
-            If return_data is True, returns the data as a dictionary.
+            Whether to rebuild the data types which are already stored, by default False
+        buffer_size : int, optional
+            Number of snapshots kept in memory before writing to the store, by default 256
         """
+        if data_types is None:
+            data_types = list(self.available_data)
         for data_type in data_types:
-            if data_type not in self.available_data:
+            if data_type not in self.available_data + self.available_derived:
                 raise DataNotFoundError(
-                    f"Data {data_type} is not available in the sdf files. Please check the input.deck. Available data are: {self.available_data}"
+                    f"Data {data_type} is not available in the sdf files. Please check the input.deck. Available data are: {self.available_data + self.available_derived}"
                 )
-        (
-            time_nodes,
-            space_nodes,
-            return_time_range,
-            return_space_range,
-        ) = self.__create_time_and_space_nodes(
-            time_range, space_range, times_are_nodes, space_are_nodes
+        if not overwrite:
+            stored = self.__stored_fields()
+            data_types = [
+                data_type for data_type in data_types if data_type not in stored
+            ]
+        if len(data_types) == 0:
+            print("All the data types are already stored.")
+            return
+        # A window of the whole grid reads the blocks with their offsets, not with the sdf module
+        window = (slice(None),) * self.dimensions
+        headers = {
+            file: self.__block_headers(time_node)
+            for time_node, file in enumerate(self.files)
+        }
+        self.store.build(
+            files=self.files,
+            data_types=data_types,
+            read_snapshot=lambda file, data_types: _read_snapshot(
+                file, data_types, window, headers[file]
+            ),
+            buffer_size=buffer_size,
+            progress=tqdm.tqdm,
         )
-        data_dict = {}
+
+    def __stored_fields(self):
+        """
+        Gets the fields of the store which are valid for the sdf files.
+
+        Checking the store stats every sdf file, so the result is kept and the
+        files are only checked again when the manifest changes, eg. after `rechunk`.
+        """
+        signature = self.store.manifest_signature()
+        if self.__stored is None or self.__stored[0] != signature:
+            self.__stored = (signature, self.store.available_fields(self.files))
+        return list(self.__stored[1])
+
+    def __load_block(self, data_type, time_nodes, space_slice, stored=None):
+        """
+        Loads a block of a single data type for contiguous time nodes and a slice of space.
+
+        `space_slice` is a tuple of slices, one for every axis, for 2D runs.
+        `stored` are the fields of the store, found with `__stored_fields` if None.
+        """
+        if stored is None:
+            stored = self.__stored_fields()
+        window = space_slice if isinstance(space_slice, tuple) else (space_slice,)
+        if self.__is_stored(data_type, stored):
+            return np.asarray(
+                self.__stored_field(
+                    data_type,
+                    stored,
+                    slice(time_nodes[0], time_nodes[-1] + 1),
+                    window,
+                )
+            )
+
+        block = None
+        for i, time_node in enumerate(time_nodes):
+            data = _read_snapshot(
+                self.files[time_node],
+                [data_type],
+                space_slice,
+                self.__block_headers(time_node),
+            )[data_type]
+            if block is None:
+                block = np.empty((len(time_nodes),) + data.shape, dtype=data.dtype)
+            block[i] = data
+        return block
+
+    def field(self, data_type="Ey", chunks=None):
+        """
+        Gets a lazy handle to a field, which loads the data only when sliced.
+
+        The handle is indexed as `handle[time, space]`, or `handle[time, x, y]`
+        for 2D runs, using nodes (int) or natural units (float, tau for time and
+        lambda for space). Only the snapshots and the window needed are read
+        and the loaded chunks are kept in an LRU cache shared by all the handles
+        of this object. The values are not normalized. The node-major store is
+        looked up when the handle is made, so handles made before `rechunk`
+        keep reading the sdf files.
+
+        Examples
+        --------
+        >>> ne = ez.field("Ne")
+        >>> window = ne[25.0:35.0, 19.5:20.5]
+        >>> series = ez.field("Ey")[:, 4000]
+
+        Parameters
+        ----------
+        data_type : str, optional
+            Data type of the field, by default "Ey"
+        chunks : tuple, optional
+            Shape of the chunks in (time, *space) nodes, by default None which
+            means (64, 1024) for 1D and (64, 128, 128) for 2D runs.
+
+        Returns
+        -------
+        FieldHandle
+            The lazy handle.
+        """
+        if data_type not in self.available_data + self.available_derived:
+            raise DataNotFoundError(
+                f"Data {data_type} is not available in the sdf files. Please check the input.deck. Available data are: {self.available_data + self.available_derived}"
+            )
+        if self.dimensions == 1:
+            shape = (len(self.files), self.deck_info["NX"])
+            space_to_node = self.__space_to_space_node
+        else:
+            # The positions of 2D runs are measured on the grid, as for the windows
+            axes = self.grid()
+            shape = (len(self.files),) + tuple(len(axis) for axis in axes)
+            space_to_node = tuple(
+                lambda value, axis=axis: nearest_index(axis, value) for axis in axes
+            )
+        # The store is checked once per handle, not on every chunk
+        stored = self.__stored_fields()
+        return FieldHandle(
+            data_type=data_type,
+            shape=shape,
+            load_block=lambda time_nodes, *space_slice: self.__load_block(
+                data_type,
+                time_nodes,
+                space_slice[0] if len(space_slice) == 1 else space_slice,
+                stored,
+            ),
+            time_to_node=self.__time_to_time_node,
+            space_to_node=space_to_node,
+            cache=self.chunk_cache,
+            chunks=chunks,
+        )
+
+    def __iterate(self, read, time_nodes, prefetch, prefetch_bytes):
+        """
+        Iterates over (time_node, read(time_node)), prefetching if `prefetch` > 0.
+        """
+        if prefetch is None or prefetch < 1:
+            return ((time_node, read(time_node)) for time_node in time_nodes)
+        return Prefetcher(read, time_nodes, depth=prefetch, max_bytes=prefetch_bytes)
+
+    def iter_snapshots(
+        self,
+        data_types=["Ey"],
+        time_range=None,
+        times_are_nodes=True,
+        normalize=False,
+        window=None,
+        prefetch=4,
+        prefetch_bytes=1024**3,
+    ):
+        """
+        Iterates over the snapshots of the run, reading the next ones on background threads.
+
+        While the caller processes a snapshot, up to `prefetch` of the next
+        snapshots are read, overlapping the latency of the file system with
+        the computation.
+
+        Examples
+        --------
+        >>> for time_node, snapshot in ez.iter_snapshots(["Ey", "Bz"], prefetch=8):
+        ...     process(snapshot["Ey"], snapshot["Bz"])
+
+        Parameters
+        ----------
+        data_types : list, optional
+            List of data types to be read, by default ["Ey"]
+        time_range : int, float, tuple or list, optional
+            Time range to iterate over, by default None which means all the time range.
+            Same as the `time_range` of `load_data`.
+        times_are_nodes : bool, optional
+            Whether to use time nodes or time in tau, by default True which means that use the nodes.
+        normalize : bool, optional
+            Whether to normalize the data or not, by default False
+        window : slice or tuple of slices, optional
+            Contiguous window of space nodes to be read, by default None which means the whole grid.
+        prefetch : int, optional
+            Number of snapshots read ahead, by default 4. Use 0 to read serially.
+        prefetch_bytes : int, optional
+            Maximum memory used by the snapshots read ahead, by default 1 GiB
+
+        Yields
+        ------
+        int, dict
+            The time node and the snapshot, as returned by `get_snapshot`.
+        """
+        time_nodes, _, _, _ = self.__create_time_and_space_nodes(
+            time_range, None, times_are_nodes, True
+        )
+
+        def read(time_node):
+            snapshot = self.get_snapshot(data_types, time_node, normalize, window)
+            # Memory maps are read here, so that prefetching threads do the I/O
+            return {
+                data_type: np.array(data) if isinstance(data, np.memmap) else data
+                for data_type, data in snapshot.items()
+            }
+
+        yield from self.__iterate(read, time_nodes, prefetch, prefetch_bytes)
+
+    def reduce_snapshots(
+        self,
+        data_types=["Ey"],
+        time_range=None,
+        times_are_nodes=True,
+        window=None,
+        workers=None,
+        prefetch=4,
+    ):
+        """
+        Reduces the snapshots of the run over time in a single pass, without loading them together.
+
+        For every cell, the maximum of |value|, the mean and variance and the
+        time integral of value^2 (using the dump times, with the trapezoidal
+        rule) are accumulated one snapshot at a time, so the memory used is a
+        few snapshots however many dumps there are. For the electric fields the
+        fluence `c * epsilon * integral` (J/m^2) is returned as well. This gives
+        the emission maps of a whole 2D run, where a cube of all the dumps
+        would not fit in memory.
+
+        Examples
+        --------
+        >>> maps = ez.reduce_snapshots(["Ey_reflected"], workers=8)
+        >>> plt.imshow(maps["Ey_reflected"]["fluence"].T)
+
+        Parameters
+        ----------
+        data_types : list, optional
+            List of data types to be reduced, by default ["Ey"]
+        time_range : int, float, tuple or list, optional
+            Time range to be reduced, by default None which means all the time range.
+            Same as the `time_range` of `load_data`.
+        times_are_nodes : bool, optional
+            Whether to use time nodes or time in tau, by default True which means that use the nodes.
+        window : slice or tuple of slices, optional
+            Contiguous window of space nodes to be read, by default None which means the whole grid.
+        workers : int, optional
+            Number of processes, by default None which means that the files are
+            read serially (with prefetching). With more than one worker, the
+            files are split into consecutive shards which are reduced in
+            parallel and merged pairwise.
+        prefetch : int, optional
+            Number of sdf files read ahead on background threads when reading
+            serially, by default 4. Use 0 to read serially.
+
+        Returns
+        -------
+        dict
+            Dictionary with the data types as keys and dictionaries of the maps
+            "max", "mean", "variance", "integral" (and "fluence" for the electric
+            fields) as values, each of the shape of a (windowed) snapshot.
+        """
         for data_type in data_types:
-            data_dict[data_type] = np.zeros((len(time_nodes), len(space_nodes)))
-        for i, time_node in tqdm.tqdm(
-            enumerate(time_nodes), total=len(time_nodes), desc="Loading Data..."
-        ):
-            temp_df = self.__load_data(
+            if data_type not in self.available_data + self.available_derived:
+                raise DataNotFoundError(
+                    f"Data {data_type} is not available in the sdf files. Please check the input.deck. Available data are: {self.available_data + self.available_derived}"
+                )
+        time_nodes, _, _, _ = self.__create_time_and_space_nodes(
+            time_range, None, times_are_nodes, True
+        )
+        if len(time_nodes) == 0 or max(time_nodes) >= len(self.files):
+            raise InvalidTimeError(
+                f"The time nodes should be between 0 and {len(self.files) - 1}. You entered {time_range}."
+            )
+        dump_times = self.get_dump_times()
+        if dump_times is None:
+            times = time_nodes * self.deck_info["DT"]
+        else:
+            times = dump_times[time_nodes] * self.calculated_parameters["tau"]
+        weights = trapezoid_weights(times)
+
+        if workers is not None and workers > 1 and len(time_nodes) > 1:
+            # More shards than workers, so that slow files do not stall the pool
+            n_shards = min(len(time_nodes), workers * 4)
+            shards = np.array_split(np.arange(len(time_nodes)), n_shards)
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = [
+                    executor.submit(
+                        _reduce_chunk,
+                        [self.files[time_nodes[row]] for row in rows],
+                        weights[rows],
+                        data_types,
+                        window,
+                        [self.__block_headers(time_nodes[row]) for row in rows],
+                    )
+                    for rows in shards
+                ]
+                for future in tqdm.tqdm(
+                    as_completed(futures), total=len(futures), desc="Reducing Data..."
+                ):
+                    future.result()
+            # Merged in the order of the shards, whatever order they finished in
+            reductions = tree_merge([future.result() for future in futures])
+        else:
+            reductions = {data_type: SnapshotReduction() for data_type in data_types}
+            snapshots = self.iter_snapshots(
+                data_types,
+                time_range,
+                times_are_nodes,
+                window=window,
+                prefetch=prefetch,
+            )
+            for i, (_, snapshot) in tqdm.tqdm(
+                enumerate(snapshots), total=len(time_nodes), desc="Reducing Data..."
+            ):
+                for data_type in data_types:
+                    reductions[data_type].update(snapshot[data_type], weights[i])
+
+        maps = {}
+        for data_type in data_types:
+            maps[data_type] = reductions[data_type].results()
+            if data_type.startswith("E"):
+                maps[data_type]["fluence"] = c * epsilon * maps[data_type]["integral"]
+        return maps
+
+    def __create_time_and_space_nodes(
+        self,
+        time_range,
+        space_range,
+        times_are_nodes,
+        space_are_nodes,
+    ):
+
+        time_range = self.__get_correct_time_range(time_range, times_are_nodes)
+        space_range = self.__get_correct_space_range(space_range, space_are_nodes)
+        return_time_range = False
+        return_space_range = False
+
+        if isinstance(time_range, tuple):
+            time_range = range(time_range[0], time_range[1])
+            return_time_range = True
+        if isinstance(space_range, tuple):
+            space_range = range(space_range[0], space_range[1])
+            return_space_range = True
+
+        space_nodes = np.array(space_range)
+        time_nodes = np.array(time_range)
+
+        return (
+            time_nodes,
+            space_nodes,
+            return_time_range,
+            return_space_range,
+        )
+
+    def load_data(
+        self,
+        data_types=["Ey"],
+        normalize=False,
+        time_range=None,
+        space_range=None,
+        times_are_nodes=True,
+        space_are_nodes=True,
+        return_data=False,
+        overwrite=False,
+        workers=None,
+        use_cache=True,
+        prefetch=4,
+        prefetch_bytes=1024**3,
+        dtype=None,
+    ):
+        """
+        Loads data from the directory and saves as attribute which can be accessed later
+
+        Parameters
+        ----------
+        data_types : list, optional
+            List of data types to be loaded, by default ["Ey"]. Besides the fields
+            of the sdf files, the incident and reflected waves "Ey_incident",
+            "Ey_reflected", "Ez_incident" and "Ez_reflected" are computed while
+            the snapshots are read.
+        normalize : bool, optional
+            Whether to normalize the data or not, by default False
+
+            If True, the data is normalized in place as:
+            - For field values, the data is normalized by the maximum value of the
+              loaded data, found with a running reduction while loading. This is
+              a single scale for all the snapshots, unlike `get_snapshot` which
+              normalizes every snapshot by its own maximum.
+            - For density values, the data is normalized by the critical density.
+
+        time_range : int, float, tuple or list, optional
+            Time range to be loaded, by default None which means all the time range.
+            - If int is provided, just that time node is loaded.
+            - If float is provided, the time node closest to the time is loaded.
+            - if list is provided, the nodes in the list are loaded.
+            - If tuple is provided, the range is loaded.
+
+        space_range : int, float, tuple or list, optional
+            Space range to be loaded, by default None which means all the space range.
+            - If int is provided, just that space node is loaded.
+            - If float is provided, the space node closest to the space is loaded.
+            - If tuple is provided, the range is loaded.
+            - If list is provided, the nodes in the list are loaded.
+
+            For 2D runs, the space range is either a window (x_range, y_range),
+            where every range is an int, a float or a tuple as above, or a list
+            of (x, y) points as ints (nodes) or floats (lambda, on the axes of
+            `grid`). Windows are loaded with shape (time, x, y) and points with
+            shape (time, points). The returned space nodes are then the x and
+            y axes of the window or an array of the (x, y) points.
+
+        times_are_nodes : bool, optional
+            Whether to use time nodes or time in tau, by default True which means that use the nodes.
+        space_are_nodes : bool, optional
+            Whether to use space nodes or space in lambda, by default True which means that use the nodes.
+        return_data : bool, optional
+            Whether to return the data or not, by default False
+        overwrite : bool, optional
+            Whether to overwrite the data if it is already loaded, by default False
+        workers : int, optional
+            Number of processes used to read the sdf files, by default None which
+            means that the files are read serially. The result is identical to the
+            serial read.
+        use_cache : bool, optional
+            Whether to use the node-major store created by `rechunk` if all the
+            data types are stored in it, by default True
+        prefetch : int, optional
+            Number of snapshots read ahead on background threads while the
+            current one is processed, by default 4. Use 0 to read serially.
+        prefetch_bytes : int, optional
+            Maximum memory used by the snapshots read ahead, by default 1 GiB
+        dtype : data-type, optional
+            Data type of the loaded arrays, by default None which means float32
+            for loads of at least `large_load_elements` values and float64 otherwise.
+        Returns
+        -------
+        None or dict
+            If return_data is True, returns the data as a dictionary.
+        """
+        for data_type in data_types:
+            if data_type not in self.available_data + self.available_derived:
+                raise DataNotFoundError(
+                    f"Data {data_type} is not available in the sdf files. Please check the input.deck. Available data are: {self.available_data + self.available_derived}"
+                )
+        if self.dimensions == 2:
+            time_nodes, _, return_time_range, _ = self.__create_time_and_space_nodes(
+                time_range, None, times_are_nodes, True
+            )
+            space_index, space_nodes, space_nodes_natural = self.__get_space_nodes_2d(
+                space_range, space_are_nodes
+            )
+            return_space_range = isinstance(space_index[0], slice)
+            window = space_index if return_space_range else None
+            points = space_index
+            space_shape = tuple(len(nodes) for nodes in space_nodes)
+            if not return_space_range:
+                space_shape = (len(space_nodes),)
+        else:
+            (
+                time_nodes,
+                space_nodes,
+                return_time_range,
+                return_space_range,
+            ) = self.__create_time_and_space_nodes(
+                time_range, space_range, times_are_nodes, space_are_nodes
+            )
+            # Contiguous space ranges are read partially, using the block offsets
+            window = None
+            if return_space_range and len(space_nodes) > 0:
+                window = slice(space_nodes[0], space_nodes[-1] + 1)
+            points = space_nodes
+            space_index = (space_nodes if window is None else window,)
+            space_shape = (len(space_nodes),)
+        time_index = time_nodes
+        if return_time_range and len(time_nodes) > 0:
+            time_index = slice(time_nodes[0], time_nodes[-1] + 1)
+
+        n_elements = len(time_nodes) * int(np.prod(space_shape))
+        resolved_dtype = dtype
+        if resolved_dtype is None:
+            if n_elements >= large_load_elements:
+                resolved_dtype = np.float32
+            else:
+                resolved_dtype = np.float64
+
+        maxima = {data_type: -np.inf for data_type in data_types}
+        stored = self.__stored_fields() if use_cache else []
+        if all(self.__is_stored(data_type, stored) for data_type in data_types):
+            data_dict = self.__load_data_from_store(
+                data_types=data_types,
+                time_index=time_index,
+                space_index=space_index,
+                dtype=resolved_dtype if (normalize or dtype is not None) else None,
+                stored=stored,
+            )
+            if normalize and n_elements > 0:
+                for data_type in data_types:
+                    # Views of the read-only memory maps are copied before normalizing
+                    if not data_dict[data_type].flags.writeable:
+                        data_dict[data_type] = np.array(data_dict[data_type])
+                    maxima[data_type] = data_dict[data_type].max()
+        elif workers is not None and workers > 1 and len(time_nodes) > 1:
+            data_dict, maxima = self.__load_data_parallel(
                 data_types=data_types,
-                normalize=normalize,
-                time_node=time_node,
-                space_nodes=space_nodes,
+                time_nodes=time_nodes,
+                space_nodes=points,
+                workers=workers,
+                dtype=resolved_dtype,
+                window=window,
+                space_shape=space_shape,
+            )
+        else:
+            data_dict = {}
+            for data_type in data_types:
+                data_dict[data_type] = np.zeros(
+                    (len(time_nodes),) + space_shape, dtype=resolved_dtype
+                )
+            snapshots = self.__iterate(
+                lambda time_node: self.__load_data(
+                    data_types=data_types,
+                    time_node=time_node,
+                    space_nodes=points,
+                    window=window,
+                ),
+                time_nodes,
+                prefetch,
+                prefetch_bytes,
             )
+            for i, (_, temp_df) in tqdm.tqdm(
+                enumerate(snapshots), total=len(time_nodes), desc="Loading Data..."
+            ):
+                for data_type in data_types:
+                    row = data_dict[data_type][i]
+                    row[...] = temp_df[data_type]
+                    if row.size > 0:
+                        maxima[data_type] = max(maxima[data_type], row.max())
+
+        if normalize and n_elements > 0:
             for data_type in data_types:
-                data_dict[data_type][i] = temp_df[data_type]
+                if data_type in ["Ne", "N"]:
+                    scale = self.calculated_parameters["nc"] + 1e-10
+                else:
+                    scale = maxima[data_type] + 1e-10
+                data_dict[data_type] /= data_dict[data_type].dtype.type(scale)
+
+        if (
+            self.dimensions == 1
+            and not normalize
+            and return_time_range
+            and return_space_range
+            and n_elements > 0
+        ):
+            # Later plots of overlapping windows reuse this load. The cache
+            # keeps its own read-only copy, so the returned data can be modified
+            for data_type in data_types:
+                block = data_dict[data_type]
+                self.cube_cache.put(
+                    data_type,
+                    (time_nodes[0], time_nodes[-1] + 1),
+                    (space_nodes[0], space_nodes[-1] + 1),
+                    block.copy() if block.flags.writeable else block,
+                )
 
         if return_time_range:
             time_nodes_natural = self.__get_correct_time_nodes_to_return(time_nodes)
         else:
             time_nodes_natural = time_nodes
 
-        if return_space_range:
-            space_nodes_natural = self.__get_correct_space_nodes_to_return(space_nodes)
-        else:
-            space_nodes_natural = space_nodes
+        if self.dimensions == 1:
+            if return_space_range:
+                space_nodes_natural = self.__get_correct_space_nodes_to_return(
+                    space_nodes
+                )
+            else:
+                space_nodes_natural = space_nodes
 
         if self.data == {} or overwrite:
             for key in data_dict.keys():
@@ -686,6 +1945,408 @@ class EpochViz:
         if return_data:
             return data_dict, time_nodes_natural, space_nodes_natural
 
+    def extract_probes(
+        self,
+        data_types=["Ey"],
+        points=[0],
+        time_range=None,
+        points_are_nodes=True,
+        times_are_nodes=True,
+        prefetch=4,
+    ):
+        """
+        Extracts the time series of the data at a few probe points, streaming through the run.
+
+        Only one snapshot is handled at a time and, using the block offsets of
+        the sdf files, only the values at the probe points are read. The memory
+        used is therefore independent of the size of the grid.
+
+        Parameters
+        ----------
+        data_types : list, optional
+            List of data types to be extracted, by default ["Ey"]
+        points : int, float or list, optional
+            Probe points, by default [0]
+            - If int or list of ints is provided, the points are space nodes.
+            - If float or list of floats is provided, the points are in lambda.
+            For 2D runs, a list of (x, y) points as ints (nodes) or floats (lambda).
+        time_range : int, float, tuple or list, optional
+            Time range to be extracted, by default None which means all the time range.
+            Same as the `time_range` of `load_data`.
+        points_are_nodes : bool, optional
+            Whether the points are nodes or in lambda, by default True
+        times_are_nodes : bool, optional
+            Whether to use time nodes or time in tau, by default True which means that use the nodes.
+        prefetch : int, optional
+            Number of sdf files read ahead on background threads, by default 4.
+            Use 0 to read serially.
+
+        Returns
+        -------
+        dict, np.ndarray, np.ndarray
+            Dictionary with the data types as keys and arrays of shape
+            (n_probes, n_times) as values, the time axis and the probe nodes
+            (of shape (n_probes, 2) for 2D runs).
+        """
+        for data_type in data_types:
+            if data_type not in self.available_data + self.available_derived:
+                raise DataNotFoundError(
+                    f"Data {data_type} is not available in the sdf files. Please check the input.deck. Available data are: {self.available_data + self.available_derived}"
+                )
+        if self.dimensions == 2:
+            time_nodes, _, return_time_range, _ = self.__create_time_and_space_nodes(
+                time_range, None, times_are_nodes, True
+            )
+            point_index, space_nodes, _ = self.__get_space_nodes_2d(
+                np.atleast_2d(points), points_are_nodes
+            )
+        else:
+            if isinstance(points, (tuple, np.ndarray)):
+                points = list(points)
+            (
+                time_nodes,
+                space_nodes,
+                return_time_range,
+                _,
+            ) = self.__create_time_and_space_nodes(
+                time_range, points, times_are_nodes, points_are_nodes
+            )
+            point_index = space_nodes
+
+        probes = {
+            data_type: np.zeros((len(space_nodes), len(time_nodes)))
+            for data_type in data_types
+        }
+        values_iterator = self.__iterate(
+            lambda time_node: _read_probes(
+                self.files[time_node],
+                data_types,
+                point_index,
+                self.__block_headers(time_node),
+            ),
+            time_nodes,
+            prefetch,
+            None,
+        )
+        for i, (_, values) in tqdm.tqdm(
+            enumerate(values_iterator),
+            total=len(time_nodes),
+            desc="Extracting Probes...",
+        ):
+            for data_type in data_types:
+                probes[data_type][:, i] = values[data_type]
+
+        if return_time_range:
+            time_nodes_natural = self.__get_correct_time_nodes_to_return(time_nodes)
+        else:
+            time_nodes_natural = time_nodes
+        return probes, time_nodes_natural, space_nodes
+
+    def extract_lineouts(
+        self,
+        data_types=["Ey"],
+        points=[(0.0, 0.0)],
+        time_range=None,
+        times_are_nodes=True,
+        prefetch=4,
+    ):
+        """
+        Extracts the time series of 2D fields at any points, with bilinear interpolation.
+
+        The points may be line-outs along polylines (see `lineouts.polyline`
+        and `lineouts.ray`) or any point cloud, in lambda on the axes of
+        `grid`. The neighbouring nodes and the weights of all the points are
+        computed once and only the distinct nodes are read from every
+        snapshot, so hundreds of points cost a single gather per file.
+
+        Examples
+        --------
+        >>> points = ray((0, 0), np.pi - ez.deck_info["ANGLE"], 8, 400)
+        >>> lineouts, T, points = ez.extract_lineouts(["Ey"], points)
+
+        Parameters
+        ----------
+        data_types : list, optional
+            List of data types to be extracted, by default ["Ey"]
+        points : array_like, optional
+            The (x, y) points in lambda, of shape (..., 2), by default [(0.0, 0.0)]
+        time_range : int, float, tuple or list, optional
+            Time range to be extracted, by default None which means all the time range.
+            Same as the `time_range` of `load_data`.
+        times_are_nodes : bool, optional
+            Whether to use time nodes or time in tau, by default True which means that use the nodes.
+        prefetch : int, optional
+            Number of sdf files read ahead on background threads, by default 4.
+            Use 0 to read serially.
+
+        Returns
+        -------
+        dict, np.ndarray, np.ndarray
+            Dictionary with the data types as keys and arrays of shape
+            `points.shape[:-1] + (n_times,)` as values, the time axis and the points.
+        """
+        if self.dimensions != 2:
+            raise DimensionError(
+                f"Line-outs are only available for 2D runs. Use `extract_probes` for this {self.dimensions}D run."
+            )
+        for data_type in data_types:
+            if data_type not in self.available_data + self.available_derived:
+                raise DataNotFoundError(
+                    f"Data {data_type} is not available in the sdf files. Please check the input.deck. Available data are: {self.available_data + self.available_derived}"
+                )
+        time_nodes, _, return_time_range, _ = self.__create_time_and_space_nodes(
+            time_range, None, times_are_nodes, True
+        )
+        x, y = self.grid()
+        points = np.asarray(points, dtype=float)
+        try:
+            sampler = BilinearSampler(x, y, points)
+        except ValueError as error:
+            raise InvalidSpaceError(str(error))
+
+        lineouts = {
+            data_type: np.zeros(sampler.shape + (len(time_nodes),))
+            for data_type in data_types
+        }
+        values_iterator = self.__iterate(
+            lambda time_node: _read_probes(
+                self.files[time_node],
+                data_types,
+                sampler.nodes,
+                self.__block_headers(time_node),
+            ),
+            time_nodes,
+            prefetch,
+            None,
+        )
+        for i, (_, values) in tqdm.tqdm(
+            enumerate(values_iterator),
+            total=len(time_nodes),
+            desc="Extracting Line-outs...",
+        ):
+            for data_type in data_types:
+                lineouts[data_type][..., i] = sampler.combine(values[data_type])
+
+        if return_time_range:
+            time_nodes_natural = self.__get_correct_time_nodes_to_return(time_nodes)
+        else:
+            time_nodes_natural = time_nodes
+        return lineouts, time_nodes_natural, points
+
+    def attosecond_pulses(
+        self,
+        field="Ey",
+        orders=(3, 9),
+        fundamental=1.0,
+        edge=0.5,
+        threshold=0.5,
+        workers=-1,
+    ):
+        """
+        Synthesizes the attosecond pulse trains formed by harmonics n1..n2 at every loaded node.
+
+        The time series of all the nodes in `self.data[field]` are filtered and
+        transformed back in one vectorized pass, so the quality of the pulses can
+        be mapped along x.
+
+        Parameters
+        ----------
+        field : str, optional
+            The field, by default "Ey"
+        orders : tuple, optional
+            The first and last harmonic orders (n1, n2) to keep, by default (3, 9)
+        fundamental : float, optional
+            The fundamental frequency in units of omega0, by default 1.0
+        edge : float, optional
+            Width of the smooth edges of the filter in units of the fundamental, by default 0.5
+        threshold : float, optional
+            Pulses are the maxima of the intensity above this fraction of the highest one, by default 0.5
+        workers : int, optional
+            Number of threads used by scipy.fft, by default -1
+
+        Returns
+        -------
+        np.ndarray, np.ndarray, dict
+            The intensity envelopes of shape (n_nodes, n_time), the time in tau
+            and the statistics of the pulse trains ("n_pulses", "peak_spacing",
+            "fwhm" and "contrast"), each of shape (n_nodes,).
+        """
+        if field not in self.data:
+            raise DataNotFoundError(
+                f"Data {field} is not loaded. Please load it first using `load_data`. Loaded data are: {list(self.data.keys())}"
+            )
+        return attosecond_pulses(
+            self.data[field].T,
+            self.calculated_parameters["omega_max"],
+            orders=orders,
+            fundamental=fundamental,
+            edge=edge,
+            threshold=threshold,
+            t0=self.time_nodes_natural[0],
+            workers=workers,
+        )
+
+    def spectrogram(
+        self,
+        field="Ey",
+        points=[4000],
+        time_range=None,
+        points_are_nodes=True,
+        times_are_nodes=True,
+        window_size=64,
+        hop=8,
+        n_fft=None,
+        window="hann",
+        workers=-1,
+    ):
+        """
+        Computes the short time Fourier (or Gabor) transform of the probes of a field.
+
+        Shows when the harmonics are emitted. The probes are extracted with
+        `extract_probes` and all of them are transformed in one batched call.
+
+        Examples
+        --------
+        >>> spectrogram, times, omega = ez.spectrogram("Ey", points=[4000])
+        >>> plt.imshow(
+        ...     spectrogram[0],
+        ...     extent=[times[0], times[-1], omega[0], omega[-1]],
+        ...     origin="lower",
+        ...     aspect="auto",
+        ... )
+
+        Parameters
+        ----------
+        field : str, optional
+            The field, by default "Ey"
+        points : list, optional
+            The space nodes (or positions in lambda) of the probes, by default [4000]
+        time_range : tuple, optional
+            Time range of the probes, by default None which means all the time range.
+        points_are_nodes : bool, optional
+            Whether the points are nodes or positions in lambda, by default True
+        times_are_nodes : bool, optional
+            Whether to use time nodes or time in tau, by default True which means that use the nodes.
+        window_size : int, optional
+            Number of snapshots of every window, by default 64
+        hop : int, optional
+            Number of snapshots between the starts of consecutive windows, by default 8
+        n_fft : int, optional
+            Length of the FFT, by default None which means `window_size`. Larger
+            values zero pad the windows.
+        window : str or array_like, optional
+            The window function, "hann", "gaussian" or "boxcar", by default "hann"
+        workers : int, optional
+            Number of threads used by scipy.fft, by default -1
+
+        Returns
+        -------
+        np.ndarray, np.ndarray, np.ndarray
+            The spectrograms of shape (n_points, n_freq, n_windows), the time of
+            the centre of every window in tau and omega in units of omega0.
+        """
+        if time_range is None:
+            time_range = (0, len(self.files))
+            times_are_nodes = True
+        probes, time_nodes_natural, _ = self.extract_probes(
+            data_types=[field],
+            points=points,
+            time_range=time_range,
+            points_are_nodes=points_are_nodes,
+            times_are_nodes=times_are_nodes,
+        )
+        return stft(
+            probes[field],
+            self.calculated_parameters["omega_max"],
+            window_size=window_size,
+            hop=hop,
+            n_fft=n_fft,
+            window=window,
+            t0=time_nodes_natural[0],
+            workers=workers,
+        )
+
+    def track_harmonics(
+        self,
+        field="Ey",
+        points=[4000],
+        orders=[1, 3, 5, 7, 9],
+        fundamental=1.0,
+        time_range=None,
+        points_are_nodes=True,
+        times_are_nodes=True,
+        tracker=None,
+        prefetch=4,
+    ):
+        """
+        Streams the probes of a field through a harmonic tracker, snapshot by snapshot.
+
+        Only the points are read from every sdf file and the tracker is updated
+        as each snapshot arrives, so no time series is kept in memory. Passing
+        the tracker of an earlier call continues it from the snapshot it stopped
+        at, which allows following a run which is still in progress.
+
+        Parameters
+        ----------
+        field : str, optional
+            The field, by default "Ey"
+        points : list, optional
+            The space nodes (or positions in lambda) of the probes, by default [4000]
+        orders : list, optional
+            The harmonic orders to track, by default [1, 3, 5, 7, 9]
+        fundamental : float, optional
+            The fundamental frequency in units of omega0, by default 1.0
+        time_range : tuple, optional
+            Time range to stream, by default None which means all the time range,
+            or the snapshots after the last one seen if `tracker` is passed.
+        points_are_nodes : bool, optional
+            Whether the points are nodes or positions in lambda, by default True
+        times_are_nodes : bool, optional
+            Whether to use time nodes or time in tau, by default True which means that use the nodes.
+        tracker : HarmonicTracker, optional
+            Tracker to continue, by default None which means a new one.
+        prefetch : int, optional
+            Number of snapshots read ahead, by default 4. Use 0 to read serially.
+
+        Returns
+        -------
+        HarmonicTracker
+            The tracker, whose `power()` has shape (n_orders, n_points).
+        """
+        if field not in self.available_data + self.available_derived:
+            raise DataNotFoundError(
+                f"Data {field} is not available in the sdf files. Please check the input.deck. Available data are: {self.available_data + self.available_derived}"
+            )
+        if tracker is None:
+            tracker = HarmonicTracker(
+                orders, self.calculated_parameters["omega_max"], fundamental
+            )
+        if time_range is None:
+            time_range = (tracker.count, len(self.files))
+            times_are_nodes = True
+        if isinstance(points, (tuple, np.ndarray)):
+            points = list(points)
+        time_nodes, space_nodes, _, _ = self.__create_time_and_space_nodes(
+            time_range, points, times_are_nodes, points_are_nodes
+        )
+
+        values_iterator = self.__iterate(
+            lambda time_node: _read_probes(
+                self.files[time_node],
+                [field],
+                space_nodes,
+                self.__block_headers(time_node),
+            ),
+            time_nodes,
+            prefetch,
+            None,
+        )
+        for _, values in tqdm.tqdm(
+            values_iterator, total=len(time_nodes), desc="Tracking Harmonics..."
+        ):
+            tracker.update(values[field])
+        return tracker
+
     def plot_density(
         self,
         normalize=False,
@@ -701,6 +2362,9 @@ class EpochViz:
         """
         Plots the elctron density as image plot
 
+        Windows inside (or overlapping) data loaded before are served from the
+        cube cache, so only the missing margins are read from the sdf files.
+
         Parameters
         ----------
         normalize : bool, optional
@@ -724,31 +2388,31 @@ class EpochViz:
         **kwargs : dict
             Keyword arguments for `plt.imshow`
         """
-        time_nodes, space_nodes, _, _ = self.__create_time_and_space_nodes(
+        (
+            time_nodes,
+            space_nodes,
+            time_is_range,
+            space_is_range,
+        ) = self.__create_time_and_space_nodes(
             time_range, space_range, times_are_nodes, space_are_nodes
         )
+        if len(time_nodes) == 0 or len(space_nodes) == 0:
+            raise InvalidTimeError(
+                f"No data in the time range {time_range} and space range {space_range}."
+            )
 
-        # Check if the data is loaded and the range is compatible
-        load_needed = False
-        if self.data == {}:
-            print("Data is not loaded. Loading data...")
-            load_needed = True
-
-        elif self.time_nodes[0] > time_nodes[0] or self.time_nodes[-1] < time_nodes[-1]:
-            print("Time range is not compatible. Loading data...")
-            load_needed = True
-
-        elif (
-            self.space_nodes[0] > space_nodes[0]
-            or self.space_nodes[-1] < space_nodes[-1]
-        ):
-            print("Space range is not compatible. Loading data...")
-            load_needed = True
-
-        if load_needed:
+        if time_is_range and space_is_range:
+            # Overlapping windows are served from the cube cache, loading only the margins
+            final_data = self.cube_cache.get(
+                "Ne",
+                (time_nodes[0], time_nodes[-1] + 1),
+                (space_nodes[0], space_nodes[-1] + 1),
+            )
+            new_time_range = self.__get_correct_time_nodes_to_return(time_nodes)
+            new_space_range = self.__get_correct_space_nodes_to_return(space_nodes)
+        else:
             data, new_time_range, new_space_range = self.load_data(
                 data_types=["Ne"],
-                normalize=normalize,
                 time_range=time_range,
                 space_range=space_range,
                 times_are_nodes=times_are_nodes,
@@ -756,43 +2420,24 @@ class EpochViz:
                 return_data=True,
             )
             final_data = data["Ne"]
-            # Set the extent of the plot
-            EXTENT = [
-                new_space_range[0],
-                new_space_range[-1],
-                new_time_range[-1],
-                new_time_range[0],
-            ]
-        else:
-            data = self.data["Ne"]
-
-            # Slice the data to the correct range
-            lower_time = np.where(
-                np.round(self.time_nodes_natural, 1) == time_range[0]
-            )[0][0]
-            upper_time = np.where(
-                np.round(self.time_nodes_natural, 1) == time_range[-1]
-            )[0][0]
-            lower_space = np.where(
-                np.round(self.space_nodes_natural, 1) == space_range[0]
-            )[0][0]
-            upper_space = np.where(
-                np.round(self.space_nodes_natural, 1) == space_range[-1]
-            )[0][0]
-            final_data = data[
-                lower_time : upper_time + 1, lower_space : upper_space + 1
-            ]
-            EXTENT = [
-                self.space_nodes_natural[lower_space],
-                self.space_nodes_natural[upper_space],
-                self.time_nodes_natural[upper_time],
-                self.time_nodes_natural[lower_time],
-            ]
+        EXTENT = [
+            new_space_range[0],
+            new_space_range[-1],
+            new_time_range[-1],
+            new_time_range[0],
+        ]
+
+        # The cached data is not normalized, so the cache is never modified in place
+        if normalize:
+            final_data = final_data / self.calculated_parameters["nc"]
 
-        # If data is normalized but user passes `normalize=False` then we need to multiply by the critical density
-        if not normalize:
-            if max(final_data.flatten()) < 1e10:
-                final_data *= self.calculated_parameters["nc"]
+        # As with `load_data`, the data is kept if nothing is loaded yet
+        if self.data == {} and time_is_range and space_is_range:
+            self.data["Ne"] = final_data if normalize else np.array(final_data)
+            self.time_nodes = time_nodes
+            self.space_nodes = space_nodes
+            self.time_nodes_natural = new_time_range
+            self.space_nodes_natural = new_space_range
 
         fig, ax = plt.subplots(figsize=(10, 10))
         im = ax.imshow(final_data, extent=EXTENT, **kwargs)
@@ -810,6 +2455,472 @@ class EpochViz:
             plt.show()
         return fig, ax
 
+    def __loaded_dump_times(self):
+        """
+        Gets the dump times (in tau) of the loaded time nodes.
+        """
+        dump_times = self.get_dump_times()
+        if dump_times is None:
+            raise InvalidTimeError(
+                "The dump times are not available, as the headers of the sdf files are not indexed."
+            )
+        return dump_times[self.time_nodes]
+
+    def spectra(
+        self,
+        field="Ey",
+        workers=-1,
+        window=None,
+        pad=None,
+        dump_times=False,
+        method="resample",
+        plot=False,
+        xlim="max",
+        file_name=None,
+        format="png",
+        show_fig=True,
+        **kwargs,
+    ):
+        """
+        Computes the power spectra of every loaded node in a single batched FFT.
+
+        The FFT is taken along the time axis of `self.data[field]`, so the data
+        has to be loaded first with `load_data`. No figure is made unless `plot`
+        is True, which makes scanning hundreds of nodes cheap.
+
+        Parameters
+        ----------
+        field : str, optional
+            The field, by default "Ey"
+        workers : int, optional
+            Number of threads used by scipy.fft, by default -1 which means all the CPUs.
+        window : str, tuple or array_like, optional
+            Window applied to the time series, eg. "hann", "blackman-harris" or
+            ("tukey", 0.2), by default None which means no window.
+        pad : str or int, optional
+            Zero padding of the FFT, "pow2", "fast" or a length, by default None
+        dump_times : bool, optional
+            Whether to use the true dump times read from the sdf headers instead
+            of assuming evenly spaced dumps, by default False
+        method : str, optional
+            How the dump times are used, "resample" (onto a uniform grid) or
+            "nudft" (non-uniform DFT), by default "resample"
+        plot : bool, optional
+            Whether to plot the spectra of all the nodes as an image, by default False
+        xlim : str or tuple, optional
+            Range of omega to be plotted, by default "max" which means up to the Nyquist frequency.
+        file_name : str, optional
+            File name to save the plot, by default None which means that the plot is not saved.
+        format : str, optional
+            Format of the file to save the plot, by default "png"
+        show_fig : bool, optional
+            Whether to show the plot, by default True
+        **kwargs : dict
+            Keyword arguments for `plt.imshow`
+
+        Returns
+        -------
+        np.ndarray, np.ndarray
+            The power |FFT|^2 of shape (n_nodes, n_freq), with the nodes in the
+            order of `self.space_nodes`, and omega in units of omega0.
+        """
+        if field not in self.data:
+            raise DataNotFoundError(
+                f"Data {field} is not loaded. Please load it first using `load_data`. Loaded data are: {list(self.data.keys())}"
+            )
+        if dump_times:
+            values, omega = spectrum_at_times(
+                self.data[field],
+                self.__loaded_dump_times(),
+                window=window,
+                pad=pad,
+                method=method,
+                workers=workers,
+            )
+            power = np.ascontiguousarray((values.real**2 + values.imag**2).T)
+        else:
+            power, omega = power_spectra(
+                self.data[field],
+                self.calculated_parameters["omega_max"],
+                workers=workers,
+                window=window,
+                pad=pad,
+            )
+        if not plot:
+            return power, omega
+
+        if xlim == "max":
+            xlim = (0, omega[-1])
+        fig, ax = plt.subplots(figsize=(10, 10))
+        space = np.asarray(self.space_nodes_natural)
+        im = ax.imshow(
+            power,
+            extent=[omega[0], omega[-1], space[-1], space[0]],
+            aspect="auto",
+            norm=colors.LogNorm(),
+            **kwargs,
+        )
+        plt.colorbar(im).set_label("$|FFT|^2$")
+        ax.set_xlim(xlim)
+        ax.set_xlabel("$\omega [\omega_0]$")
+        ax.set_ylabel("$X \, [\lambda]$")
+        ax.set_title(f"Spectra of {field}")
+
+        if file_name is not None:
+            file_name = self.__get_save_file_name(file_name, format)
+            plt.tight_layout()
+            print(f"Saving plot to {file_name}...")
+            fig.savefig(file_name, dpi=200)
+        if show_fig:
+            plt.show()
+        return power, omega
+
+    def transverse_spectra(
+        self,
+        field="Ey",
+        space_range=None,
+        time_range=None,
+        space_are_nodes=True,
+        times_are_nodes=True,
+        workers=-1,
+        window=None,
+        pad=None,
+        batch_bytes=256 * 1024**2,
+    ):
+        """
+        Computes the power spectra of a band of cells of a 2D run, averaged along y.
+
+        The time series are streamed from the node-major store (see `rechunk`,
+        which is called for the field if it is not stored yet) in batches of
+        y cells, so every batch is a contiguous read and a single FFT and the
+        memory used is bounded by `batch_bytes` whatever the size of the band.
+        A line of cells is a band one node wide in x.
+
+        Examples
+        --------
+        >>> mean, std, omega, x = ez.transverse_spectra("Ey", space_range=((-2.0, -1.0), (-3.0, 3.0)), space_are_nodes=False)
+
+        Parameters
+        ----------
+        field : str, optional
+            The field, by default "Ey"
+        space_range : tuple, optional
+            The band as a `(x_range, y_range)` window, by default None which means the whole grid.
+        time_range : tuple, optional
+            The (start, end) time range, by default None which means all the time range.
+        space_are_nodes : bool, optional
+            Whether the space range is given in nodes or in lambda, by default True
+        times_are_nodes : bool, optional
+            Whether the time range is given in nodes or in tau, by default True
+        workers : int, optional
+            Number of threads used by scipy.fft, by default -1 which means all the CPUs.
+        window : str, tuple or array_like, optional
+            Window applied to the time series, by default None
+        pad : str or int, optional
+            Zero padding of the FFT, by default None
+        batch_bytes : int, optional
+            Approximate memory used by a batch, by default 256 MiB.
+
+        Returns
+        -------
+        np.ndarray, np.ndarray, np.ndarray, np.ndarray
+            The mean power |FFT|^2 over y and its standard deviation, both of
+            shape (n_x, n_freq), omega in units of omega0 and the x of the band in lambda.
+        """
+        if self.dimensions != 2:
+            raise DimensionError(
+                f"Transverse spectra are only available for 2D runs. Use `spectra` for this {self.dimensions}D run."
+            )
+        if field not in self.available_data + self.available_derived:
+            raise DataNotFoundError(
+                f"Data {field} is not available in the sdf files. Please check the input.deck. Available data are: {self.available_data + self.available_derived}"
+            )
+        if space_range is not None and not isinstance(space_range, tuple):
+            raise InvalidSpaceError(
+                f"The band should be a (x_range, y_range) window. You entered {space_range}."
+            )
+        time_range = self.__get_correct_time_range(time_range, times_are_nodes)
+        if not isinstance(time_range, tuple) or time_range[1] - time_range[0] < 2:
+            raise InvalidTimeError(
+                f"Spectra need a (start, end) time range of at least two dumps. You entered {time_range}."
+            )
+        (x_window, y_window), _, (x, _) = self.__get_space_nodes_2d(
+            space_range, space_are_nodes
+        )
+
+        stored = self.__stored_fields()
+        if not self.__is_stored(field, stored):
+            self.rechunk(_raw_data_types([field]))
+            stored = self.__stored_fields()
+
+        # Real data, complex spectrum and power of every cell of a batch
+        n_time = time_range[1] - time_range[0]
+        n_freq = fft_length(n_time, pad) // 2 + 1
+        cell_bytes = 8 * n_time + 24 * n_freq
+        n_x = x_window.stop - x_window.start
+        batch_size = max(1, batch_bytes // (cell_bytes * n_x))
+
+        statistics = SpectrumStatistics(
+            self.calculated_parameters["omega_max"],
+            window=window,
+            pad=pad,
+            workers=workers,
+        )
+        time_index = slice(*time_range)
+        for start in tqdm.tqdm(
+            range(y_window.start, y_window.stop, batch_size),
+            desc="Computing Spectra...",
+        ):
+            y_batch = slice(start, min(start + batch_size, y_window.stop))
+            data = self.__stored_field(field, stored, time_index, (x_window, y_batch))
+            statistics.update(np.asarray(data, dtype=float))
+        return statistics.mean(), statistics.std(), statistics.omega, x
+
+    def kspace(
+        self,
+        field="Ey",
+        time_range=None,
+        space_range=None,
+        times_are_nodes=True,
+        space_are_nodes=True,
+        window=None,
+        average=False,
+        angle_bins=None,
+        k_range=None,
+        batch_size=16,
+        workers=-1,
+        prefetch=4,
+    ):
+        """
+        Computes the kx-ky power spectra of the snapshots of a 2D run.
+
+        The snapshots are read with prefetching and transformed in batches of
+        `batch_size` with a single real 2D FFT, whose transforms are split over
+        the `workers` threads of scipy.fft. With `average` or `angle_bins`, only
+        the reduced spectra are kept, so any number of snapshots can be used.
+
+        Examples
+        --------
+        >>> power, (kx, ky), T = ez.kspace("Ey", time_range=(20.0, 30.0), times_are_nodes=False, window="hann")
+        >>> histograms, angles, T = ez.kspace("Ey", angle_bins=180, k_range=(4.5, 5.5))
+
+        Parameters
+        ----------
+        field : str, optional
+            The field, by default "Ey"
+        time_range : int, float, tuple or list, optional
+            Time range of the snapshots, by default None which means all the time range.
+            Same as the `time_range` of `load_data`.
+        space_range : tuple, optional
+            The `(x_range, y_range)` window to be transformed, by default None
+            which means the whole grid.
+        times_are_nodes : bool, optional
+            Whether the time range is given in nodes or in tau, by default True
+        space_are_nodes : bool, optional
+            Whether the space range is given in nodes or in lambda, by default True
+        window : str, tuple or array_like, optional
+            Window applied along x and y, eg. "hann" or ("tukey", 0.2), by default
+            None which means no window.
+        average : bool, optional
+            Whether to return the mean over the snapshots instead of every
+            snapshot, by default False
+        angle_bins : int, optional
+            If given, the spectra are binned into this many bins of the angle of
+            the wavevector over [0, pi) (see `kspace.angular_histogram`), by default None
+        k_range : tuple, optional
+            Range of |k| in units of k0 binned into the angles, by default None
+            which means all of them.
+        batch_size : int, optional
+            Number of snapshots transformed together, by default 16
+        workers : int, optional
+            Number of threads used by scipy.fft, by default -1 which means all the CPUs.
+        prefetch : int, optional
+            Number of sdf files read ahead on background threads, by default 4.
+            Use 0 to read serially.
+
+        Returns
+        -------
+        np.ndarray, tuple or np.ndarray, np.ndarray
+            The power |FFT|^2 of shape (n_times, nx, ny // 2 + 1), with kx sorted,
+            and the (kx, ky) axes in units of k0. With `angle_bins`, the
+            histograms of shape (n_times, angle_bins) and the edges of the bins
+            in radians. With `average`, the time axis is dropped from the
+            spectra. Then the time axis.
+        """
+        if self.dimensions != 2:
+            raise DimensionError(
+                f"k-space spectra are only available for 2D runs. This is a {self.dimensions}D run."
+            )
+        if field not in self.available_data + self.available_derived:
+            raise DataNotFoundError(
+                f"Data {field} is not available in the sdf files. Please check the input.deck. Available data are: {self.available_data + self.available_derived}"
+            )
+        if space_range is not None and not isinstance(space_range, tuple):
+            raise InvalidSpaceError(
+                f"The space range should be a (x_range, y_range) window. You entered {space_range}."
+            )
+        time_nodes, _, return_time_range, _ = self.__create_time_and_space_nodes(
+            time_range, None, times_are_nodes, True
+        )
+        if len(time_nodes) == 0 or max(time_nodes) >= len(self.files):
+            raise InvalidTimeError(
+                f"The time nodes should be between 0 and {len(self.files) - 1}. You entered {time_range}."
+            )
+        space_window, _, (x, y) = self.__get_space_nodes_2d(
+            space_range, space_are_nodes
+        )
+        if len(x) < 2 or len(y) < 2:
+            raise InvalidSpaceError(
+                f"The window should have at least two nodes along x and y. You entered {space_range}."
+            )
+        dx = x[1] - x[0]
+        dy = y[1] - y[0]
+
+        def reduce(batch):
+            power, kx, ky = kspace_power(np.stack(batch), dx, dy, window, workers)
+            if angle_bins is None:
+                return power, (kx, ky)
+            return angular_histogram(power, dx, dy, angle_bins, k_range, ny=len(y))
+
+        results = []
+        total = None
+        batch = []
+        snapshots = self.iter_snapshots(
+            [field], time_range, times_are_nodes, window=space_window, prefetch=prefetch
+        )
+        for i, (_, snapshot) in tqdm.tqdm(
+            enumerate(snapshots), total=len(time_nodes), desc="Computing k-space..."
+        ):
+            batch.append(snapshot[field])
+            if len(batch) < batch_size and i < len(time_nodes) - 1:
+                continue
+            values, axes = reduce(batch)
+            batch = []
+            if average:
+                batch_total = values.sum(axis=0)
+                total = batch_total if total is None else total + batch_total
+            else:
+                results.append(values)
+        values = total / len(time_nodes) if average else np.concatenate(results)
+
+        if return_time_range:
+            time_nodes_natural = self.__get_correct_time_nodes_to_return(time_nodes)
+        else:
+            time_nodes_natural = time_nodes
+        return values, axes, time_nodes_natural
+
+    def harmonic_yields(
+        self,
+        field="Ey",
+        orders=None,
+        bandwidth=0.5,
+        fundamental=1.0,
+        workers=-1,
+        window=None,
+        pad=None,
+        dump_times=False,
+    ):
+        """
+        Integrates the power of the loaded nodes in a band around every harmonic order.
+
+        Parameters
+        ----------
+        field : str, optional
+            The field, by default "Ey"
+        orders : array_like, optional
+            The harmonic orders, by default None which means the odd orders up to
+            the Nyquist frequency.
+        bandwidth : float, optional
+            Half width of the bands in units of the fundamental frequency, by default 0.5
+        fundamental : float, optional
+            The fundamental frequency in units of omega0, by default 1.0. Use
+            omega_m / omega0 for the spectra of oblique incidence runs.
+        workers : int, optional
+            Number of threads used by scipy.fft, by default -1
+        window : str, tuple or array_like, optional
+            Window applied to the time series, by default None
+        pad : str or int, optional
+            Zero padding of the FFT, by default None
+        dump_times : bool, optional
+            Whether to use the true dump times read from the sdf headers, by default False
+
+        Returns
+        -------
+        np.ndarray, np.ndarray
+            The yields of shape (n_orders, n_nodes), with the nodes in the order
+            of `self.space_nodes`, and the orders.
+        """
+        power, omega = self.spectra(
+            field=field,
+            workers=workers,
+            window=window,
+            pad=pad,
+            dump_times=dump_times,
+        )
+        return harmonic_yields(
+            power,
+            omega,
+            orders=orders,
+            bandwidth=bandwidth,
+            fundamental=fundamental,
+        )
+
+    def harmonic_phases(
+        self,
+        field="Ey",
+        orders=None,
+        bandwidth=0.5,
+        fundamental=1.0,
+        workers=-1,
+        window=None,
+        pad=None,
+    ):
+        """
+        Computes the spectral phase, group delay and chirp of every harmonic order at the loaded nodes.
+
+        All the nodes are handled by one batched FFT (see `spectra.harmonic_phases`).
+
+        Parameters
+        ----------
+        field : str, optional
+            The field, by default "Ey"
+        orders : array_like, optional
+            The harmonic orders, by default None which means the odd orders up to
+            the Nyquist frequency.
+        bandwidth : float, optional
+            Half width of the bands in units of the fundamental frequency, by default 0.5
+        fundamental : float, optional
+            The fundamental frequency in units of omega0, by default 1.0
+        workers : int, optional
+            Number of threads used by scipy.fft, by default -1
+        window : str, tuple or array_like, optional
+            Window applied to the time series, by default None
+        pad : str or int, optional
+            Zero padding of the FFT, by default None
+
+        Returns
+        -------
+        dict, np.ndarray
+            The "power", "phase", "group_delay" (in tau, from the start of the
+            run) and "chirp" of shape (n_orders, n_nodes), with the nodes in the
+            order of `self.space_nodes`, and the orders.
+        """
+        if field not in self.data:
+            raise DataNotFoundError(
+                f"Data {field} is not loaded. Please load it first using `load_data`. Loaded data are: {list(self.data.keys())}"
+            )
+        return harmonic_phases(
+            self.data[field].T,
+            self.calculated_parameters["omega_max"],
+            orders=orders,
+            bandwidth=bandwidth,
+            fundamental=fundamental,
+            window=window,
+            pad=pad,
+            t0=self.time_nodes_natural[0],
+            workers=workers,
+        )
+
     def plot_fft(
         self,
         field="Ey",
@@ -821,7 +2932,9 @@ class EpochViz:
         ylog=True,
         plot_lines=False,
         show_fig=True,
-        return_fig = False
+        return_fig = False,
+        window=None,
+        pad=None,
     ):
         try:
             id_ = np.where(self.space_nodes == node)[0][0]
@@ -833,12 +2946,9 @@ class EpochViz:
         F = self.data[field][:, id_]
         if F.max() > 10:
             F = F / (max(F) + 1e-10)
-        y0 = np.fft.fft(F)
-        y0_shift = np.fft.fftshift(y0)
-        y0_f = np.abs(y0_shift)
-
         omega_max = self.calculated_parameters["omega_max"]
-        omega = np.linspace(-omega_max / 2, omega_max / 2, len(y0_f))
+        y0, omega = spectrum(F, omega_max, window=window, pad=pad)
+        y0_f = np.abs(y0)
 
         fig, ax = plt.subplots(figsize=(10, 10))
         ax.plot(omega, np.abs(y0_f) * 2)
@@ -894,6 +3004,8 @@ class EpochViz:
         plot_lines=False,
         show_fig = False,
         return_fig = False,
+        window=None,
+        pad=None,
     ):
         figures = []
         axes = []
@@ -912,6 +3024,8 @@ class EpochViz:
                 plot_lines=plot_lines,
                 show_fig=False,
                 return_fig= True,
+                window=window,
+                pad=pad,
             )
             figures.append(fig)
             axes.append(ax)
@@ -0,0 +1,30 @@
+import numpy as np
+from epoch_viz.cache import LRUCache
+
+
+def test_lru_cache_eviction():
+    cache = LRUCache(max_bytes=3 * 80)
+    for i in range(3):
+        cache.put(i, np.zeros(10))
+    assert len(cache) == 3
+    assert cache.nbytes == 240
+
+    cache.get(0)
+    cache.put(3, np.zeros(10))
+    assert 1 not in cache, "Least recently used item should be evicted"
+    assert 0 in cache and 2 in cache and 3 in cache
+    assert cache.get(1) is None
+    assert cache.hits == 1 and cache.misses == 1
+
+
+def test_lru_cache_too_large():
+    cache = LRUCache(max_bytes=80)
+    cache.put("a", np.zeros(10))
+    cache.put("b", np.zeros(11))
+    assert "b" not in cache, "Item larger than the cache should not be stored"
+    assert "a" in cache
+
+    cache.put("a", np.zeros(5))
+    assert cache.nbytes == 40, "Replacing an item should update the size"
+    cache.clear()
+    assert len(cache) == 0 and cache.nbytes == 0
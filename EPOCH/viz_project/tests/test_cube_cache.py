@@ -0,0 +1,65 @@
+import numpy as np
+from epoch_viz.cube_cache import CubeCache, nearest_index
+
+CUBE = np.arange(100 * 200, dtype=float).reshape(100, 200)
+
+
+def counting_cache(max_bytes=1024**3):
+    loaded = []
+
+    def load(data_type, time_slice, space_slice):
+        loaded.append((time_slice.start, time_slice.stop, space_slice.start, space_slice.stop))
+        return CUBE[time_slice, space_slice].copy()
+
+    return CubeCache(load, max_bytes=max_bytes), loaded
+
+
+def test_cube_cache_sub_window():
+    cache, loaded = counting_cache()
+    cache.get("Ne", (10, 50), (20, 120))
+    window = cache.get("Ne", (20, 30), (50, 60))
+    assert np.array_equal(window, CUBE[20:30, 50:60])
+    assert len(loaded) == 1, "Sub windows should be sliced from the cached block"
+    assert cache.hits == 1
+
+
+def test_cube_cache_overlap_loads_margins():
+    cache, loaded = counting_cache()
+    cache.get("Ne", (10, 50), (20, 120))
+    window = cache.get("Ne", (30, 70), (20, 150))
+    assert np.array_equal(window, CUBE[30:70, 20:150])
+    # Only the margins outside the cached block are loaded
+    assert loaded[1:] == [(50, 70, 20, 150), (10, 50, 120, 150)]
+    assert len(cache) == 1
+    assert np.array_equal(cache.get("Ne", (10, 70), (20, 150)), CUBE[10:70, 20:150])
+    assert len(loaded) == 3
+
+
+def test_cube_cache_eviction():
+    cache, loaded = counting_cache(max_bytes=2 * 10 * 10 * 8)
+    cache.get("Ne", (0, 10), (0, 10))
+    cache.get("Ey", (0, 10), (0, 10))
+    cache.get("Ne", (0, 10), (0, 10))
+    cache.get("Ne", (50, 60), (0, 10))
+    assert len(cache) == 2
+    cache.get("Ey", (0, 10), (0, 10))
+    assert len(loaded) == 4, "Least recently used block should be evicted"
+
+
+
+def test_cube_cache_blocks_are_read_only():
+    cache, _ = counting_cache()
+    block = CUBE[:10, :10].copy()
+    cache.put("Ne", (0, 10), (0, 10), block)
+    assert not block.flags.writeable
+    assert not cache.get("Ne", (2, 5), (2, 5)).flags.writeable
+    assert not cache.get("Ne", (0, 20), (0, 10)).flags.writeable
+
+
+def test_nearest_index():
+    axis = np.array([0.0, 0.5, 1.0, 1.5])
+    assert nearest_index(axis, 0.99999) == 2
+    assert nearest_index(axis, 1.2) == 2
+    assert nearest_index(axis, 1.3) == 3
+    assert nearest_index(axis, -1.0) == 0
+    assert nearest_index(axis, 10.0) == 3
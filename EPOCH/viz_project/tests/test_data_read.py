@@ -1,6 +1,7 @@
 import pytest
 from epoch_viz.viz import *
 import os
+import shutil
 
 CUR_DIR = os.path.dirname(os.path.abspath(__file__))
 DATA_DIR = os.path.join(CUR_DIR, "run")
@@ -114,6 +115,59 @@ def test_time_to_time_node():
     assert ez._EpochViz__time_to_time_node(0) == 0
     assert ez._EpochViz__time_to_time_node(ez.deck_info["T_MAX"]) == len(ez.files)
 
+def write_run(directory, times):
+    from tests.test_sdf_reader import write_sdf
+
+    shutil.copy(os.path.join(DATA_DIR, "input.deck"), directory)
+    with open(os.path.join(directory, "epoch1d.dat"), "w") as f:
+        f.write("Wrote normal  dump number  1 at time  0.1E-13 and iteration   100\n")
+    grid = [np.linspace(-20e-6, 10e-6, 11)]
+    for i, time in enumerate(times):
+        write_sdf(os.path.join(directory, f"{i:04d}.sdf"), {"Electric Field/Ey": np.random.rand(10)}, time=time, grid=grid)
+
+def test_time_nodes_with_dump_times(tmp_path):
+    write_run(tmp_path, np.arange(50) * 1e-16)
+    ez = EpochViz(str(tmp_path))
+    dump_times = ez.get_dump_times()
+    assert ez._EpochViz__time_to_time_node(ez.deck_info["T_MAX"]) == 50
+    assert ez._EpochViz__get_correct_time_range((0, 100), are_nodes = False) == (0, 50)
+    # The nodes are rounded down and are the inverse of the times
+    assert ez._EpochViz__time_to_time_node((dump_times[7] + dump_times[8]) / 2) == 7
+    for node in range(51):
+        assert ez._EpochViz__time_to_time_node(ez._EpochViz__time_node_to_time(node)) == node
+    assert ez._EpochViz__time_node_to_time(7) == dump_times[7]
+
+def test_time_nodes_with_last_dump_at_t_max(tmp_path):
+    # The deck has t_end = 40 tau with lambda0 = 1 micron
+    t_max = 40 * 1e-6 / c
+    write_run(tmp_path, np.linspace(0, t_max, 50))
+    ez = EpochViz(str(tmp_path))
+    T_MAX = ez.deck_info["T_MAX"]
+    assert ez._EpochViz__time_to_time_node(T_MAX) == 50
+    assert ez._EpochViz__time_to_time_node(0) == 0
+    assert ez._EpochViz__time_node_to_time(0) == 0
+    assert ez._EpochViz__time_node_to_time(50) == T_MAX
+    assert ez._EpochViz__get_correct_time_range((0, T_MAX), are_nodes = False) == (0, 50)
+    for node in range(49):
+        assert ez._EpochViz__time_to_time_node(ez._EpochViz__time_node_to_time(node)) == node
+
+def test_store_checked_once_per_build(tmp_path, monkeypatch):
+    import epoch_viz.store as store_module
+
+    write_run(tmp_path, np.arange(20) * 1e-16)
+    ez = EpochViz(str(tmp_path))
+    ez.rechunk(["Ey"])
+    checked = []
+    file_signatures = store_module.file_signatures
+    monkeypatch.setattr(store_module, "file_signatures", lambda files: (checked.append(files), file_signatures(files))[1])
+    ez.load_data(["Ey"], space_range = (0, 5))
+    ez.load_data(["Ey"], time_range = (2, 10), space_range = (0, 5))
+    assert len(checked) == 1, "The sdf files should only be checked once"
+    ez.rechunk(["Ey"], overwrite = True)
+    checked.clear()
+    ez.load_data(["Ey"], space_range = (0, 5))
+    assert len(checked) == 1, "A new build should be checked again"
+
 def test_get_data_errors():
     ez = EpochViz(DATA_DIR)
     with pytest.raises(DataNotFoundError):
@@ -189,4 +243,174 @@ def test_get_correct_space_range_nodes():
     
     assert ez._EpochViz__get_correct_space_range(2.0, are_nodes = True) == [ez._EpochViz__space_to_space_node(2.0)], "Float should be converted to space node and list"
     assert ez._EpochViz__get_correct_space_range([2.0, 4.0], are_nodes = True) == [ez._EpochViz__space_to_space_node(2.0), ez._EpochViz__space_to_space_node(4.0)], "list of floats should be converted to list of space nodes"
-    assert ez._EpochViz__get_correct_space_range([100, 200, 300], are_nodes = True) == [100, 200, 300], "list of ints should be returned as is"
\ No newline at end of file
+    assert ez._EpochViz__get_correct_space_range([100, 200, 300], are_nodes = True) == [100, 200, 300], "list of ints should be returned as is"
+
+def test_get_snapshot():
+    ez = EpochViz(DATA_DIR)
+    snapshot = ez.get_snapshot(["Ey", "Bz", "Ne"], time_node=100, normalize=True)
+    assert list(snapshot.keys()) == ["Ey", "Bz", "Ne"]
+    for data_type in ["Ey", "Bz", "Ne"]:
+        assert np.array_equal(
+            snapshot[data_type],
+            ez.get_data(data_type, time_node=100, normalize=True),
+        ), f"Single pass read gives wrong value for {data_type}"
+
+    with pytest.raises(DataNotFoundError):
+        ez.get_snapshot(["Ey", "not_a_data"])
+
+
+def test_load_data_parallel():
+    ez = EpochViz(DATA_DIR)
+    kwargs = dict(
+        data_types=["Ey", "Ne"],
+        normalize=True,
+        time_range=(0, 40),
+        space_range=(3000, 5000),
+        return_data=True,
+    )
+    serial, T, X = ez.load_data(**kwargs)
+    parallel, T_p, X_p = ez.load_data(workers=4, **kwargs)
+    for data_type in ["Ey", "Ne"]:
+        assert np.array_equal(serial[data_type], parallel[data_type]), f"Parallel load gives wrong value for {data_type}"
+    assert np.array_equal(T, T_p)
+    assert np.array_equal(X, X_p)
+
+
+def test_rechunk(tmp_path):
+    ez = EpochViz(DATA_DIR, cache_directory=str(tmp_path))
+    kwargs = dict(
+        data_types=["Ey", "Ne"],
+        normalize=True,
+        space_range=(3000, 5000),
+        return_data=True,
+    )
+    direct, T, X = ez.load_data(use_cache=False, **kwargs)
+    ez.rechunk(["Ey", "Ne"])
+    cached, T_c, X_c = ez.load_data(**kwargs)
+    for data_type in ["Ey", "Ne"]:
+        assert np.array_equal(direct[data_type], cached[data_type]), f"Cached load gives wrong value for {data_type}"
+    assert np.array_equal(T, T_c)
+    assert np.array_equal(X, X_c)
+
+
+def test_get_snapshot_window():
+    ez = EpochViz(DATA_DIR)
+    full = ez.get_snapshot(["Ey", "Ne"], time_node=100)
+    window = ez.get_snapshot(["Ey", "Ne"], time_node=100, window=slice(3900, 4100))
+    for data_type in ["Ey", "Ne"]:
+        assert np.array_equal(window[data_type], full[data_type][3900:4100])
+
+
+def test_dump_times():
+    ez = EpochViz(DATA_DIR)
+    dump_times = ez.get_dump_times()
+    assert len(dump_times) == len(ez.files)
+    assert np.all(np.diff(dump_times) > 0), "Dump times should be increasing"
+    _, T, _ = ez.load_data(["Ey"], time_range=(10, 20), space_range=100, return_data=True)
+    assert np.array_equal(T, dump_times[10:20])
+
+
+def test_extract_probes():
+    ez = EpochViz(DATA_DIR)
+    data, T, X = ez.load_data(["Ey", "Ne"], space_range=[100, 4000, 7999], return_data=True)
+    probes, T_p, points = ez.extract_probes(["Ey", "Ne"], points=[100, 4000, 7999])
+    assert list(points) == [100, 4000, 7999]
+    assert np.array_equal(T, T_p)
+    for data_type in ["Ey", "Ne"]:
+        assert probes[data_type].shape == (3, len(ez.files))
+        assert np.array_equal(probes[data_type], data[data_type].T)
+
+
+def test_load_data_dtype():
+    ez = EpochViz(DATA_DIR)
+    kwargs = dict(data_types=["Ey"], space_range=(3000, 5000), return_data=True)
+    raw, _, _ = ez.load_data(normalize=False, use_cache=False, **kwargs)
+    data, _, _ = ez.load_data(normalize=True, use_cache=False, dtype=np.float32, **kwargs)
+    assert data["Ey"].dtype == np.float32
+    expected = raw["Ey"] / (raw["Ey"].max() + 1e-10)
+    assert np.allclose(data["Ey"], expected, atol=1e-6)
+
+
+def test_track_harmonics():
+    ez = EpochViz(DATA_DIR)
+    probes, _, _ = ez.extract_probes(["Ey"], points=[4000, 7999])
+    half = len(ez.files) // 2
+    tracker = ez.track_harmonics("Ey", points=[4000, 7999], orders=[1, 3], time_range=(0, half))
+    tracker = ez.track_harmonics("Ey", points=[4000, 7999], tracker=tracker)
+    assert tracker.count == len(ez.files)
+    n = len(ez.files)
+    omega = 2 * np.pi * np.array([1, 3]) / ez.calculated_parameters["omega_max"]
+    expected = np.exp(-1j * omega[:, None] * np.arange(n)) @ probes["Ey"].T
+    assert np.allclose(tracker.coefficients(), expected)
+
+
+def test_derived_fields():
+    ez = EpochViz(DATA_DIR)
+    assert "Ey_reflected" in ez.available_derived
+    kwargs = dict(space_range=(3000, 5000), time_range=(0, 10), return_data=True)
+    raw, _, _ = ez.load_data(["Ey", "Bz"], use_cache=False, **kwargs)
+    data, _, _ = ez.load_data(["Ey_incident", "Ey_reflected"], use_cache=False, **kwargs)
+    assert np.allclose(data["Ey_incident"], (raw["Ey"] + c * raw["Bz"]) / 2)
+    assert np.allclose(data["Ey_reflected"], (raw["Ey"] - c * raw["Bz"]) / 2)
+    probes, _, _ = ez.extract_probes(["Ey_reflected"], points=[3000], time_range=(0, 10))
+    assert np.allclose(probes["Ey_reflected"][0], data["Ey_reflected"][:, 0])
+
+
+def test_2d_run(tmp_path):
+    from tests.test_sdf_reader import write_sdf
+
+    with open(os.path.join(CUR_DIR, "..", "..", "HPC", "1run", "input.deck")) as f:
+        deck = f.read()
+    deck = deck.replace("cells_x = 4000", "cells_x = 30").replace("cells_y = 4000", "cells_y = 20")
+    with open(os.path.join(tmp_path, "input.deck"), "w") as f:
+        f.write(deck)
+    with open(os.path.join(tmp_path, "epoch2d.dat"), "w") as f:
+        f.write("Wrote normal  dump number  1 at time  0.1E-13 and iteration   100\n")
+    grid = [np.linspace(-10e-6, 10e-6, 31), np.linspace(-10e-6, 10e-6, 21)]
+    ey = np.random.rand(8, 30, 20)
+    for i in range(8):
+        write_sdf(os.path.join(tmp_path, f"{i:04d}.sdf"), {"Electric Field/Ey": ey[i]}, time=i * 1e-16, grid=grid)
+
+    ez = EpochViz(str(tmp_path))
+    assert ez.dimensions == 2
+    assert (ez.deck_info["NX"], ez.deck_info["NY"]) == (30, 20)
+    assert np.isclose(ez.deck_info["ANGLE"], np.pi / 6)
+    x, y = ez.grid()
+    assert np.allclose(x, np.linspace(-10, 10, 31)[:-1] + 1 / 3)
+
+    data, _, (x_w, y_w) = ez.load_data(["Ey"], space_range=((5, 10), (2, 4)), return_data=True)
+    assert np.array_equal(data["Ey"], ey[:, 5:10, 2:4])
+    assert np.array_equal(x_w, x[5:10])
+    points = [(1, 2), (29, 19)]
+    data, _, nodes = ez.load_data(["Ey"], space_range=points, return_data=True)
+    assert np.array_equal(data["Ey"], ey[:, [1, 29], [2, 19]])
+    probes, _, _ = ez.extract_probes(["Ey"], points=points)
+    assert np.array_equal(probes["Ey"], data["Ey"].T)
+
+    mean, std, omega, x_band = ez.transverse_spectra("Ey", space_range=((5, 7), (0, 20)), batch_bytes=1000)
+    power = np.stack([power_spectra(ey[:, i], ez.calculated_parameters["omega_max"])[0] for i in (5, 6)])
+    assert mean.shape == (2, len(omega))
+    assert np.allclose(mean, power.mean(axis=1))
+    assert np.allclose(std, power.std(axis=1))
+    assert np.array_equal(x_band, x[5:7])
+
+    maps = ez.reduce_snapshots(["Ey"], window=(slice(5, 10), slice(2, 4)))
+    assert np.allclose(maps["Ey"]["max"], np.abs(ey[:, 5:10, 2:4]).max(axis=0))
+    assert np.allclose(maps["Ey"]["variance"], ey[:, 5:10, 2:4].var(axis=0))
+    assert np.allclose(maps["Ey"]["fluence"], c * epsilon * maps["Ey"]["integral"])
+
+    power, (kx, ky), _ = ez.kspace("Ey", window="hann", batch_size=3)
+    assert power.shape == (8, 30, 11)
+    assert np.allclose(power, kspace_power(ey, x[1] - x[0], y[1] - y[0], "hann")[0])
+    mean, _, _ = ez.kspace("Ey", window="hann", average=True, batch_size=3)
+    assert np.allclose(mean, power.mean(axis=0))
+    with pytest.raises(InvalidTimeError):
+        ez.kspace("Ey", time_range=(5, 5))
+
+    handle = ez.field("Ey", chunks=(3, 8, 8))
+    assert handle.shape == (8, 30, 20)
+    assert np.array_equal(handle[1:7, 5:20, 2:15], ey[1:7, 5:20, 2:15])
+    assert np.array_equal(handle[2, :, 4], ey[2, :, 4])
+    assert handle[3, float(x[7]), float(y[9])] == ey[3, 7, 9]
+    ez.rechunk(["Ey"])
+    assert np.array_equal(ez.field("Ey")[::2, 5:20, 2:15], ey[::2, 5:20, 2:15])
@@ -0,0 +1,89 @@
+import pytest
+import numpy as np
+from epoch_viz.cache import LRUCache
+from epoch_viz.field import FieldHandle
+
+FULL = np.arange(50 * 300, dtype=np.float64).reshape(50, 300)
+
+
+def create_handle(loads, cache_bytes=10**7):
+    def load_block(time_nodes, space_slice):
+        loads.append((time_nodes[0], time_nodes[-1] + 1, space_slice))
+        return FULL[time_nodes][:, space_slice]
+
+    return FieldHandle(
+        data_type="Ne",
+        shape=FULL.shape,
+        load_block=load_block,
+        time_to_node=lambda t: int(t * 10),
+        space_to_node=lambda x: int(x * 100),
+        cache=LRUCache(cache_bytes),
+        chunks=(8, 64),
+    )
+
+
+@pytest.mark.parametrize(
+    "key",
+    [
+        (slice(3, 40), slice(10, 290)),
+        (slice(None, None, 7), slice(290, 10, -3)),
+        (5, slice(None)),
+        (slice(None), 77),
+        (-1, -2),
+        slice(10, 20),
+        (slice(45, 200), slice(0, 5)),
+    ],
+)
+def test_field_handle_slicing(key):
+    handle = create_handle([])
+    assert np.array_equal(handle[key], FULL[key])
+
+
+def test_field_handle_natural_units():
+    handle = create_handle([])
+    assert np.array_equal(handle[1.0:2.5, 0.5:1.2], FULL[10:25, 50:120])
+    assert np.array_equal(handle[2.0, 1.0], FULL[20, 100])
+    with pytest.raises(IndexError):
+        handle[100, 0]
+    with pytest.raises(IndexError):
+        handle[0, 0, 0]
+
+
+def test_field_handle_loads_only_needed_chunks():
+    loads = []
+    handle = create_handle(loads)
+    handle[0:8, 64:100]
+    assert loads == [(0, 8, slice(64, 128))], "Only the chunk containing the window should be loaded"
+
+    handle[2:5, 70:80]
+    assert len(loads) == 1, "Sub window should be served from the cache"
+
+    handle[0:8, 64:200]
+    assert loads[1] == (0, 8, slice(128, 256)), "Only the missing chunks should be loaded"
+
+
+def test_field_handle_2d():
+    full = np.arange(20 * 30 * 40, dtype=np.float64).reshape(20, 30, 40)
+    loads = []
+
+    def load_block(time_nodes, x_slice, y_slice):
+        loads.append((time_nodes[0], time_nodes[-1] + 1, x_slice, y_slice))
+        return full[time_nodes][:, x_slice, y_slice]
+
+    handle = FieldHandle(
+        data_type="Ey",
+        shape=full.shape,
+        load_block=load_block,
+        time_to_node=lambda t: int(t * 10),
+        space_to_node=(lambda x: int(x * 10), lambda y: int(y * 100)),
+        cache=LRUCache(10**7),
+        chunks=(4, 8, 16),
+    )
+    assert np.array_equal(handle[3:17, 5:25, 10:35], full[3:17, 5:25, 10:35])
+    assert np.array_equal(handle[::3, 29, ::-5], full[::3, 29, ::-5])
+    assert np.array_equal(handle[1.0, 1.0:2.0, 0.1], full[10, 10:20, 10])
+    n_loads = len(loads)
+    handle[4:8, 8:16, 16:32]
+    assert len(loads) == n_loads, "Cached chunks should not be loaded again"
+    with pytest.raises(IndexError):
+        handle[0, 0, 0, 0]
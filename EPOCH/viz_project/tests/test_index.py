@@ -0,0 +1,46 @@
+import numpy as np
+import os
+from epoch_viz import index as index_module
+from epoch_viz.index import INDEX_NAME, SdfIndex
+from .test_sdf_reader import write_sdf
+
+
+def create_run(directory, n_files=5):
+    files = []
+    for i in range(n_files):
+        file = os.path.join(directory, f"{i:04d}.sdf")
+        write_sdf(file, {"Electric Field/Ey": np.random.rand(50)}, time=i * 1e-16, step=i * 3)
+        files.append(file)
+    return files
+
+
+def test_index_build(tmp_path):
+    files = create_run(tmp_path)
+    index = SdfIndex(str(tmp_path), files)
+    assert len(index) == 5
+    assert os.path.isfile(os.path.join(tmp_path, INDEX_NAME)), "Index should be saved next to the sdf files"
+    assert np.array_equal(index.times(), [i * 1e-16 for i in range(5)])
+    assert index.times() is index.times(), "Dump times should be cached"
+    assert np.array_equal(index.steps(), [i * 3 for i in range(5)])
+    block = index.blocks(2)["Electric Field/Ey"]
+    assert block["dims"] == [50]
+    assert np.dtype(block["dtype"]) == np.float64
+
+
+def test_index_rescans_only_changed_files(tmp_path, monkeypatch):
+    files = create_run(tmp_path)
+    SdfIndex(str(tmp_path), files)
+
+    scanned = []
+    scan_file = index_module.scan_file
+    monkeypatch.setattr(index_module, "scan_file", lambda file: (scanned.append(file), scan_file(file))[1])
+    SdfIndex(str(tmp_path), files)
+    assert scanned == [], "Unchanged files should not be scanned again"
+
+    write_sdf(files[1], {"Electric Field/Ey": np.random.rand(60)}, time=5e-16, step=1)
+    files.append(os.path.join(tmp_path, "0005.sdf"))
+    write_sdf(files[5], {"Electric Field/Ey": np.random.rand(50)}, time=6e-16, step=15)
+    index = SdfIndex(str(tmp_path), files)
+    assert sorted(scanned) == [files[1], files[5]]
+    assert index.times()[1] == 5e-16
+    assert index.blocks(1)["Electric Field/Ey"]["dims"] == [60]
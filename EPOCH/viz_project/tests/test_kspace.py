@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+from epoch_viz.kspace import angular_histogram, kspace_power, wavenumber_axes
+
+
+def plane_waves(angles, k=2.5, shape=(64, 48), d=0.1):
+    x = np.arange(shape[0]) * d
+    y = np.arange(shape[1]) * d
+    x, y = np.meshgrid(x, y, indexing="ij")
+    return np.stack(
+        [np.cos(2 * np.pi * k * (np.cos(a) * x + np.sin(a) * y)) for a in angles]
+    )
+
+
+def test_kspace_power_peak():
+    waves = plane_waves([np.pi / 6])
+    power, kx, ky = kspace_power(waves, 0.1, 0.1, window="hann", workers=2)
+    assert power.shape == (1, 64, 25)
+    assert np.all(np.diff(kx) > 0)
+    i, j = np.unravel_index(power[0].argmax(), power[0].shape)
+    assert np.isclose(np.hypot(kx[i], ky[j]), 2.5, atol=0.2)
+
+    # The axes are cached
+    assert wavenumber_axes(64, 48, 0.1, 0.1)[0] is kx
+
+
+def test_angular_histogram():
+    waves = plane_waves([np.pi / 6, 5 * np.pi / 6])
+    power, _, _ = kspace_power(waves, 0.1, 0.1)
+    histogram, edges = angular_histogram(power, 0.1, 0.1, bins=12)
+    assert histogram.shape == (2, 12)
+    assert np.allclose(np.rad2deg(edges[histogram.argmax(axis=-1)]), [15, 150])
+
+    # All the power but k = 0 is binned, with the conjugate half plane
+    full = np.abs(np.fft.fft2(waves)) ** 2
+    assert np.allclose(histogram.sum(axis=-1), full.sum(axis=(-2, -1)) - full[:, 0, 0])
+    odd = waves[..., :47]
+    histogram, _ = angular_histogram(kspace_power(odd, 0.1, 0.1)[0], 0.1, 0.1, ny=47)
+    full = np.abs(np.fft.fft2(odd)) ** 2
+    assert np.allclose(histogram.sum(axis=-1), full.sum(axis=(-2, -1)) - full[:, 0, 0])
+
+    # The wavevectors outside k_range are ignored
+    power, _, _ = kspace_power(waves, 0.1, 0.1, window="hann")
+    inside, _ = angular_histogram(power, 0.1, 0.1, bins=12, k_range=(2, 3))
+    outside, _ = angular_histogram(power, 0.1, 0.1, bins=12, k_range=(4, 5))
+    assert np.all(outside.sum(axis=-1) < 1e-3 * inside.sum(axis=-1))
+
+    with pytest.raises(ValueError):
+        angular_histogram(power, 0.1, 0.1, ny=30)
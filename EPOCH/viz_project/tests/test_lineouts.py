@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+from epoch_viz.lineouts import BilinearSampler, polyline, ray
+
+
+def test_polyline():
+    points = polyline([(0, 0), (1, 0), (1, 2)], n_points=7)
+    assert points.shape == (7, 2)
+    assert np.allclose(points[[0, 2, 6]], [(0, 0), (1, 0), (1, 2)])
+    assert len(polyline([(0, 0), (3, 4)], spacing=0.5)) == 11
+
+    points = ray((1, 1), np.pi / 2, 2, 5)
+    assert np.allclose(points[:, 0], 1)
+    assert np.allclose(points[:, 1], np.linspace(1, 3, 5))
+
+    with pytest.raises(ValueError):
+        polyline([(0, 0)], n_points=3)
+
+
+def test_bilinear_sampler():
+    x = np.linspace(-1, 1, 21)
+    y = np.linspace(0, 2, 11)
+    field = 2 * x[:, np.newaxis] - 3 * y + 1
+
+    points = ray((-0.93, 0.17), 0.6, 1.5, 200)
+    sampler = BilinearSampler(x, y, points)
+    assert len(sampler) < 4 * len(points)
+    assert np.allclose(sampler.sample(field), 2 * points[:, 0] - 3 * points[:, 1] + 1)
+
+    # Batches of snapshots and grids of points
+    fields = np.stack([field, 2 * field])
+    grid = np.stack(np.meshgrid([0.1, 0.2, 0.3], [0.5, 1.5], indexing="ij"), axis=-1)
+    values = BilinearSampler(x, y, grid).sample(fields)
+    assert values.shape == (2, 3, 2)
+    assert np.allclose(values[1], 2 * (2 * grid[..., 0] - 3 * grid[..., 1] + 1))
+
+    # The nodes themselves are returned exactly
+    sampler = BilinearSampler(x, y, [(x[4], y[7])])
+    assert np.allclose(sampler.sample(field), field[4, 7])
+
+    with pytest.raises(ValueError):
+        BilinearSampler(x, y, [(1.5, 1.0)])
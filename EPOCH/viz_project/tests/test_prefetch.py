@@ -0,0 +1,56 @@
+import threading
+import time
+import numpy as np
+from epoch_viz.prefetch import Prefetcher
+
+
+def test_prefetcher_order():
+    def read(item):
+        time.sleep(0.01 * (item % 3))
+        return np.full(10, item)
+
+    results = list(Prefetcher(read, range(20), depth=4))
+    assert [item for item, _ in results] == list(range(20))
+    for item, result in results:
+        assert np.all(result == item)
+
+
+def test_prefetcher_reads_ahead():
+    started = []
+    lock = threading.Lock()
+
+    def read(item):
+        with lock:
+            started.append(item)
+        return np.zeros(10)
+
+    for item, _ in Prefetcher(read, range(10), depth=3):
+        if item == 1:
+            time.sleep(0.05)
+            with lock:
+                assert max(started) >= 3, "Next items should be read while the current one is processed"
+
+
+def test_prefetcher_memory_cap():
+    in_flight = []
+    lock = threading.Lock()
+    active = [0]
+
+    def read(item):
+        with lock:
+            active[0] += 1
+            in_flight.append(active[0])
+        time.sleep(0.005)
+        with lock:
+            active[0] -= 1
+        return np.zeros(100)
+
+    list(Prefetcher(read, range(20), depth=8, max_bytes=2 * 800))
+    assert max(in_flight) <= 2, "Memory cap should limit the number of items read ahead"
+
+
+def test_prefetcher_empty_and_break():
+    assert list(Prefetcher(lambda item: item, [])) == []
+    for item, _ in Prefetcher(lambda item: np.zeros(1), range(100), depth=4):
+        if item == 2:
+            break
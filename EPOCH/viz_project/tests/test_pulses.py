@@ -0,0 +1,27 @@
+import numpy as np
+from epoch_viz.pulses import attosecond_pulses, harmonic_filter
+
+
+def test_harmonic_filter():
+    omega = np.array([1.0, 2.5, 2.75, 3.0, 6.0, 9.0, 9.25, 9.5, 12.0])
+    values = harmonic_filter(omega, (3, 9), edge=0.5)
+    assert np.allclose(values, [0, 0, 0.5, 1, 1, 1, 0.5, 0, 0])
+
+
+def test_attosecond_pulses():
+    omega_max = 40.0
+    t = np.arange(4000) / omega_max
+    envelope = np.exp(-(((t - 50) / 20) ** 2))
+    data = sum(np.cos(2 * np.pi * n * t) for n in [1, 3, 5, 7, 9]) * envelope
+    batch = np.stack([data, 2 * data, np.cos(2 * np.pi * t)])
+    intensity, times, stats = attosecond_pulses(batch, omega_max, orders=(3, 9))
+    assert intensity.shape == batch.shape
+    assert np.isclose(times[1], 1 / omega_max)
+    # Odd harmonics give two pulses per laser cycle
+    assert np.allclose(stats["peak_spacing"][:2], 0.5)
+    assert np.allclose(intensity[1], 4 * intensity[0])
+    assert stats["n_pulses"][0] == stats["n_pulses"][1] > 10
+    assert 0.05 < stats["fwhm"][0] < 0.2
+    assert stats["contrast"][0] > 100
+    # No harmonics in the band of the third series
+    assert intensity[2].max() < 1e-6 * intensity[0].max()
@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+from epoch_viz.reductions import SnapshotReduction, trapezoid_weights, tree_merge
+
+
+def test_trapezoid_weights():
+    times = np.array([0.0, 1.0, 3.0, 3.5])
+    values = times**2 + 1
+    assert np.isclose(np.sum(trapezoid_weights(times) * values), np.sum((values[1:] + values[:-1]) / 2 * np.diff(times)))
+    assert np.array_equal(trapezoid_weights([2.0]), [0.0])
+
+
+def test_snapshot_reduction():
+    rng = np.random.default_rng(3)
+    snapshots = rng.standard_normal((50, 6, 4)) + 3
+    weights = rng.random(50)
+    reduction = SnapshotReduction()
+    for snapshot, weight in zip(snapshots, weights):
+        reduction.update(snapshot, weight)
+    maps = reduction.results()
+    assert reduction.count == 50
+    assert np.allclose(maps["max"], np.abs(snapshots).max(axis=0))
+    assert np.allclose(maps["mean"], snapshots.mean(axis=0))
+    assert np.allclose(maps["variance"], snapshots.var(axis=0))
+    assert np.allclose(maps["integral"], np.tensordot(weights, snapshots**2, axes=1))
+
+    with pytest.raises(ValueError):
+        reduction.update(np.zeros(3))
+
+
+def test_tree_merge_matches_single_pass():
+    rng = np.random.default_rng(4)
+    snapshots = rng.standard_normal((37, 5)) * 10 + 100
+    single = SnapshotReduction()
+    for snapshot in snapshots:
+        single.update(snapshot)
+
+    shards = []
+    for rows in np.array_split(np.arange(37), 6):
+        shard = {"Ey": SnapshotReduction()}
+        for row in rows:
+            shard["Ey"].update(snapshots[row])
+        shards.append(shard)
+    merged = tree_merge(shards)["Ey"]
+    assert merged.count == 37
+    for key, value in single.results().items():
+        assert np.allclose(merged.results()[key], value)
+
+    # Empty reductions are ignored
+    assert tree_merge([SnapshotReduction(), single]).count == 37
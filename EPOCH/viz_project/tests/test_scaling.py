@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+from epoch_viz.scaling import fit_scaling_law, laser_gamma, scaling_table
+
+
+def test_fit_scaling_law():
+    x = np.array([1.0, 2.0, 4.0, 8.0, 16.0])
+    fit = fit_scaling_law(x, 3 * x**0.5)
+    assert np.isclose(fit["exponent"], 0.5)
+    assert np.isclose(fit["prefactor"], 3)
+    assert np.isclose(fit["r2"], 1)
+    assert fit["n"] == 5
+
+    # Runs without a cutoff are ignored
+    fit = fit_scaling_law(x, [3, 3 * 2**0.5, np.nan, 3 * 8**0.5, 12])
+    assert fit["n"] == 4
+    assert np.isclose(fit["exponent"], 0.5)
+
+    with pytest.raises(ValueError):
+        fit_scaling_law([1, 1], [2, 3])
+
+
+def test_scaling_table():
+    a0 = np.array([1.0, 2.0, 4.0, 1.0, 2.0, 4.0])
+    density = np.array([5.0, 5.0, 5.0, 20.0, 20.0, 20.0])
+    cutoffs = 2 * a0**1.5 * density**-0.5
+    table = scaling_table(
+        cutoffs,
+        {"a0": a0, "gamma": laser_gamma(a0), "density": density, "temp": np.ones(6)},
+    )
+    assert set(table) == {"a0", "gamma", "density", "joint"}
+    joint = table["joint"]
+    assert set(joint["exponents"]) == {"a0", "density"}
+    assert np.isclose(joint["exponents"]["a0"], 1.5)
+    assert np.isclose(joint["exponents"]["density"], -0.5)
+    assert np.isclose(joint["prefactor"], 2)
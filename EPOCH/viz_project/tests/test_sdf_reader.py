@@ -0,0 +1,148 @@
+import pytest
+import struct
+import numpy as np
+import os
+from epoch_viz.sdf_reader import (
+    SdfFormatError,
+    read_block,
+    read_block_headers,
+    read_header,
+    read_mesh,
+    read_points,
+)
+
+STRING_LENGTH = 64
+BLOCK_HEADER_LENGTH = 72 + STRING_LENGTH
+
+
+def pad(text, length):
+    return text.encode("ascii").ljust(length, b" ")
+
+
+def write_sdf(file, variables, time=1e-15, step=10, grid=None):
+    """
+    Writes a minimal SDF file with a plain mesh and plain variables.
+
+    `variables` is a dictionary of block name to numpy array, stored in Fortran order.
+    """
+    blocks = []
+    if grid is not None:
+        ndims = len(grid)
+        info = struct.pack("<" + "d" * ndims, *([1.0] * ndims))
+        info += b"".join(pad(label, 32) for label in "XYZ"[:ndims])
+        info += b"".join(pad("m", 32) for _ in range(ndims))
+        info += struct.pack("<i", 0)
+        info += struct.pack("<" + "d" * 2 * ndims, *[v for g in grid for v in (g[0], g[-1])])
+        info += struct.pack("<" + "i" * ndims, *[len(g) for g in grid])
+        data = b"".join(np.asarray(g, dtype="<f8").tobytes() for g in grid)
+        blocks.append(("grid", "Grid/Grid", 1, 4, ndims, info, data))
+    for name, array in variables.items():
+        array = np.asarray(array)
+        datatype = {"<f8": 4, "<f4": 3, "<i4": 1}[array.dtype.str]
+        info = struct.pack("<d", 1.0) + pad("V/m", 32) + pad("grid", 32)
+        info += struct.pack("<" + "i" * array.ndim, *array.shape)
+        info += struct.pack("<i", 0)
+        data = array.tobytes(order="F")
+        blocks.append((name.split("/")[-1].lower(), name, 3, datatype, array.ndim, info, data))
+
+    header_length = 4 + 4 * 3 + 32 + 8 + 8 + 4 * 4 + 8 + 4 * 4 + 3
+    location = header_length
+    content = b""
+    for i, (block_id, name, blocktype, datatype, ndims, info, data) in enumerate(blocks):
+        data_location = location + BLOCK_HEADER_LENGTH + len(info)
+        next_location = data_location + len(data)
+        block = struct.pack("<qq", next_location, data_location)
+        block += pad(block_id, 32)
+        block += struct.pack("<qiii", len(data), blocktype, datatype, ndims)
+        block += pad(name, STRING_LENGTH)
+        block += struct.pack("<i", len(info))
+        content += block + info + data
+        location = next_location
+
+    header = b"SDF1" + struct.pack("<iii", 16911887, 1, 3) + pad("Epoch2d", 32)
+    header += struct.pack("<qqiiii", header_length, 0, 0, len(blocks), BLOCK_HEADER_LENGTH, step)
+    header += struct.pack("<d", time)
+    header += struct.pack("<iiii", 0, 0, STRING_LENGTH, 1)
+    header += b"\x00\x00\x00"
+    assert len(header) == header_length
+    with open(file, "wb") as f:
+        f.write(header + content)
+
+
+def test_read_header(tmp_path):
+    file = os.path.join(tmp_path, "0001.sdf")
+    write_sdf(file, {"Electric Field/Ey": np.arange(10.0)}, time=2.5e-15, step=42)
+    header = read_header(file)
+    assert header["time"] == 2.5e-15
+    assert header["step"] == 42
+    assert header["nblocks"] == 1
+    assert header["code_name"] == "Epoch2d"
+
+
+def test_read_block_headers(tmp_path):
+    file = os.path.join(tmp_path, "0001.sdf")
+    ey = np.random.rand(100)
+    ne = np.random.rand(100).astype(np.float32)
+    write_sdf(file, {"Electric Field/Ey": ey, "Derived/Number_Density/Electron": ne}, grid=[np.linspace(0, 1, 101)])
+    headers = read_block_headers(file)
+    assert list(headers.keys()) == ["Grid/Grid", "Electric Field/Ey", "Derived/Number_Density/Electron"]
+    assert headers["Electric Field/Ey"]["dims"] == (100,)
+    assert headers["Electric Field/Ey"]["id"] == "ey"
+    assert np.dtype(headers["Derived/Number_Density/Electron"]["dtype"]) == np.float32
+    assert headers["Grid/Grid"]["dims"] == (101,)
+    assert headers["Grid/Grid"]["extents"] == (0.0, 1.0)
+
+
+def test_read_block_window_1d(tmp_path):
+    file = os.path.join(tmp_path, "0001.sdf")
+    ey = np.random.rand(1000)
+    write_sdf(file, {"Electric Field/Ey": ey})
+    block = read_block_headers(file)["Electric Field/Ey"]
+    assert np.array_equal(read_block(file, block), ey)
+    window = read_block(file, block, slice(400, 430))
+    assert isinstance(window, np.memmap), "Window should be a view of the file"
+    assert np.array_equal(window, ey[400:430])
+
+
+def test_read_block_window_2d(tmp_path):
+    file = os.path.join(tmp_path, "0001.sdf")
+    ey = np.random.rand(40, 30)
+    write_sdf(file, {"Electric Field/Ey": ey})
+    block = read_block_headers(file)["Electric Field/Ey"]
+    assert block["dims"] == (40, 30)
+    assert np.array_equal(read_block(file, block), ey)
+    assert np.array_equal(read_block(file, block, (slice(5, 20), slice(10, 12))), ey[5:20, 10:12])
+
+
+def test_read_points(tmp_path):
+    file = os.path.join(tmp_path, "0001.sdf")
+    ey = np.random.rand(40, 30)
+    bz = np.random.rand(40, 30)
+    write_sdf(file, {"Electric Field/Ey": ey, "Magnetic Field/Bz": bz})
+    headers = read_block_headers(file)
+    blocks = {"Ey": headers["Electric Field/Ey"], "Bz": headers["Magnetic Field/Bz"]}
+    points = ([1, 5, 39], [0, 29, 7])
+    values = read_points(file, blocks, points)
+    assert np.array_equal(values["Ey"], ey[points])
+    assert np.array_equal(values["Bz"], bz[points])
+
+
+def test_read_mesh(tmp_path):
+    file = os.path.join(tmp_path, "0001.sdf")
+    x = np.linspace(-10e-6, 10e-6, 41)
+    y = np.linspace(-5e-6, 5e-6, 31)
+    write_sdf(file, {"Electric Field/Ey": np.random.rand(40, 30)}, grid=[x, y])
+    headers = read_block_headers(file)
+    mesh_x, mesh_y = read_mesh(file, headers["Grid/Grid"])
+    assert np.array_equal(mesh_x, x)
+    assert np.array_equal(mesh_y, y)
+    with pytest.raises(SdfFormatError):
+        read_mesh(file, headers["Electric Field/Ey"])
+
+
+def test_not_sdf_file(tmp_path):
+    file = os.path.join(tmp_path, "0001.sdf")
+    with open(file, "w") as f:
+        f.write("not a sdf file")
+    with pytest.raises(SdfFormatError):
+        read_header(file)
@@ -0,0 +1,216 @@
+import numpy as np
+from epoch_viz.spectra import (
+    HarmonicTracker,
+    SpectrumStatistics,
+    fft_length,
+    get_window,
+    harmonic_cutoffs,
+    harmonic_phases,
+    harmonic_yields,
+    nudft,
+    power_spectra,
+    resample_uniform,
+    spectrum,
+    spectrum_at_times,
+    stft,
+)
+
+
+def test_power_spectra_matches_per_node_fft():
+    rng = np.random.default_rng(0)
+    data = rng.standard_normal((256, 5))
+    power, omega = power_spectra(data, omega_max=20.0, workers=2)
+    assert power.shape == (5, 129)
+    for node in range(5):
+        expected = np.abs(np.fft.rfft(data[:, node])) ** 2
+        assert np.allclose(power[node], expected)
+    assert omega[0] == 0 and np.isclose(omega[-1], 10.0)
+
+
+def test_power_spectra_peak():
+    t = np.arange(400) / 20.0
+    # Sampled at omega_max = 20 omega0, a signal at the third harmonic
+    data = np.sin(2 * np.pi * 3 * t)
+    power, omega = power_spectra(data, omega_max=20.0)
+    assert power.shape == (1, 201)
+    assert np.isclose(omega[power[0].argmax()], 3.0)
+
+
+def test_harmonic_yields():
+    omega = np.linspace(0, 10, 101)
+    power = np.zeros((2, 101))
+    power[0, 10] = 4.0  # omega = 1
+    power[0, 30] = 1.0  # omega = 3
+    power[1, 52] = 2.0  # omega = 5.2
+    yields, orders = harmonic_yields(power, omega)
+    assert list(orders) == [1, 3, 5, 7, 9]
+    assert yields.shape == (5, 2)
+    assert np.allclose(yields[:, 0], [0.4, 0.1, 0, 0, 0])
+    assert np.allclose(yields[:, 1], [0, 0, 0.2, 0, 0])
+
+    # Runs sharing the omega axis are handled at once
+    runs = np.stack([power, 2 * power])
+    yields, _ = harmonic_yields(runs, omega, orders=[1, 5], bandwidth=0.1)
+    assert yields.shape == (2, 2, 2)
+    assert np.isclose(yields[0, 1, 0], 0.8)
+    assert np.isclose(yields[1, 0, 1], 0.0), "Order 5 band should exclude omega = 5.2"
+
+
+def test_harmonic_yields_fundamental():
+    omega = np.linspace(0, 10, 101)
+    power = np.zeros(101)
+    power[14] = 1.0  # omega = 1.4, the second harmonic of 0.7
+    yields, orders = harmonic_yields(power, omega, orders=[1, 2], fundamental=0.7, bandwidth=0.2)
+    assert np.allclose(yields, [0, 0.1])
+
+
+def test_harmonic_cutoffs():
+    rng = np.random.default_rng(1)
+    omega = np.linspace(0, 40, 4001)
+    # Two runs with odd harmonics decaying down to the 9th and the 15th order
+    power = rng.exponential(1e-6, (2, len(omega)))
+    for run, cutoff in enumerate([9, 15]):
+        for order in range(1, cutoff + 1, 2):
+            power[run, np.abs(omega - order) < 0.1] += 10.0 ** -(order / 4)
+    cutoffs, floors = harmonic_cutoffs(power, omega)
+    assert np.array_equal(cutoffs, [9, 15])
+    assert np.allclose(floors, 1e-6, rtol=0.2)
+
+    cutoffs, _ = harmonic_cutoffs(power, omega, noise_floor=1.0)
+    assert np.all(np.isnan(cutoffs))
+
+
+def test_harmonic_phases():
+    omega_max, n = 40.0, 4000
+
+    def harmonic(order, delay, gdd=0.0):
+        # Gaussian harmonic with the phase -2 pi f delay - pi gdd (f - order)^2
+        f = np.fft.rfftfreq(n, 1 / omega_max)
+        phase = -2 * np.pi * f * delay - np.pi * gdd * (f - order) ** 2
+        return np.fft.irfft(np.exp(-(((f - order) * 3) ** 2) + 1j * phase), n)
+
+    signal = harmonic(3, 30) + harmonic(5, 40) + harmonic(7, 50, gdd=2.0) + harmonic(9, 95)
+    runs = np.stack([signal, np.roll(signal, 40)])[np.newaxis]
+    result, orders = harmonic_phases(runs, omega_max, orders=[3, 5, 7, 9], t0=1.0)
+    assert list(orders) == [3, 5, 7, 9]
+    for key in ["power", "phase", "group_delay", "chirp"]:
+        assert result[key].shape == (4, 1, 2)
+    assert np.allclose(result["group_delay"][:, 0, 0], [31, 41, 51, 96], atol=1e-3)
+    assert np.allclose(result["group_delay"][:, 0, 1], [32, 42, 52, 97], atol=1e-3)
+    assert np.allclose(result["chirp"][:, 0, 0], [0, 0, 2, 0], atol=1e-3)
+
+
+def test_harmonic_tracker_matches_fft():
+    rng = np.random.default_rng(1)
+    data = rng.standard_normal((200, 3))
+    omega_max = 20.0
+    # Orders on the bins of the FFT (bin k is at k * omega_max / 200)
+    tracker = HarmonicTracker([1, 3, 5], omega_max=omega_max)
+    for sample in data:
+        tracker.update(sample)
+    spectrum = np.fft.rfft(data, axis=0)
+    bins = [10, 30, 50]
+    assert tracker.count == 200
+    assert np.allclose(tracker.coefficients(), spectrum[bins])
+    assert np.allclose(tracker.power(), np.abs(spectrum[bins]) ** 2)
+
+
+def test_spectrum_statistics_matches_full_batch():
+    rng = np.random.default_rng(2)
+    data = rng.standard_normal((128, 3, 50))
+    statistics = SpectrumStatistics(20.0, window="hann")
+    for start in range(0, 50, 16):
+        statistics.update(data[..., start : start + 16])
+    power = np.stack(
+        [power_spectra(data[:, i], 20.0, window="hann")[0] for i in range(3)]
+    )
+    assert statistics.count == 50
+    assert statistics.mean().shape == (3, 65)
+    assert np.allclose(statistics.mean(), power.mean(axis=1))
+    assert np.allclose(statistics.std(), power.std(axis=1))
+    assert np.allclose(statistics.omega, power_spectra(data[:, 0], 20.0)[1])
+
+
+def test_stft_chirp():
+    omega_max = 20.0
+    t = np.arange(2000) / omega_max
+    # The first half oscillates at omega0, the second half at the third harmonic
+    data = np.where(t < 50, np.sin(2 * np.pi * t), np.sin(2 * np.pi * 3 * t))
+    spectrogram, times, omega = stft(data, omega_max, window_size=200, hop=100, n_fft=400)
+    assert spectrogram.shape == (201, 19)
+    assert len(times) == 19 and np.isclose(times[0], 199 / 2 / omega_max)
+    peaks = omega[spectrogram.argmax(axis=0)]
+    assert np.allclose(peaks[times < 40], 1.0)
+    assert np.allclose(peaks[times > 60], 3.0)
+
+
+def test_stft_batched():
+    rng = np.random.default_rng(2)
+    data = rng.standard_normal((3, 500))
+    batched, _, _ = stft(data, 20.0, window_size=50, hop=10, window="gaussian")
+    assert batched.shape == (3, 26, 46)
+    for i in range(3):
+        single, _, _ = stft(data[i], 20.0, window_size=50, hop=10, window="gaussian")
+        assert np.allclose(batched[i], single)
+    boxcar, _, _ = stft(data, 20.0, window_size=50, hop=10, window="boxcar")
+    assert np.allclose(boxcar[1, :, 2], np.abs(np.fft.rfft(data[1, 20:70])) ** 2)
+
+
+def test_get_window():
+    assert np.allclose(get_window("hann", 5), [0, 0.5, 1, 0.5, 0])
+    assert np.allclose(get_window(None, 4), 1)
+    assert np.allclose(get_window(("tukey", 0), 6), 1)
+    tukey = get_window(("tukey", 0.5), 9)
+    assert tukey[0] == 0 and np.allclose(tukey[3:6], 1)
+    blackman_harris = get_window("blackman-harris", 101)
+    assert blackman_harris[0] < 1e-4 and np.isclose(blackman_harris[50], 1)
+
+
+def test_fft_length():
+    assert fft_length(1001) == 1001
+    assert fft_length(1001, "pow2") == 1024
+    assert fft_length(97, "fast") == 100
+    assert fft_length(97, 128) == 128
+
+
+def test_spectrum():
+    rng = np.random.default_rng(3)
+    data = rng.standard_normal((100, 2))
+    values, omega = spectrum(data, 20.0, window="hann", pad="pow2")
+    expected = np.fft.rfft(data * np.hanning(100)[:, np.newaxis], n=128, axis=0)
+    assert np.allclose(values, expected)
+    assert np.allclose(omega, np.fft.rfftfreq(128) * 20.0)
+    # The frequency axes are cached
+    assert spectrum(data, 20.0, pad="pow2")[1] is omega
+    assert not omega.flags.writeable
+
+
+def test_resample_uniform():
+    times = np.array([0.0, 0.9, 2.1, 3.0, 4.2])
+    data = np.stack([2 * times + 1, -times], axis=1)
+    resampled, grid = resample_uniform(data, times)
+    assert np.allclose(grid, np.linspace(0, 4.2, 5))
+    assert np.allclose(resampled, np.stack([2 * grid + 1, -grid], axis=1))
+
+
+def test_nudft_matches_fft_for_uniform_times():
+    rng = np.random.default_rng(4)
+    data = rng.standard_normal((64, 3))
+    times = np.arange(64) / 20.0
+    omega = np.fft.rfftfreq(64) * 20.0
+    assert np.allclose(nudft(data, times, omega), np.fft.rfft(data, axis=0))
+
+
+def test_spectrum_at_times_jitter():
+    rng = np.random.default_rng(5)
+    # Dumps nominally every 0.02 tau, but really a little later each time
+    times = np.arange(2000) * 0.0202 + rng.uniform(0, 0.0005, 2000)
+    data = np.cos(2 * np.pi * 21 * times)
+    values, omega = spectrum(data, 50.0)
+    assert abs(omega[np.abs(values).argmax()] - 21.0) > 5 * omega[1]
+    for method in ["resample", "nudft"]:
+        values, omega = spectrum_at_times(data, times, method=method)
+        power = np.abs(values) ** 2
+        assert np.isclose(omega[power.argmax()], 21.0, atol=omega[1])
+        peak = np.abs(omega - 21.0) < 0.1
+        assert power[peak].sum() > 0.9 * power.sum()
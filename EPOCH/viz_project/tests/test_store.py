@@ -0,0 +1,75 @@
+import pytest
+import numpy as np
+import os
+from epoch_viz.store import NodeMajorStore
+
+
+def create_files(directory, n_files=10):
+    files = []
+    for i in range(n_files):
+        file = os.path.join(directory, f"{i:04d}.sdf")
+        with open(file, "w") as f:
+            f.write(str(i))
+        files.append(file)
+    return files
+
+
+def read_snapshot(file, data_types):
+    i = int(os.path.basename(file).split(".")[0])
+    return {
+        data_type: np.arange(20, dtype=np.float64) * (i + 1) * (k + 1)
+        for k, data_type in enumerate(data_types)
+    }
+
+
+def test_store_build(tmp_path):
+    files = create_files(tmp_path)
+    store = NodeMajorStore(os.path.join(tmp_path, "cache"))
+    assert store.read_manifest() is None
+    assert store.available_fields(files) == []
+
+    store.build(files, ["Ey", "Bz"], read_snapshot, buffer_size=3)
+    assert store.is_valid(files)
+    assert sorted(store.available_fields(files)) == ["Bz", "Ey"]
+
+    ey = store.field("Ey")
+    assert ey.shape == (10, 20), "Store should be (time, space)"
+    assert isinstance(ey, np.memmap)
+    assert ey.T.flags["C_CONTIGUOUS"], "Time series of a node should be contiguous"
+    for i, file in enumerate(files):
+        assert np.array_equal(ey[i], read_snapshot(file, ["Ey"])["Ey"])
+
+
+def test_store_extend_and_invalidate(tmp_path):
+    files = create_files(tmp_path)
+    store = NodeMajorStore(os.path.join(tmp_path, "cache"))
+    store.build(files, ["Ey"], read_snapshot)
+    store.build(files, ["Ne"], read_snapshot)
+    assert sorted(store.available_fields(files)) == ["Ey", "Ne"], "Building new fields should keep the old ones"
+
+    os.utime(files[3], (0, 0))
+    assert not store.is_valid(files), "Changed sdf file should invalidate the store"
+    assert store.available_fields(files) == []
+
+    new_files = create_files(tmp_path, n_files=11)
+    store.build(new_files, ["Ey"], read_snapshot)
+    assert store.available_fields(new_files) == ["Ey"], "Rebuilding should drop the stale fields"
+    assert store.field("Ey").shape == (11, 20)
+
+
+def test_store_2d(tmp_path):
+    files = create_files(tmp_path, n_files=5)
+
+    def read_snapshot_2d(file, data_types):
+        return {
+            data_type: data.reshape(4, 5)
+            for data_type, data in read_snapshot(file, data_types).items()
+        }
+
+    store = NodeMajorStore(os.path.join(tmp_path, "cache"))
+    store.build(files, ["Ey"], read_snapshot_2d, buffer_bytes=1)
+    ey = store.field("Ey")
+    assert ey.shape == (5, 4, 5), "2D fields should be (time, x, y)"
+    for i, file in enumerate(files):
+        assert np.array_equal(ey[i], read_snapshot_2d(file, ["Ey"])["Ey"])
+    assert np.array_equal(ey[:, 2, 3], [13 * (i + 1) for i in range(5)])